@@ -12,7 +12,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.config import settings
 from app.database import Base
-from app.models import Alert, AlertSource, FLRound, FLClient, Prediction, PredictedTechnique, NetworkData
+from app.models import Alert, AlertSource, Facility, FLRound, FLClient, FLClientMetric, Prediction, PredictedTechnique, NetworkData
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
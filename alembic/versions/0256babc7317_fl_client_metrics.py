@@ -0,0 +1,36 @@
+"""FL client per-epoch metrics
+
+Revision ID: 0256babc7317
+Revises: 82b90617ee73
+Create Date: 2026-10-19 00:12:05.418233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0256babc7317'
+down_revision: Union[str, Sequence[str], None] = '82b90617ee73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fl_client_metrics',
+    sa.Column('client_id', sa.UUID(), nullable=False),
+    sa.Column('epoch', sa.Integer(), nullable=False),
+    sa.Column('loss', sa.Float(), nullable=True),
+    sa.Column('accuracy', sa.Float(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['fl_clients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('client_id', 'epoch')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('fl_client_metrics')
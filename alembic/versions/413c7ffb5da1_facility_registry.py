@@ -0,0 +1,41 @@
+"""Facility registry
+
+Revision ID: 413c7ffb5da1
+Revises: 0256babc7317
+Create Date: 2026-10-19 01:03:41.271906
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '413c7ffb5da1'
+down_revision: Union[str, Sequence[str], None] = '0256babc7317'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    facilities = op.create_table('facilities',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('fl_eligible', sa.Boolean(), server_default=sa.true(), nullable=False),
+    sa.Column('registered_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The facilities rounds were created with before the registry existed
+    now = datetime.utcnow()
+    op.bulk_insert(facilities, [
+        {'id': 'facility_a', 'name': 'Facility A', 'fl_eligible': True, 'registered_at': now},
+        {'id': 'facility_b', 'name': 'Facility B', 'fl_eligible': True, 'registered_at': now},
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('facilities')
@@ -1,15 +1,23 @@
 """
 Alerts API endpoints
 """
-from typing import Optional
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Literal, Optional, Sequence
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.caching import DataFamily, response_cache
+from app.database import get_db, get_read_db
 from app.events.emitter import emit_alert_created, emit_alert_updated, emit_dashboard_update
-from app.repositories.alert_repository import AlertRepository
+from app.repositories.alert_repository import LIST_COLUMNS, AlertRepository
+from app.responses import FastJSONResponse, dump_json
 from app.schemas.alert import AlertCreate, AlertResponse, AlertStats, AlertUpdate
 
 router = APIRouter()
@@ -24,7 +32,8 @@ async def get_alerts(
     time_range: Optional[str] = None,
     page: int = 1,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all alerts with filtering and pagination
@@ -37,29 +46,49 @@ async def get_alerts(
     - time_range: Filter by time (Last 24 hours, Last 7 days, Last 30 days)
     - page: Page number (default: 1)
     - limit: Items per page (default: 10)
+    - include: Comma-separated extras to embed in each row (sources)
+
+    Rows are slim list items; use GET /api/alerts/{id} for the full alert.
     """
     repo = AlertRepository(db)
+    includes = {part.strip() for part in include.split(",")} if include else set()
 
-    alerts, total = await repo.get_all(
-        severity=severity,
-        facility=facility,
-        status=status_filter,
-        search=search,
-        time_range=time_range,
-        page=page,
-        limit=limit,
-    )
+    async def build() -> dict:
+        alerts, total = await repo.get_list(
+            severity=severity,
+            facility=facility,
+            status=status_filter,
+            search=search,
+            time_range=time_range,
+            page=page,
+            limit=limit,
+            include_sources="sources" in includes,
+        )
+
+        # Calculate total pages
+        pages = (total + limit - 1) // limit if total > 0 else 0
 
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if total > 0 else 0
+        return {
+            # Leave "sources" out of rows unless it was requested
+            "alerts": [alert.model_dump(exclude_unset=True) for alert in alerts],
+            "total": total,
+            "page": page,
+            "pages": pages,
+            "limit": limit,
+        }
 
-    return {
-        "alerts": [AlertResponse.model_validate(alert) for alert in alerts],
-        "total": total,
+    params = {
+        "severity": severity,
+        "facility": facility,
+        "status_filter": status_filter,
+        "search": search,
+        "time_range": time_range,
         "page": page,
-        "pages": pages,
         "limit": limit,
+        "include": ",".join(sorted(includes)) or None,
     }
+    body = await response_cache.get_or_build("alerts.list", DataFamily.ALERTS, params, build)
+    return FastJSONResponse(body)
 
 
 @router.post("", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
@@ -82,13 +111,14 @@ async def create_alert(
     """
     repo = AlertRepository(db)
     alert = await repo.create(alert_data)
+    stats = await repo.get_stats()
+    await db.commit()
 
     # Emit WebSocket event for new alert
     alert_response = AlertResponse.model_validate(alert)
     await emit_alert_created(alert_response.model_dump())
 
     # Emit updated statistics to dashboard
-    stats = await repo.get_stats()
     await emit_dashboard_update({"alertStats": stats.model_dump()})
 
     return alert_response
@@ -96,7 +126,7 @@ async def create_alert(
 
 @router.get("/stats", response_model=AlertStats)
 async def get_alert_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get alert statistics
@@ -108,8 +138,79 @@ async def get_alert_stats(
     - false_positives: Number of false positive alerts
     """
     repo = AlertRepository(db)
-    stats = await repo.get_stats()
-    return stats
+    body = await response_cache.get_or_build("alerts.stats", DataFamily.ALERTS, {}, repo.get_stats)
+    return FastJSONResponse(body)
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_FIELDS = [column.key for column in LIST_COLUMNS]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _ndjson_chunks(batches: AsyncIterator[Sequence[RowMapping]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(dump_json(dict(row)) + b"\n" for row in batch)
+
+
+async def _csv_chunks(batches: AsyncIterator[Sequence[RowMapping]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for batch in batches:
+        for row in batch:
+            writer.writerow([_csv_value(row[field]) for field in EXPORT_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_alerts(
+    severity: Optional[str] = None,
+    facility: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    search: Optional[str] = None,
+    time_range: Optional[str] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Export every matching alert as NDJSON or CSV
+
+    Query Parameters:
+    - severity, facility, status_filter, search, time_range: Same filters as GET /api/alerts
+    - format: ndjson (default, one alert per line) or csv
+
+    Rows are streamed from a server-side cursor, newest first, so exports of
+    any size run in constant memory.
+    """
+    repo = AlertRepository(db)
+    batches = repo.stream_rows(
+        severity=severity,
+        facility=facility,
+        status=status_filter,
+        search=search,
+        time_range=time_range,
+    )
+    chunks = _csv_chunks(batches) if format == "csv" else _ndjson_chunks(batches)
+
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="alerts.{format}"'},
+    )
 
 
 @router.get("/{alert_id}", response_model=AlertResponse)
@@ -131,7 +232,7 @@ async def get_alert_by_id(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Alert with id {alert_id} not found"
         )
 
-    return AlertResponse.model_validate(alert)
+    return FastJSONResponse(AlertResponse.model_validate(alert))
 
 
 @router.put("/{alert_id}/status", response_model=AlertResponse)
@@ -150,19 +251,20 @@ async def update_alert_status(
     - status: New status (acknowledged, resolved, false-positive)
     """
     repo = AlertRepository(db)
-    alert = await repo.update_status(alert_id, update_data.status)
+    alert_response = await repo.update_status(alert_id, update_data.status)
 
-    if not alert:
+    if not alert_response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Alert with id {alert_id} not found"
         )
 
+    stats = await repo.get_stats()
+    await db.commit()
+
     # Emit WebSocket event for updated alert
-    alert_response = AlertResponse.model_validate(alert)
     await emit_alert_updated(alert_response.model_dump())
 
     # Emit updated statistics to dashboard
-    stats = await repo.get_stats()
     await emit_dashboard_update({"alertStats": stats.model_dump()})
 
     return alert_response
@@ -4,17 +4,44 @@ Federated Learning Status API endpoints
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.caching import DataFamily, response_cache
+from app.config import settings
+from app.database import get_db, get_read_db, has_pending_writes
 from app.events.emitter import emit_fl_progress
-from app.repositories.fl_repository import FLRepository
-from app.schemas.fl_status import FLClientSchema, FLRoundResponse, PrivacyMetrics
+from app.fl import (
+    AggregationError,
+    AggregationInProgress,
+    InvalidTransition,
+    model_aggregator,
+    present_round,
+    round_coordinator,
+)
+from app.models.fl_round import RoundStatusEnum
+from app.privacy import format_delta, privacy_accountant
+from app.repositories.facility_repository import FacilityRepository
+from app.repositories.fl_repository import FLRepository, round_pointer
+from app.responses import FastJSONResponse
+from app.schemas.facility import FacilityCreate, FacilityResponse, FacilityUpdate
+from app.schemas.fl_status import (
+    FLClientSchema,
+    FLRoundResponse,
+    PrivacyMetrics,
+    RoundAggregation,
+    RoundHistoryPage,
+    RoundMetrics,
+)
+from app.telemetry import round_eta, telemetry_buffer
 
 router = APIRouter()
 
+# Upper bound on points per client curve
+MAX_METRIC_POINTS = 2000
+
 
 class ClientUpdateRequest(BaseModel):
     """Request model for updating client progress"""
@@ -39,6 +66,17 @@ class CompleteRoundRequest(BaseModel):
     model_accuracy: float
 
 
+class AggregateRoundRequest(BaseModel):
+    """Request model for aggregating a round's model updates"""
+
+    model_accuracy: Optional[float] = None
+
+
+def is_settled_round(fl_round: Optional[FLRoundResponse]) -> bool:
+    """Whether a round response only changes through a commit"""
+    return fl_round is None or fl_round.status != "in-progress"
+
+
 @router.get("/rounds/current", response_model=Optional[FLRoundResponse])
 async def get_current_round(
     db: AsyncSession = Depends(get_db),
@@ -46,19 +84,30 @@ async def get_current_round(
     """
     Get the current active FL round
 
-    Returns the most recent in-progress round, or null if none exists
+    Returns the most recent in-progress round, or the latest round if none
+    is in progress (null if there are no rounds). Only a finished round is
+    served from the response cache; an in-progress round is built on every
+    request, since its buffered client progress and ETA change without a
+    commit.
     """
     repo = FLRepository(db)
-    current_round = await repo.get_current_round()
 
-    if not current_round:
-        # Try to get the latest round (even if completed)
-        latest = await repo.get_latest_round()
-        if not latest:
-            return None
-        return FLRoundResponse.model_validate(latest)
+    async def build() -> Optional[FLRoundResponse]:
+        current_round = await repo.get_current_round()
 
-    return FLRoundResponse.model_validate(current_round)
+        if not current_round:
+            # Try to get the latest round (even if completed)
+            latest = await repo.get_latest_round()
+            if not latest:
+                return None
+            return present_round(FLRoundResponse.model_validate(latest))
+
+        return present_round(FLRoundResponse.model_validate(current_round))
+
+    body = await response_cache.get_or_build(
+        "fl.rounds.current", DataFamily.FL, {}, build, cacheable=is_settled_round
+    )
+    return FastJSONResponse(body)
 
 
 @router.post("/rounds/trigger", response_model=FLRoundResponse, status_code=status.HTTP_201_CREATED)
@@ -68,7 +117,8 @@ async def trigger_fl_round(
     """
     Trigger a new FL round
 
-    Creates a new federated learning round with 6 facility clients
+    Creates a new federated learning round with a client for every
+    registered, FL-eligible facility
     """
     repo = FLRepository(db)
 
@@ -77,6 +127,8 @@ async def trigger_fl_round(
 
     # Create new round
     fl_round = await repo.create_round(next_round_number)
+    await db.commit()
+    round_pointer.created(fl_round.id)
 
     return FLRoundResponse.model_validate(fl_round)
 
@@ -85,7 +137,7 @@ async def trigger_fl_round(
 async def get_all_rounds(
     limit: int = 10,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all FL rounds with pagination
@@ -97,7 +149,32 @@ async def get_all_rounds(
     repo = FLRepository(db)
     rounds = await repo.get_all_rounds(limit=limit, offset=offset)
 
-    return {"rounds": [FLRoundResponse.model_validate(r) for r in rounds]}
+    return FastJSONResponse(
+        {"rounds": [present_round(FLRoundResponse.model_validate(r)) for r in rounds]}
+    )
+
+
+@router.get("/rounds/history", response_model=RoundHistoryPage)
+async def get_round_history(
+    limit: int = 10,
+    before: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get round history summaries, newest first
+
+    Each round has its duration (minutes), active/total client ratio and
+    accuracy change from the previous round, computed in the database.
+
+    Query Parameters:
+    - limit: Number of rounds to return (default: 10)
+    - before: Only rounds with a lower round_number (use next_before from the previous page)
+    """
+    repo = FLRepository(db)
+    rounds = await repo.get_round_history(limit=limit, before=before)
+    next_before = rounds[-1].round_number if len(rounds) == limit else None
+
+    return FastJSONResponse(RoundHistoryPage(rounds=rounds, next_before=next_before))
 
 
 @router.get("/rounds/{round_id}", response_model=FLRoundResponse)
@@ -119,7 +196,35 @@ async def get_round_by_id(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"FL round with id {round_id} not found"
         )
 
-    return FLRoundResponse.model_validate(fl_round)
+    return FastJSONResponse(present_round(FLRoundResponse.model_validate(fl_round)))
+
+
+@router.get("/rounds/{round_id}/metrics", response_model=RoundMetrics)
+async def get_round_metrics(
+    round_id: int,
+    points: int = 200,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get per-client training curves (loss/accuracy by epoch) for an FL round
+
+    Long runs are downsampled in the database by averaging equal-width epoch
+    buckets, so each curve has at most `points` entries.
+
+    Path Parameters:
+    - round_id: ID of the FL round
+
+    Query Parameters:
+    - points: Max points per client curve (default: 200, max: 2000)
+    """
+    repo = FLRepository(db)
+    if not await repo.get_by_id(round_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"FL round with id {round_id} not found"
+        )
+
+    points = max(1, min(points, MAX_METRIC_POINTS))
+    return FastJSONResponse(await repo.get_round_metrics(round_id, points))
 
 
 @router.put("/rounds/{round_id}/progress", response_model=FLRoundResponse)
@@ -136,18 +241,26 @@ async def update_round_progress(
 
     Body:
     - progress: Progress percentage (0-100)
-    - phase: Optional phase (distributing, training, aggregating, complete)
+    - phase: Optional next phase (distributing -> training -> aggregating);
+      rounds are completed through POST /rounds/{round_id}/complete
     """
-    repo = FLRepository(db)
-    fl_round = await repo.update_round_progress(round_id, update_data.progress, update_data.phase)
+    try:
+        fl_round = await round_coordinator.update_progress(
+            db, round_id, update_data.progress, update_data.phase
+        )
+    except InvalidTransition as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     if not fl_round:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"FL round with id {round_id} not found"
         )
+    # Only phase changes are written here; progress is snapshotted periodically
+    if has_pending_writes(db):
+        await db.commit()
 
-    # Emit WebSocket event for real-time update
-    fl_response = FLRoundResponse.model_validate(fl_round)
+    # Emit WebSocket event for real-time update, straight from memory
+    fl_response = present_round(fl_round)
 
     # Log before emitting
     print(f"🔔 Emitting fl_progress event: progress={update_data.progress}%")
@@ -172,15 +285,170 @@ async def complete_round(
     Body:
     - model_accuracy: Final model accuracy
     """
-    repo = FLRepository(db)
-    fl_round = await repo.complete_round(round_id, complete_data.model_accuracy)
+    return await _complete_round(db, round_id, complete_data.model_accuracy)
+
+
+async def _complete_round(
+    db: AsyncSession, round_id: int, model_accuracy: Optional[float]
+) -> FLRoundResponse:
+    """Complete a round, commit, and update the in-process round state"""
+    try:
+        fl_round = await round_coordinator.complete(db, round_id, model_accuracy)
+    except InvalidTransition as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     if not fl_round:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"FL round with id {round_id} not found"
         )
+    await db.commit()
+    round_pointer.completed(fl_round.id)
+    privacy_accountant.record_round(fl_round.id, fl_round.epsilon)
 
-    return FLRoundResponse.model_validate(fl_round)
+    return present_round(FLRoundResponse.model_validate(fl_round))
+
+
+def _require_numpy():
+    if not model_aggregator.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model aggregation requires numpy on this server",
+        )
+
+
+@router.post(
+    "/rounds/{round_id}/updates/{client_id}",
+    response_model=RoundAggregation,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_model_update(
+    round_id: int,
+    client_id: UUID,
+    request: Request,
+    num_samples: int = Query(..., ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Upload a client's model update
+
+    The body is the update's weights as a raw .npy file
+    (application/octet-stream, i.e. the bytes numpy.save writes). It is
+    streamed to disk and folded into the round's sample-weighted average as
+    it arrives; every client's update must have the same shape.
+
+    Path Parameters:
+    - round_id: ID of the FL round
+    - client_id: UUID of the FL client sending the update
+
+    Query Parameters:
+    - num_samples: Training samples behind the update (its FedAvg weight)
+    """
+    _require_numpy()
+    round_status = await FLRepository(db).get_client_round_status(round_id, client_id)
+    if round_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"FL client {client_id} not found in round {round_id}",
+        )
+    if round_status != RoundStatusEnum.in_progress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"FL round {round_id} is {round_status.value}",
+        )
+    if model_aggregator.has_update(round_id, client_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"FL client {client_id} already sent its update",
+        )
+    # Don't hold a pooled connection while the upload streams in
+    await db.rollback()
+
+    try:
+        return await model_aggregator.receive(round_id, client_id, num_samples, request.stream())
+    except AggregationInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except AggregationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+@router.post("/rounds/{round_id}/aggregate", response_model=FLRoundResponse)
+async def aggregate_round(
+    round_id: int,
+    aggregate_data: AggregateRoundRequest = AggregateRoundRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Average the round's model updates (FedAvg) and complete the round
+
+    The aggregated model is served by GET /rounds/{round_id}/model.
+
+    Path Parameters:
+    - round_id: ID of the FL round
+
+    Body:
+    - model_accuracy: Optional accuracy of the aggregated model; defaults to
+      the clients' reported accuracies weighted by their sample counts
+    """
+    _require_numpy()
+    fl_round = await FLRepository(db).get_by_id(round_id)
+    if not fl_round:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"FL round with id {round_id} not found"
+        )
+    if fl_round.status != RoundStatusEnum.in_progress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"FL round {round_id} is {fl_round.status.value}",
+        )
+
+    try:
+        aggregate = await model_aggregator.finalize(round_id)
+    except AggregationInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if aggregate is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No model updates received for FL round {round_id}",
+        )
+
+    model_accuracy = aggregate_data.model_accuracy
+    if model_accuracy is None:
+        clients = present_round(FLRoundResponse.model_validate(fl_round)).clients
+        weighted = [
+            (client.accuracy, aggregate.samples[client.id])
+            for client in clients
+            if client.id in aggregate.samples and client.accuracy is not None
+        ]
+        if weighted:
+            model_accuracy = sum(a * n for a, n in weighted) / sum(n for _, n in weighted)
+
+    # The updates are only dropped once the completion is committed
+    try:
+        fl_response = await _complete_round(db, round_id, model_accuracy)
+    except BaseException:
+        await model_aggregator.abort(round_id)
+        raise
+    await model_aggregator.publish(round_id)
+    return fl_response
+
+
+@router.get("/rounds/{round_id}/model")
+async def download_round_model(round_id: int):
+    """
+    Download a round's aggregated model as a .npy file
+
+    Path Parameters:
+    - round_id: ID of the FL round
+    """
+    path = model_aggregator.model_path(round_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No aggregated model for FL round {round_id}",
+        )
+    return FileResponse(
+        path, media_type="application/octet-stream", filename=f"fl_round_{round_id}_model.npy"
+    )
 
 
 @router.get("/clients", response_model=List[FLClientSchema])
@@ -195,7 +463,9 @@ async def get_all_clients(
     repo = FLRepository(db)
     clients = await repo.get_all_clients()
 
-    return [FLClientSchema.model_validate(client) for client in clients]
+    return FastJSONResponse(
+        [telemetry_buffer.apply(FLClientSchema.model_validate(client)) for client in clients]
+    )
 
 
 @router.get("/clients/{client_id}", response_model=FLClientSchema)
@@ -217,7 +487,7 @@ async def get_client_by_id(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"FL client with id {client_id} not found"
         )
 
-    return FLClientSchema.model_validate(client)
+    return FastJSONResponse(telemetry_buffer.apply(FLClientSchema.model_validate(client)))
 
 
 @router.put("/clients/{client_id}", response_model=FLClientSchema)
@@ -229,6 +499,9 @@ async def update_client_status(
     """
     Update FL client status and progress
 
+    Written immediately; for periodic training reports use
+    POST /clients/{client_id}/telemetry, which batches writes.
+
     Path Parameters:
     - client_id: UUID of the FL client
 
@@ -253,8 +526,124 @@ async def update_client_status(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"FL client with id {client_id} not found"
         )
+    await db.commit()
+    # This write is newer than any buffered report
+    telemetry_buffer.discard(client_id)
+    client_response = FLClientSchema.model_validate(client)
+    round_coordinator.client_updated(client_response)
+    round_eta.observe(client_response)
+
+    return client_response
+
+
+@router.post(
+    "/clients/{client_id}/telemetry",
+    response_model=FLClientSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def report_client_telemetry(
+    client_id: UUID,
+    report: ClientUpdateRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Report FL client training telemetry
+
+    Reports are buffered in memory, keeping only the latest values per
+    client, and written in one batched UPDATE every
+    FL_TELEMETRY_FLUSH_SECONDS. Reads serve the buffered values in between.
+    Returns the client's state including this report.
+
+    Path Parameters:
+    - client_id: UUID of the FL client
+
+    Body:
+    - status: Optional client status (active, delayed, offline)
+    - progress: Optional progress percentage (0-100)
+    - current_epoch: Optional current epoch number
+    - loss: Optional training loss
+    - accuracy: Optional training accuracy
+    """
+    client = await telemetry_buffer.record(
+        db,
+        client_id,
+        status=report.status,
+        progress=report.progress,
+        current_epoch=report.current_epoch,
+        loss=report.loss,
+        accuracy=report.accuracy,
+    )
+
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"FL client with id {client_id} not found"
+        )
+
+    return client
+
+
+@router.get("/facilities", response_model=List[FacilityResponse])
+async def get_facilities(
+    fl_eligible: Optional[bool] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get registered facilities
+
+    Query Parameters:
+    - fl_eligible: Filter by FL round eligibility
+    """
+    repo = FacilityRepository(db)
+    return FastJSONResponse(await repo.get_all(fl_eligible=fl_eligible))
+
+
+@router.post(
+    "/facilities", response_model=List[FacilityResponse], status_code=status.HTTP_201_CREATED
+)
+async def register_facilities(
+    facilities: List[FacilityCreate],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Register facilities for FL rounds
+
+    Takes a list so large deployments register in one request; facilities
+    that already exist are updated. Each new round gets a client for every
+    eligible facility.
+    """
+    repo = FacilityRepository(db)
+    registered = await repo.register(facilities)
+    await db.commit()
+
+    return registered
+
+
+@router.patch("/facilities/{facility_id}", response_model=FacilityResponse)
+async def update_facility(
+    facility_id: str,
+    update_data: FacilityUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Update a facility's name or FL eligibility
+
+    Path Parameters:
+    - facility_id: ID of the facility (e.g. facility_a)
+
+    Body:
+    - name: Optional display name
+    - fl_eligible: Optional eligibility for new FL rounds
+    """
+    repo = FacilityRepository(db)
+    facility = await repo.update(facility_id, update_data.model_dump(exclude_none=True))
+
+    if not facility:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Facility {facility_id} not found"
+        )
+    await db.commit()
 
-    return FLClientSchema.model_validate(client)
+    return facility
 
 
 @router.get("/privacy-metrics", response_model=PrivacyMetrics)
@@ -264,14 +653,22 @@ async def get_privacy_metrics(
     """
     Get privacy metrics for federated learning
 
-    Returns differential privacy parameters and encryption info
+    epsilon is the per-round cost; epsilon_spent is the total over completed
+    rounds under the tightest of basic, advanced and RDP (zCDP) composition,
+    and privacy_budget_remaining is the share of FL_PRIVACY_BUDGET_EPSILON left
     """
-    # For now, return static values
-    # In production, these would be calculated based on actual FL rounds
-    return PrivacyMetrics(
-        epsilon=0.5,
-        delta="10⁻⁵",
-        data_size="~10 MB",
-        encryption="AES-256",
-        privacy_budget_remaining=85.5,
+    await privacy_accountant.load(db)
+
+    return FastJSONResponse(
+        PrivacyMetrics(
+            epsilon=settings.FL_ROUND_EPSILON,
+            delta=format_delta(privacy_accountant.delta),
+            data_size="~10 MB",
+            encryption="AES-256",
+            privacy_budget_remaining=round(privacy_accountant.budget_remaining(), 2),
+            epsilon_spent=round(privacy_accountant.epsilon_spent(), 4),
+            epsilon_budget=privacy_accountant.budget,
+            rounds_composed=privacy_accountant.totals.rounds,
+            composition=privacy_accountant.composition(),
+        )
     )
@@ -18,7 +18,7 @@ async def get_attack_graph():
         WHERE t.detected = true
         RETURN t.id as id, t.name as name, 1.0 as probability
         """
-        current = neo4j_conn.query(current_query)
+        current = await neo4j_conn.read(current_query)
 
         # Get predicted attacks (techniques that current attacks lead to)
         predicted_query = """
@@ -27,7 +27,7 @@ async def get_attack_graph():
         RETURN DISTINCT predicted.id as id, predicted.name as name, 0.85 as probability
         LIMIT 20
         """
-        predicted = neo4j_conn.query(predicted_query)
+        predicted = await neo4j_conn.read(predicted_query)
 
         # Build nodes
         nodes = [
@@ -50,7 +50,7 @@ async def get_attack_graph():
         RETURN DISTINCT source.id as source, target.id as target, r.probability as probability
         LIMIT 50
         """
-        links_data = neo4j_conn.query(links_query)
+        links_data = await neo4j_conn.read(links_query)
 
         # Filter links to only include those between existing nodes
         links = [
@@ -77,7 +77,7 @@ async def get_all_techniques():
         ORDER BY t.id
         LIMIT 100
         """
-        results = neo4j_conn.query(query)
+        results = await neo4j_conn.read(query)
         return [
             TechniqueDetails(
                 id=r["id"],
@@ -103,7 +103,7 @@ async def get_technique_details(technique_id: str):
         RETURN t.id as id, t.name as name, t.description as description,
                t.platforms as platforms, t.tactics as tactics
         """
-        results = neo4j_conn.query(query, {"id": technique_id})
+        results = await neo4j_conn.read(query, {"id": technique_id})
 
         if not results:
             raise HTTPException(status_code=404, detail="Technique not found")
@@ -7,8 +7,10 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.caching import DataFamily, response_cache
+from app.database import get_db, get_read_db
 from app.repositories.prediction_repository import PredictionRepository
+from app.responses import FastJSONResponse
 from app.schemas.prediction import PredictionCreate, PredictionResponse
 
 router = APIRouter()
@@ -19,7 +21,7 @@ async def get_predictions(
     limit: int = 10,
     offset: int = 0,
     validated: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all predictions with filtering
@@ -36,7 +38,9 @@ async def get_predictions(
         validated=validated,
     )
 
-    return {"predictions": [PredictionResponse.model_validate(p) for p in predictions]}
+    return FastJSONResponse(
+        {"predictions": [PredictionResponse.model_validate(p) for p in predictions]}
+    )
 
 
 @router.post("", response_model=PredictionResponse, status_code=status.HTTP_201_CREATED)
@@ -55,6 +59,7 @@ async def create_prediction(
     """
     repo = PredictionRepository(db)
     prediction = await repo.create(prediction_data)
+    await db.commit()
     return PredictionResponse.model_validate(prediction)
 
 
@@ -68,12 +73,15 @@ async def get_latest_prediction(
     Returns the latest prediction or null if none exists
     """
     repo = PredictionRepository(db)
-    prediction = await repo.get_latest()
 
-    if not prediction:
-        return None
+    async def build() -> Optional[PredictionResponse]:
+        prediction = await repo.get_latest()
+        return PredictionResponse.model_validate(prediction) if prediction else None
 
-    return PredictionResponse.model_validate(prediction)
+    body = await response_cache.get_or_build(
+        "predictions.latest", DataFamily.PREDICTIONS, {}, build
+    )
+    return FastJSONResponse(body)
 
 
 @router.get("/{prediction_id}", response_model=PredictionResponse)
@@ -96,7 +104,7 @@ async def get_prediction_by_id(
             detail=f"Prediction with id {prediction_id} not found",
         )
 
-    return PredictionResponse.model_validate(prediction)
+    return FastJSONResponse(PredictionResponse.model_validate(prediction))
 
 
 @router.post("/{prediction_id}/validate", response_model=PredictionResponse)
@@ -121,5 +129,6 @@ async def validate_prediction(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Prediction with id {prediction_id} not found",
         )
+    await db.commit()
 
-    return PredictionResponse.model_validate(prediction)
+    return prediction
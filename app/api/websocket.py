@@ -2,30 +2,89 @@
 WebSocket API Endpoint
 Handles real-time communication with clients
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import List, Optional
 
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from app.events.deltas import fl_progress_tracker
+from app.events.emitter import EventType
+from app.events.snapshots import build_room_snapshot
+from app.websocket.codecs import get_codec
+from app.websocket.filters import compile_filter
 from app.websocket.manager import manager
 
 router = APIRouter()
 
 
+async def send_catch_up(websocket: WebSocket, room: str, seq: int, missed: Optional[List[dict]]):
+    """
+    Catch a resubscribing client up on a room
+
+    Replays the missed events, or sends a snapshot of the room as of seq
+    when the gap was too large to replay.
+    """
+    if missed is not None:
+        for message in missed:
+            await manager.send_personal_message(websocket, message)
+        return
+
+    snapshot = await build_room_snapshot(room)
+    await manager.send_personal_message(
+        websocket,
+        {"type": "snapshot", "room": room, "seq": seq, "epoch": manager.epoch, "data": snapshot},
+    )
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time communication
     Supports room-based subscriptions
+
+    Subscriptions may carry server-side filters, e.g.
+    {"action": "subscribe", "room": "alerts",
+     "filters": {"facility_id": ["facility_a"], "min_severity": "high", "attack_type": "T0846"}}
+
+    Subscribing with "deltas": true switches state events such as fl_progress
+    to changed-fields-only updates; the current state is sent on subscribe.
+
+    Room events carry "room" and "seq". To resume after a reconnect, send
+    {"action": "subscribe", "room": ..., "since_seq": <last seq>, "epoch": <epoch>}
+    and the server replays missed events or sends a "snapshot" message.
+
+    Query Parameters:
+    - encoding: Wire format for server messages (json, msgpack; default: json)
+    - compression: Per-message compression (none, deflate; default: none)
+
+    Client actions are always sent as JSON text frames.
     """
     await websocket.accept()
 
+    try:
+        codec = get_codec(
+            websocket.query_params.get("encoding", "json"),
+            websocket.query_params.get("compression", "none"),
+        )
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+        return
+
     # Add to general connections
-    manager.connect(websocket)
+    manager.connect(websocket, codec=codec)
+
+    async def send(message: dict):
+        await manager.send_personal_message(websocket, message)
 
     # Send welcome message
-    await websocket.send_json(
+    await send(
         {
             "type": "connection",
             "status": "connected",
             "message": "Connected to ICS Threat Detection",
+            "epoch": manager.epoch,
+            "encoding": codec.encoding,
+            "compression": codec.compression,
         }
     )
 
@@ -38,29 +97,73 @@ async def websocket_endpoint(websocket: WebSocket):
             if action == "subscribe":
                 # Subscribe to a room
                 room = data.get("room")
+                since_seq = data.get("since_seq")
+                if since_seq is not None and (
+                    not isinstance(since_seq, int) or isinstance(since_seq, bool)
+                ):
+                    await send({"type": "error", "message": "since_seq must be an integer"})
+                    continue
+
+                try:
+                    subscription_filter = compile_filter(data.get("filters"))
+                except ValueError as e:
+                    await send({"type": "error", "message": str(e)})
+                    continue
+
                 if room:
-                    manager.connect(websocket, room=room)
-                    await websocket.send_json(
-                        {"type": "subscription", "status": "subscribed", "room": room}
+                    deltas = data.get("deltas") is True
+                    manager.connect(
+                        websocket,
+                        room=room,
+                        subscription_filter=subscription_filter,
+                        deltas=deltas,
                     )
 
+                    # Capture catch-up state before awaiting so no live event slips between
+                    seq = manager.get_room_seq(room)
+                    keyframe = fl_progress_tracker.get_state(room) if deltas else None
+                    if since_seq is not None:
+                        missed = manager.get_missed_events(
+                            room, since_seq, data.get("epoch"), subscription_filter
+                        )
+
+                    await send(
+                        {
+                            "type": "subscription",
+                            "status": "subscribed",
+                            "room": room,
+                            "seq": seq,
+                            "epoch": manager.epoch,
+                        }
+                    )
+
+                    if since_seq is not None:
+                        await send_catch_up(websocket, room, seq, missed)
+                    elif keyframe is not None:
+                        # Delta subscribers need a base state to apply deltas to
+                        await send(
+                            {
+                                "type": EventType.FL_PROGRESS,
+                                "data": keyframe,
+                                "room": room,
+                                "seq": seq,
+                            }
+                        )
+
             elif action == "unsubscribe":
                 # Unsubscribe from a room
                 room = data.get("room")
                 if room and room in manager.rooms:
-                    if websocket in manager.rooms[room]:
-                        manager.rooms[room].remove(websocket)
-                    await websocket.send_json(
-                        {"type": "subscription", "status": "unsubscribed", "room": room}
-                    )
+                    manager.leave_room(websocket, room)
+                    await send({"type": "subscription", "status": "unsubscribed", "room": room})
 
             elif action == "ping":
                 # Respond to ping
-                await websocket.send_json({"type": "pong"})
+                await send({"type": "pong"})
 
             else:
                 # Invalid action
-                await websocket.send_json({"type": "error", "message": f"Unknown action: {action}"})
+                await send({"type": "error", "message": f"Unknown action: {action}"})
 
     except WebSocketDisconnect:
         # Clean up on disconnect
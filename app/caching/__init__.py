@@ -0,0 +1,17 @@
+# HTTP and query caching
+from app.caching.cache import ResponseCache, response_cache
+from app.caching.conditional import CACHE_POLICIES, CachePolicy, ConditionalRequestMiddleware
+from app.caching.single_flight import SingleFlight
+from app.caching.versions import DataFamily, DataVersions, data_versions
+
+__all__ = [
+    "CACHE_POLICIES",
+    "CachePolicy",
+    "ConditionalRequestMiddleware",
+    "DataFamily",
+    "DataVersions",
+    "ResponseCache",
+    "SingleFlight",
+    "data_versions",
+    "response_cache",
+]
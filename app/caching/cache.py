@@ -0,0 +1,267 @@
+"""
+Response Cache
+Caches the encoded JSON of hot dashboard queries, keyed by route, data
+version and normalized query parameters. A commit that writes a family's
+tables bumps its version, so every cached response built from the old data
+is invalidated at once and the next poll rebuilds it with one query.
+Concurrent misses for the same key share that one query.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from app import database
+from app.caching.single_flight import SingleFlight
+from app.caching.versions import TABLE_FAMILIES, DataVersions, data_versions
+from app.config import settings
+from app.database import commit_hooks
+from app.responses import dump_json
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - optional dependency
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    """Canonical query string: sorted, without unset parameters"""
+    return urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry TTL"""
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        versions: DataVersions = data_versions,
+    ):
+        self.max_entries = max_entries
+        self.versions = versions
+        # key -> (expires_at, body), least recently used first
+        self.entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.family_keys: Dict[str, Set[str]] = {}
+        self.evictions = 0
+
+    async def version(self, family: str) -> str:
+        return f"{self.versions.epoch}.{self.versions.get(family)}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, body = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return body
+
+    async def set(self, family: str, key: str, body: bytes, ttl: float):
+        self.entries[key] = (time.monotonic() + ttl, body)
+        self.entries.move_to_end(key)
+        self.family_keys.setdefault(family, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, family: str):
+        for key in self.family_keys.pop(family, set()):
+            self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.family_keys.clear()
+
+    def size(self) -> int:
+        return len(self.entries)
+
+    def _remove(self, key: str):
+        self.entries.pop(key, None)
+        for keys in self.family_keys.values():
+            keys.discard(key)
+
+
+class RedisCacheBackend:
+    """
+    Redis-backed entries shared by all API workers
+
+    Family versions are Redis counters, incremented after each local commit
+    that writes the family, so workers invalidate each other. The increment
+    is sent right after the commit without blocking it; until it lands
+    (typically well under a millisecond) other workers may serve the previous
+    response.
+    """
+
+    name = "redis"
+    PREFIX = "ics:response-cache"
+
+    def __init__(self, url: str = settings.REDIS_URL):
+        if redis_asyncio is None:
+            raise RuntimeError("redis is not installed; use RESPONSE_CACHE_BACKEND=memory")
+        self.client = redis_asyncio.from_url(url)
+        self._pending: Set[asyncio.Task] = set()
+
+    async def version(self, family: str) -> str:
+        value = await self.client.get(f"{self.PREFIX}:version:{family}")
+        return value.decode() if value else "0"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.PREFIX}:{key}")
+
+    async def set(self, family: str, key: str, body: bytes, ttl: float):
+        await self.client.set(f"{self.PREFIX}:{key}", body, px=int(ttl * 1000))
+
+    def invalidate(self, family: str):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.client.incr(f"{self.PREFIX}:version:{family}"))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def clear(self):
+        # Shared entries are left to expire by TTL
+        pass
+
+    def size(self) -> int:
+        # Not tracked for the shared backend
+        return -1
+
+
+class RouteMetrics:
+    """Hit/miss counters for one cached route"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        # Misses that waited for an identical in-flight build
+        self.coalesced = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "bypasses": self.bypasses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    """Cache of encoded responses for read routes"""
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = settings.RESPONSE_CACHE_TTL_SECONDS,
+        versions: DataVersions = data_versions,
+    ):
+        self.backend = backend or MemoryCacheBackend(versions=versions)
+        self.ttl = ttl
+        self.versions = versions
+        self.metrics: Dict[str, RouteMetrics] = {}
+        self.flights = SingleFlight()
+
+    async def get_or_build(
+        self,
+        route: str,
+        family: str,
+        params: Dict[str, Any],
+        build: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> bytes:
+        """
+        Get a route's cached JSON for these parameters, building it on a miss
+
+        Built results failing `cacheable` (e.g. state that changes without a
+        commit) are served, and shared with concurrent misses, but not stored.
+
+        Bypassed (built, not stored) while a read replica may still lag behind
+        the family's latest write, so replica reads never fill the cache with
+        data older than the version they're filed under. Bypassed builds are
+        not coalesced either, since callers may be reading different databases.
+
+        Concurrent misses for the same key (every dashboard refetching after
+        an alert event) wait for the first caller's build instead of running
+        the query again. The key includes the family version, so a build
+        started before a write is never shared with callers arriving after it.
+        """
+        metrics = self.metrics.setdefault(route, RouteMetrics())
+        if self.ttl <= 0 or self._replica_may_lag(family):
+            metrics.bypasses += 1
+            return dump_json(await build())
+
+        key = f"{route}:{family}:{await self.backend.version(family)}:{normalize_params(params)}"
+        body = await self.backend.get(key)
+        if body is not None:
+            metrics.hits += 1
+            return body
+
+        led = False
+
+        async def fill() -> bytes:
+            nonlocal led
+            led = True
+            metrics.misses += 1
+            result = await build()
+            body = dump_json(result)
+            if cacheable is None or cacheable(result):
+                await self.backend.set(family, key, body, self.ttl)
+            return body
+
+        body = await self.flights.do(key, fill)
+        if not led:
+            metrics.coalesced += 1
+        return body
+
+    def invalidate_tables(self, tables: Set[str]):
+        """Invalidate the families of tables written by a commit"""
+        for family in {TABLE_FAMILIES[t] for t in tables if t in TABLE_FAMILIES}:
+            self.backend.invalidate(family)
+
+    def clear(self):
+        """Drop all entries and counters"""
+        self.backend.clear()
+        self.metrics.clear()
+
+    def status(self) -> dict:
+        """Backend, entry count and per-route hit/miss counters"""
+        return {
+            "backend": self.backend.name,
+            "ttl_seconds": self.ttl,
+            "entries": self.backend.size(),
+            "in_flight": self.flights.in_flight(),
+            "routes": {route: m.snapshot() for route, m in self.metrics.items()},
+        }
+
+    def _replica_may_lag(self, family: str) -> bool:
+        if database.read_engine is database.engine:
+            return False
+        return self.versions.age(family) < settings.DB_READ_STICKY_SECONDS
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the cache for the configured backend"""
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        try:
+            return ResponseCache(RedisCacheBackend())
+        except RuntimeError as e:
+            logger.warning(f"{e}; falling back to the in-process response cache")
+    return ResponseCache()
+
+
+# Global response cache
+response_cache = create_response_cache()
+commit_hooks.append(response_cache.invalidate_tables)
@@ -0,0 +1,176 @@
+"""
+Conditional Requests
+ASGI middleware that tags read-mostly GET routes with an ETag and
+Last-Modified derived from data versions, answers matching If-None-Match /
+If-Modified-Since requests with 304 before the route (and the DB) is
+touched, and adds per-route Cache-Control hints
+"""
+import json
+import re
+from dataclasses import dataclass
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import database
+from app.caching.versions import DataFamily, DataVersions, data_versions
+from app.config import settings
+
+UUID_PATTERN = "[0-9a-fA-F-]{36}"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Which data a route's response depends on, and how long clients may reuse it"""
+
+    family: str
+    cache_control: str = "private, no-cache"
+    # Only tag responses whose body passes this check (the body is buffered
+    # to decide, so keep it to small payloads). Untagged responses never get
+    # validators, so clients never revalidate them into a 304.
+    taggable: Optional[Callable[[bytes], bool]] = None
+
+
+def is_completed_round(body: bytes) -> bool:
+    """Whether a round response is final; active rounds carry a live ETA"""
+    try:
+        return json.loads(body).get("status") == "completed"
+    except (ValueError, AttributeError):
+        return False
+
+
+# Route path pattern -> policy, matched against the whole path
+CACHE_POLICIES: List[Tuple[str, CachePolicy]] = [
+    ("/api/mitre/techniques", CachePolicy(DataFamily.MITRE, "public, max-age=3600")),
+    ("/api/fl/privacy-metrics", CachePolicy(DataFamily.FL)),
+    ("/api/fl/rounds/history", CachePolicy(DataFamily.FL)),
+    (r"/api/fl/rounds/\d+", CachePolicy(DataFamily.FL, taggable=is_completed_round)),
+    (r"/api/fl/rounds/\d+/metrics", CachePolicy(DataFamily.FL)),
+    (f"/api/predictions/{UUID_PATTERN}", CachePolicy(DataFamily.PREDICTIONS)),
+]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ConditionalRequestMiddleware:
+    """
+    Conditional GET/HEAD handling for routes with a CachePolicy
+
+    Validators are computed before the route runs, so a write committed while
+    the response is being built only costs the client one extra 200. With a
+    read replica, validators are withheld while a family changed more recently
+    than DB_READ_STICKY_SECONDS, so a lagging replica read is never tagged as
+    the new version.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        policies: Sequence[Tuple[str, CachePolicy]] = CACHE_POLICIES,
+        versions: DataVersions = data_versions,
+    ):
+        self.app = app
+        self.policies = [(re.compile(pattern), policy) for pattern, policy in policies]
+        self.versions = versions
+
+    def match(self, path: str) -> Optional[CachePolicy]:
+        """Get the policy for a request path, if any"""
+        for pattern, policy in self.policies:
+            if pattern.fullmatch(path):
+                return policy
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.match(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache_headers = {"Cache-Control": policy.cache_control}
+        validators = {}
+        if not self._replica_may_lag(policy.family):
+            etag = self.versions.etag(policy.family)
+            last_modified = self.versions.last_modified(policy.family)
+            validators["ETag"] = etag
+            validators["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+            # A client only holds validators for this path if its response was
+            # taggable, and a taggable response stays so until the data changes
+            if self._not_modified(Headers(scope=scope), etag, last_modified):
+                response = Response(status_code=304, headers={**cache_headers, **validators})
+                await response(scope, receive, send)
+                return
+
+        def add_headers(message: Message, tagged: bool):
+            headers = MutableHeaders(scope=message)
+            for name, value in {**cache_headers, **(validators if tagged else {})}.items():
+                headers[name] = value
+
+        if policy.taggable is None:
+
+            async def send_with_cache_headers(message: Message):
+                if message["type"] == "http.response.start" and message["status"] == 200:
+                    add_headers(message, tagged=True)
+                await send(message)
+
+            await self.app(scope, receive, send_with_cache_headers)
+            return
+
+        # A 200 start message is held back until its body has been checked
+        start: Optional[Message] = None
+        body: List[bytes] = []
+
+        async def send_when_checked(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            payload = b"".join(body)
+            add_headers(start, tagged=policy.taggable(payload))
+            await send(start)
+            await send({"type": "http.response.body", "body": payload})
+
+        await self.app(scope, receive, send_when_checked)
+
+    def _replica_may_lag(self, family: str) -> bool:
+        if database.read_engine is database.engine:
+            return False
+        return self.versions.age(family) < settings.DB_READ_STICKY_SECONDS
+
+    @staticmethod
+    def _not_modified(headers: Headers, etag: str, last_modified) -> bool:
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            return etag_matches(if_none_match, etag)
+
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return last_modified <= since
@@ -0,0 +1,74 @@
+"""
+Single Flight
+Coalesces identical concurrent reads: while a call for a key is in flight,
+later callers with the same key await its result instead of issuing the
+same query again. Nothing is kept once the call finishes.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    In-flight call registry keyed by query
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    before it finishes share its result or exception. Results are shared
+    as-is, so only coalesce calls returning values nobody mutates (encoded
+    bodies, plain rows). Keys must change when the data does (include the
+    data version), so a call started before a write is never handed to a
+    caller that arrived after it.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or wait for the identical call already in flight"""
+        while True:
+            future = self.calls.get(key)
+            if future is None:
+                break
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # This caller was cancelled, not the leader
+                    raise
+                # The leader's request went away; retry, possibly as the new leader
+                continue
+            self.shared += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self.calls[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited isn't logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
+
+    def in_flight(self) -> int:
+        """Number of keys currently being fetched"""
+        return len(self.calls)
+
+    def status(self) -> dict:
+        """Leader/shared call counters"""
+        return {
+            "in_flight": self.in_flight(),
+            "leaders": self.leaders,
+            "shared": self.shared,
+        }
@@ -0,0 +1,94 @@
+"""
+Data Versions
+Per-family version counters bumped whenever a commit writes one of the
+family's tables, used to validate cached responses without touching the DB
+"""
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable
+
+from app.database import commit_hooks
+
+
+class DataFamily:
+    """Data family constants"""
+
+    ALERTS = "alerts"
+    FL = "fl"
+    PREDICTIONS = "predictions"
+    # Neo4j ATT&CK data, only changed by the offline import script
+    MITRE = "mitre"
+
+
+# Which family each table belongs to
+TABLE_FAMILIES: Dict[str, str] = {
+    "alerts": DataFamily.ALERTS,
+    "alert_sources": DataFamily.ALERTS,
+    "fl_rounds": DataFamily.FL,
+    "fl_clients": DataFamily.FL,
+    "fl_client_metrics": DataFamily.FL,
+    "facilities": DataFamily.FL,
+    "predictions": DataFamily.PREDICTIONS,
+    "predicted_techniques": DataFamily.PREDICTIONS,
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class DataVersions:
+    """
+    Version counter and last-modified time per data family
+
+    Versions live in this process; the epoch makes tags from a previous run
+    (or another worker) never match. Writes committed by another process
+    (other workers, scripts) are not seen, so run a single worker when
+    relying on conditional requests.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.started = _now()
+        self.versions: Dict[str, int] = {}
+        self.modified: Dict[str, datetime] = {}
+        # time.monotonic() of each family's last change
+        self.changed_at: Dict[str, float] = {}
+
+    def get(self, family: str) -> int:
+        """Get a family's current version (0 until its first write)"""
+        return self.versions.get(family, 0)
+
+    def last_modified(self, family: str) -> datetime:
+        """Get when a family last changed (whole seconds, UTC)"""
+        return self.modified.get(family, self.started)
+
+    def age(self, family: str) -> float:
+        """Seconds since a family last changed (inf if not since startup)"""
+        changed_at = self.changed_at.get(family)
+        return time.monotonic() - changed_at if changed_at is not None else math.inf
+
+    def etag(self, family: str) -> str:
+        """Get a weak ETag for responses built from a family's data"""
+        return f'W/"{self.epoch}-{family}-{self.get(family)}"'
+
+    def bump(self, family: str):
+        """Record that a family's data changed"""
+        self.versions[family] = self.get(family) + 1
+        self.changed_at[family] = time.monotonic()
+        # Last-Modified has one-second resolution; keep it strictly increasing
+        # so a second write within the same second is still seen as modified
+        previous = self.last_modified(family)
+        self.modified[family] = max(_now(), previous + timedelta(seconds=1))
+
+    def bump_tables(self, tables: Iterable[str]):
+        """Bump the families of the written tables"""
+        for family in {TABLE_FAMILIES[t] for t in tables if t in TABLE_FAMILIES}:
+            self.bump(family)
+
+
+# Global data versions, bumped after each commit that writes a tracked table
+data_versions = DataVersions()
+commit_hooks.append(data_versions.bump_tables)
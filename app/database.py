@@ -1,36 +1,193 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import declarative_base
+from itertools import chain
+from typing import Callable, Dict, List, Set
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session, declarative_base
 
 from app.config import settings
+from app.db_pool import PoolMetrics, instrumented_pool_class
+
+# Pool metrics per engine, exposed via GET /db/pool/status
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def create_engine_for(url: str, name: str) -> AsyncEngine:
+    """Create an async engine with the configured, instrumented pool"""
+    options: dict = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    # SQLite (development only) keeps SQLAlchemy's default pool
+    if not url.startswith("sqlite"):
+        metrics = pool_metrics.setdefault(name, PoolMetrics(settings.DB_MAX_OVERFLOW))
+        options.update(
+            poolclass=instrumented_pool_class(metrics),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        if "+asyncpg" in url:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+            }
+
+    return create_async_engine(url, **options)
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DB_ECHO,
-    future=True,
-    pool_pre_ping=True,
+engine = create_engine_for(settings.DATABASE_URL, "primary")
+
+# Read-only engine for a streaming replica; falls back to the primary
+read_engine = (
+    create_engine_for(settings.DATABASE_READ_URL, "replica")
+    if settings.DATABASE_READ_URL
+    else engine
 )
 
+# Session.info key holding the tables the current transaction has written
+CHANGED_TABLES = "changed_tables"
+
+# Called with the written table names after each commit that wrote something
+# (e.g. to bump cache versions)
+commit_hooks: List[Callable[[Set[str]], None]] = []
+
+
+class WriteTrackingSession(Session):
+    """Session that records which tables its transaction flushed or executed DML on"""
+
+
+def _changed_tables(session: Session) -> Set[str]:
+    return session.info.setdefault(CHANGED_TABLES, set())
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _flushed(session: Session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    tables = _changed_tables(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tables.add(obj.__table__.name)
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _executed(orm_execute_state: ORMExecuteState):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table  # type: ignore[attr-defined]
+        _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _committed(session: Session):
+    tables = session.info.pop(CHANGED_TABLES, None)
+    if tables:
+        for hook in commit_hooks:
+            hook(tables)
+
+
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _rolled_back(session: Session):
+    session.info.pop(CHANGED_TABLES, None)
+
+
+def has_pending_writes(session: AsyncSession) -> bool:
+    """Whether the session has changes that still need a commit"""
+    return bool(session.new or session.dirty or session.deleted or session.info.get(CHANGED_TABLES))
+
+
 # Create session maker
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=WriteTrackingSession,
     expire_on_commit=False,
 )
 
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+# Cookie set after a write so the same client reads its own writes from the primary
+READ_PRIMARY_COOKIE = "ics_read_primary"
+# Header clients can send to force a consistent read from the primary
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 # Base class for models
 Base = declarative_base()
 
 
+def get_pool_status() -> Dict[str, dict]:
+    """Pool state and counters for each engine"""
+    engines = {"primary": engine, "replica": read_engine}
+    return {
+        name: pool_metrics[name].snapshot(eng.pool)
+        for name, eng in engines.items()
+        if name in pool_metrics
+    }
+
+
+def use_primary_for_read(request: Request) -> bool:
+    """
+    Read routing policy
+
+    Reads go to the replica unless none is configured, the client wrote
+    recently (read-your-writes stickiness), or it asked for strong consistency.
+    """
+    if read_engine is engine:
+        return True
+    if request.cookies.get(READ_PRIMARY_COOKIE):
+        return True
+    return request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "strong"
+
+
 # Dependency for FastAPI
-async def get_db():
-    """Database session dependency"""
+async def get_db(request: Request, response: Response):
+    """
+    Database session dependency
+
+    Repositories only flush; write endpoints commit once before emitting
+    events and responding. Anything still uncommitted when the request ends
+    is committed here, and read-only requests skip the COMMIT round-trip.
+    """
+    if request.method not in SAFE_METHODS and settings.DB_READ_STICKY_SECONDS > 0:
+        # Pin this client's reads to the primary until the replica has caught up
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.DB_READ_STICKY_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if has_pending_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request):
+    """Read-only database session dependency, routed to the replica when possible"""
+    session_maker = async_session_maker if use_primary_for_read(request) else read_session_maker
+    async with session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
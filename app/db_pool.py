@@ -0,0 +1,102 @@
+"""
+Instrumented SQLAlchemy connection pool
+Tracks checkouts, checkout wait time and overflow usage so the pool can be
+sized from data (see GET /db/pool/status)
+"""
+import time
+from typing import Optional, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolMetrics:
+    """Counters for one engine's pool"""
+
+    # Below this a checkout is considered served from idle connections
+    WAIT_THRESHOLD_SECONDS = 0.001
+
+    def __init__(self, max_overflow: Optional[int] = None):
+        # Configured overflow limit, reported with the pool state
+        self.max_overflow = max_overflow
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        # Checkouts that had to wait more than WAIT_THRESHOLD_SECONDS
+        self.waited_checkouts = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def record_checkout(self, pool: "InstrumentedAsyncQueuePool", wait_seconds: float):
+        self.checkouts += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        if wait_seconds > self.WAIT_THRESHOLD_SECONDS:
+            self.waited_checkouts += 1
+        self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+        self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+    def snapshot(self, pool: Optional[Pool] = None) -> dict:
+        """Current pool state plus cumulative counters"""
+        status: dict = {}
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            status = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": self.max_overflow,
+                "timeout_seconds": pool.timeout(),
+            }
+
+        avg_wait = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+        status.update(
+            {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "waited_checkouts": self.waited_checkouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": max(self.peak_overflow, 0),
+            }
+        )
+        return status
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports into a PoolMetrics instance"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_checkout(self, time.perf_counter() - start)
+        return record
+
+    def _do_return_conn(self, record):
+        self.metrics.checkins += 1
+        super()._do_return_conn(record)
+
+    def _create_connection(self):
+        self.metrics.connects += 1
+        return super()._create_connection()
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> Type[InstrumentedAsyncQueuePool]:
+    """
+    Build a pool class bound to a metrics instance
+
+    Bound at class level so the metrics survive pool.recreate() (engine.dispose()).
+    """
+    return type("InstrumentedAsyncQueuePool", (InstrumentedAsyncQueuePool,), {"metrics": metrics})
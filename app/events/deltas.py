@@ -0,0 +1,102 @@
+"""
+Delta Tracking for WebSocket State Events
+Tracks the last state sent per room so repeated state events (e.g. FL round
+progress) can be sent as changed fields only
+"""
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+
+def _client_key(client: dict) -> Any:
+    return client.get("id", client.get("facility_id"))
+
+
+def _round_key(state: dict) -> Any:
+    return state.get("id", state.get("round_id"))
+
+
+def _copy_state(state: dict) -> dict:
+    copied = dict(state)
+    if isinstance(state.get("clients"), list):
+        copied["clients"] = [dict(client) for client in state["clients"]]
+    return copied
+
+
+class DeltaTracker:
+    """
+    Computes deltas between consecutive states sent to a room
+
+    A full keyframe is due for the first state of a room, whenever the round
+    changes, and every keyframe_interval states, so clients never drift far
+    from the server's view.
+    """
+
+    def __init__(self, keyframe_interval: int = settings.WS_FL_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.last_state: Dict[str, dict] = {}
+        self.since_keyframe: Dict[str, int] = {}
+
+    def get_state(self, room: str) -> Optional[dict]:
+        """Get the last full state sent to a room"""
+        return self.last_state.get(room)
+
+    def diff(self, room: str, state: dict) -> Optional[dict]:
+        """
+        Record the state sent to a room and return its delta
+
+        Returns None when a full keyframe should be sent instead. The delta
+        holds the round key, the changed top-level fields, and for "clients"
+        only the clients that changed (with their id and changed fields) plus
+        the ids of removed clients.
+        """
+        previous = self.last_state.get(room)
+        self.last_state[room] = _copy_state(state)
+
+        count = self.since_keyframe.get(room, 0) + 1
+        if (
+            previous is None
+            or _round_key(previous) != _round_key(state)
+            or count >= self.keyframe_interval
+        ):
+            self.since_keyframe[room] = 0
+            return None
+        self.since_keyframe[room] = count
+
+        changed = {
+            key: value
+            for key, value in state.items()
+            if key != "clients" and (key not in previous or previous[key] != value)
+        }
+        removed = [key for key in previous if key not in state]
+
+        delta: dict = {"id": _round_key(state), "changed": changed}
+        if removed:
+            delta["removed"] = removed
+
+        if "clients" in state or "clients" in previous:
+            previous_clients = {_client_key(c): c for c in previous.get("clients") or []}
+            current_keys = set()
+            client_changes: List[dict] = []
+
+            for client in state.get("clients") or []:
+                key = _client_key(client)
+                current_keys.add(key)
+                before = previous_clients.get(key)
+                if before is None:
+                    client_changes.append(dict(client))
+                    continue
+                fields = {k: v for k, v in client.items() if k not in before or before[k] != v}
+                if fields:
+                    client_changes.append({"id": key, **fields})
+
+            delta["clients"] = client_changes
+            removed_clients = [key for key in previous_clients if key not in current_keys]
+            if removed_clients:
+                delta["removed_clients"] = removed_clients
+
+        return delta
+
+
+# Last fl_progress state per room
+fl_progress_tracker = DeltaTracker()
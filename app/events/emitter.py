@@ -4,6 +4,7 @@ Provides functions to emit events to connected clients
 """
 import logging
 
+from app.events.deltas import fl_progress_tracker
 from app.websocket.manager import manager
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,7 @@ class EventType:
     ALERT_CREATED = "alert_created"
     ALERT_UPDATED = "alert_updated"
     FL_PROGRESS = "fl_progress"
+    FL_PROGRESS_DELTA = "fl_progress_delta"
     ATTACK_DETECTED = "attack_detected"
     DASHBOARD_UPDATE = "dashboard_update"
 
@@ -70,15 +72,21 @@ async def emit_fl_progress(progress_data: dict):
     """
     Emit fl_progress event to FL status room AND dashboard room
     Called when FL training progress updates
+
+    Clients subscribed with "deltas": true receive fl_progress_delta events
+    carrying only the changed fields, with a full fl_progress keyframe
+    periodically and whenever the round changes.
     """
     try:
         message = {"type": EventType.FL_PROGRESS, "data": progress_data}
 
-        # Send to FL status page
-        await manager.broadcast_to_room(Room.FL_STATUS, message)
-
-        # Send to dashboard page
-        await manager.broadcast_to_room(Room.DASHBOARD, message)
+        for room in (Room.FL_STATUS, Room.DASHBOARD):
+            delta = fl_progress_tracker.diff(room, progress_data)
+            delta_message = (
+                {"type": EventType.FL_PROGRESS_DELTA, "data": delta} if delta is not None else None
+            )
+            # Send to FL status page, then dashboard page
+            await manager.broadcast_to_room(room, message, delta=delta_message)
 
         round_id = progress_data.get("round_id")
         logger.info(f"Emitted fl_progress event to fl-status & dashboard: Round {round_id}")
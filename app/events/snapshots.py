@@ -0,0 +1,80 @@
+"""
+Room Snapshots for WebSocket Resync
+Builds the current state of a room for clients whose missed events
+are no longer in the replay buffer
+"""
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.events.emitter import Room
+from app.fl import present_round
+from app.repositories.alert_repository import AlertRepository
+from app.repositories.fl_repository import FLRepository
+from app.schemas.alert import AlertResponse
+from app.schemas.fl_status import FLRoundResponse
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ALERTS_LIMIT = 10
+
+
+async def _alerts_snapshot(db: AsyncSession) -> dict:
+    """First page of alerts plus statistics, as served by /api/alerts"""
+    repo = AlertRepository(db)
+    alerts, total = await repo.get_all(page=1, limit=SNAPSHOT_ALERTS_LIMIT)
+    stats = await repo.get_stats()
+    return {
+        "alerts": [AlertResponse.model_validate(a).model_dump(mode="json") for a in alerts],
+        "total": total,
+        "alertStats": stats.model_dump(mode="json"),
+    }
+
+
+async def _fl_round_snapshot(db: AsyncSession) -> Optional[dict]:
+    """Current FL round, as served by /api/fl/rounds/current"""
+    repo = FLRepository(db)
+    fl_round = await repo.get_current_round() or await repo.get_latest_round()
+    if not fl_round:
+        return None
+    return present_round(FLRoundResponse.model_validate(fl_round)).model_dump(mode="json")
+
+
+async def _fl_status_snapshot(db: AsyncSession) -> dict:
+    return {"round": await _fl_round_snapshot(db)}
+
+
+async def _dashboard_snapshot(db: AsyncSession) -> dict:
+    stats = await AlertRepository(db).get_stats()
+    return {
+        "alertStats": stats.model_dump(mode="json"),
+        "round": await _fl_round_snapshot(db),
+    }
+
+
+SNAPSHOT_PROVIDERS: Dict[str, Callable[[AsyncSession], Awaitable[Optional[dict]]]] = {
+    Room.ALERTS: _alerts_snapshot,
+    Room.FL_STATUS: _fl_status_snapshot,
+    Room.DASHBOARD: _dashboard_snapshot,
+}
+
+
+async def build_room_snapshot(room: str) -> Optional[dict]:
+    """
+    Build a snapshot of a room's current state
+
+    Returns None for rooms without a provider (or on error); clients should
+    then refetch that page's data over REST.
+    """
+    provider = SNAPSHOT_PROVIDERS.get(room)
+    if provider is None:
+        return None
+
+    try:
+        async with async_session_maker() as db:
+            return await provider(db)
+    except Exception as e:
+        logger.error(f"Error building snapshot for room {room}: {e}")
+        return None
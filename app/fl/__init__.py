@@ -0,0 +1,19 @@
+# FL round coordination and model aggregation
+from app.fl.aggregation import (
+    AggregationError,
+    AggregationInProgress,
+    ModelAggregator,
+    model_aggregator,
+)
+from app.fl.coordinator import InvalidTransition, RoundCoordinator, present_round, round_coordinator
+
+__all__ = [
+    "AggregationError",
+    "AggregationInProgress",
+    "InvalidTransition",
+    "ModelAggregator",
+    "RoundCoordinator",
+    "model_aggregator",
+    "present_round",
+    "round_coordinator",
+]
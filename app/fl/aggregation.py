@@ -0,0 +1,230 @@
+"""
+Model Update Aggregation
+Federated averaging (FedAvg) of client model updates. Each update is an
+.npy array streamed to disk as it is uploaded, then folded into a running
+sum weighted by the client's sample count, so memory holds one running sum
+per round and a chunk of one update, never every client's model at once.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+from uuid import UUID, uuid4
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Elements folded per step; bounds the temporary each step allocates
+FOLD_CHUNK_ELEMENTS = 1 << 20
+
+GLOBAL_MODEL_FILE = "global.npy"
+# Aggregated model written but not yet published (the round isn't completed)
+PENDING_MODEL_FILE = "global.npy.pending"
+
+
+class AggregationError(ValueError):
+    """An update that can't be folded into the round's model"""
+
+
+class AggregationInProgress(AggregationError):
+    """The round's model is being finalized"""
+
+
+@dataclass
+class RoundAggregate:
+    """Running FedAvg state of one round"""
+
+    round_id: int
+    directory: Path
+    shape: Optional[Tuple[int, ...]] = None
+    dtype: Optional[str] = None
+    weighted_sum: Optional["np.ndarray"] = None  # float64, flattened
+    total_samples: int = 0
+    # client_id -> samples its update was trained on
+    samples: Dict[UUID, int] = field(default_factory=dict)
+    # Set between finalize() and publish()/abort(); no updates are taken meanwhile
+    sealed: bool = False
+
+    def summary(self) -> dict:
+        return {
+            "round_id": self.round_id,
+            "updates_received": len(self.samples),
+            "total_samples": self.total_samples,
+            "shape": list(self.shape or ()),
+        }
+
+
+class ModelAggregator:
+    """
+    Incremental FedAvg over uploaded client updates
+
+    Updates are kept on disk as <client_id>.<num_samples>.npy, so a restart
+    rebuilds a round's running sum by refolding them. Like the other FL
+    state, the running sums live in one API process: run a single worker, or
+    route a round's uploads to the same worker.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str = settings.FL_MODEL_STORAGE_DIR,
+        max_update_bytes: int = settings.FL_MAX_UPDATE_BYTES,
+    ):
+        self.storage_dir = Path(storage_dir)
+        self.max_update_bytes = max_update_bytes
+        self.rounds: Dict[int, RoundAggregate] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether numpy is installed"""
+        return np is not None
+
+    def has_update(self, round_id: int, client_id: UUID) -> bool:
+        """Whether a client's update for the round has been received"""
+        directory = self._round_dir(round_id)
+        return any(directory.glob(f"{client_id}.*.npy"))
+
+    async def receive(
+        self,
+        round_id: int,
+        client_id: UUID,
+        num_samples: int,
+        chunks: AsyncIterator[bytes],
+    ) -> dict:
+        """
+        Stream a client's update to disk and fold it into the round's average
+
+        Raises AggregationError if the upload is too large, isn't a numeric
+        .npy array, doesn't match the round's model shape, or the client
+        already sent one. Returns the round's aggregation summary.
+        """
+        directory = self._round_dir(round_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        partial = directory / f"{client_id}.{uuid4().hex}.upload"
+        try:
+            size = 0
+            with open(partial, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_update_bytes:
+                        raise AggregationError(
+                            f"Model update exceeds {self.max_update_bytes} bytes"
+                        )
+                    await run_in_threadpool(f.write, chunk)
+
+            async with self._lock:
+                if self.has_update(round_id, client_id):
+                    raise AggregationError(f"FL client {client_id} already sent its update")
+                aggregate = await self._get_round(round_id)
+                if aggregate.sealed:
+                    raise AggregationInProgress(f"FL round {round_id} is being aggregated")
+                await run_in_threadpool(self._fold, aggregate, partial, num_samples)
+                partial.rename(directory / f"{client_id}.{num_samples}.npy")
+                aggregate.samples[client_id] = num_samples
+                return aggregate.summary()
+        finally:
+            partial.unlink(missing_ok=True)
+
+    async def finalize(self, round_id: int) -> Optional[RoundAggregate]:
+        """
+        Write the round's averaged model as a pending artifact and seal the round
+
+        Nothing is deleted yet: call publish() once the round is completed,
+        or abort() to discard the pending model and take updates again.
+        Returns the round's final aggregate, or None if no update was received.
+        """
+        async with self._lock:
+            aggregate = await self._get_round(round_id)
+            if aggregate.sealed:
+                raise AggregationInProgress(f"FL round {round_id} is being aggregated")
+            if not aggregate.total_samples:
+                return None
+            await run_in_threadpool(self._write_model, aggregate)
+            aggregate.sealed = True
+            return aggregate
+
+    async def publish(self, round_id: int):
+        """Make the pending model the round's model and drop the folded updates"""
+        async with self._lock:
+            directory = self._round_dir(round_id)
+            (directory / PENDING_MODEL_FILE).replace(directory / GLOBAL_MODEL_FILE)
+            self.rounds.pop(round_id, None)
+            for update in directory.glob("*.*.npy"):
+                update.unlink()
+
+    async def abort(self, round_id: int):
+        """Discard the pending model, keeping the updates and running sum"""
+        async with self._lock:
+            (self._round_dir(round_id) / PENDING_MODEL_FILE).unlink(missing_ok=True)
+            aggregate = self.rounds.get(round_id)
+            if aggregate is not None:
+                aggregate.sealed = False
+
+    def model_path(self, round_id: int) -> Optional[Path]:
+        """Path of the round's aggregated model, if it has been written"""
+        path = self._round_dir(round_id) / GLOBAL_MODEL_FILE
+        return path if path.exists() else None
+
+    def clear(self):
+        """Forget all running sums (rebuilt from disk on next use)"""
+        self.rounds.clear()
+
+    def _round_dir(self, round_id: int) -> Path:
+        return self.storage_dir / f"round_{round_id}"
+
+    async def _get_round(self, round_id: int) -> RoundAggregate:
+        aggregate = self.rounds.get(round_id)
+        if aggregate is None:
+            aggregate = RoundAggregate(round_id=round_id, directory=self._round_dir(round_id))
+            # Refold updates received before a restart
+            for update in sorted(aggregate.directory.glob("*.*.npy")):
+                client_id, num_samples = update.name.split(".")[:2]
+                await run_in_threadpool(self._fold, aggregate, update, int(num_samples))
+                aggregate.samples[UUID(client_id)] = int(num_samples)
+            self.rounds[round_id] = aggregate
+        return aggregate
+
+    def _fold(self, aggregate: RoundAggregate, path: Path, num_samples: int):
+        """Add num_samples * update to the running sum, a chunk at a time"""
+        try:
+            update = np.load(path, mmap_mode="r", allow_pickle=False)
+        except (ValueError, OSError, EOFError) as e:
+            raise AggregationError(f"Model update is not a valid .npy array: {e}")
+        if update.dtype.kind not in "fiu":
+            raise AggregationError(f"Model update must be numeric, got {update.dtype}")
+        if aggregate.shape is not None and update.shape != aggregate.shape:
+            raise AggregationError(
+                f"Model update has shape {update.shape}, expected {aggregate.shape}"
+            )
+
+        flat = update.reshape(-1)
+        if update.dtype.kind == "f":
+            # Check everything before touching the sum, so a bad update leaves it intact
+            for start in range(0, flat.size, FOLD_CHUNK_ELEMENTS):
+                if not np.isfinite(flat[start : start + FOLD_CHUNK_ELEMENTS]).all():
+                    raise AggregationError("Model update contains NaN or infinite values")
+
+        if aggregate.weighted_sum is None:
+            aggregate.shape = update.shape
+            aggregate.dtype = update.dtype.str if update.dtype.kind == "f" else "<f8"
+            aggregate.weighted_sum = np.zeros(flat.size, dtype=np.float64)
+        for start in range(0, flat.size, FOLD_CHUNK_ELEMENTS):
+            stop = start + FOLD_CHUNK_ELEMENTS
+            aggregate.weighted_sum[start:stop] += num_samples * flat[start:stop].astype(np.float64)
+        aggregate.total_samples += num_samples
+
+    def _write_model(self, aggregate: RoundAggregate):
+        model = (aggregate.weighted_sum / aggregate.total_samples).astype(aggregate.dtype)
+        # A file object, since np.save appends .npy to other file names
+        with open(aggregate.directory / PENDING_MODEL_FILE, "wb") as f:
+            np.save(f, model.reshape(aggregate.shape))
+
+
+# Global aggregator, fed by model update uploads
+model_aggregator = ModelAggregator()
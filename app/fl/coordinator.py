@@ -0,0 +1,219 @@
+"""
+FL Round Coordinator
+Holds the active round's state in memory and drives its lifecycle
+(distributing -> training -> aggregating -> complete). Progress updates
+only touch memory; the round is written to the database when its phase
+changes, when it completes, and by a periodic snapshot in between.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.models.fl_round import FLRound, RoundStatusEnum
+from app.repositories.fl_repository import FLRepository
+from app.schemas.fl_status import FLClientSchema, FLRoundResponse
+from app.telemetry import telemetry_buffer
+
+logger = logging.getLogger(__name__)
+
+# Phases reachable from each phase through a progress update; a round
+# reaches "complete" only through complete()
+NEXT_PHASE = {
+    "distributing": "training",
+    "training": "aggregating",
+}
+
+
+class InvalidTransition(Exception):
+    """A round update that its current state doesn't allow"""
+
+
+class RoundCoordinator:
+    """
+    Authoritative state of the active FL round
+
+    The round is loaded from the database on its first update and then kept
+    in memory until it completes, so repeated progress updates cost no
+    queries. In-memory progress doesn't invalidate cached FL responses or
+    ETags (the in-progress round is served without either); the snapshot's
+    commit does. Like the telemetry buffer, the state lives in one API process:
+    run a single worker, or route a round's updates to the same worker.
+    """
+
+    def __init__(self, persist_interval: float = settings.FL_ROUND_PERSIST_SECONDS):
+        self.persist_interval = persist_interval
+        self.active: Optional[FLRoundResponse] = None
+        # True while the active round has progress not yet written
+        self.dirty = False
+        self.updates = 0
+        self.persists = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def update_progress(
+        self,
+        db: AsyncSession,
+        round_id: int,
+        progress: int,
+        phase: Optional[str] = None,
+    ) -> Optional[FLRoundResponse]:
+        """
+        Apply a progress update and return the round's state
+
+        A phase change is written (uncommitted) to `db` right away; progress
+        alone is kept in memory until the next snapshot. Returns None if the
+        round doesn't exist, raises InvalidTransition if the round isn't in
+        progress or the phase change isn't the next step.
+        """
+        async with self._lock:
+            state = await self._load(db, round_id)
+            if state is None:
+                return None
+            if state.status != "in-progress":
+                raise InvalidTransition(f"FL round {round_id} is {state.status}")
+
+            phase_changed = phase is not None and phase != state.phase
+            if phase_changed and NEXT_PHASE.get(state.phase) != phase:
+                raise InvalidTransition(
+                    f"FL round {round_id} can't move from {state.phase} to {phase}"
+                    + (" (use the complete endpoint)" if phase == "complete" else "")
+                )
+
+            state.progress = progress
+            if phase_changed:
+                state.phase = phase
+                await self._save(db, state)
+            else:
+                self.dirty = True
+            # The buffer only overlays unflushed reports; take flushed ones
+            # too, so the round's clients never fall back to their load-time state
+            state.clients = [telemetry_buffer.latest(client) for client in state.clients]
+            self.updates += 1
+            return state.model_copy(deep=True)
+
+    async def complete(
+        self, db: AsyncSession, round_id: int, model_accuracy: Optional[float]
+    ) -> Optional[FLRound]:
+        """
+        Complete a round from any active phase (written uncommitted to `db`)
+
+        Returns None if the round doesn't exist, raises InvalidTransition if
+        it isn't in progress.
+        """
+        async with self._lock:
+            repo = FLRepository(db)
+            if self.active is None or self.active.id != round_id:
+                fl_round = await repo.get_by_id(round_id)
+                if fl_round is None:
+                    return None
+                if fl_round.status != RoundStatusEnum.in_progress:
+                    raise InvalidTransition(f"FL round {round_id} is {fl_round.status.value}")
+
+            fl_round = await repo.complete_round(round_id, model_accuracy)
+            if self.active is not None and self.active.id == round_id:
+                self.active, self.dirty = None, False
+            return fl_round
+
+    def client_updated(self, client: FLClientSchema):
+        """Keep the active round's copy of a client written directly"""
+        if self.active is None:
+            return
+        self.active.clients = [
+            client if known.id == client.id else known for known in self.active.clients
+        ]
+
+    def apply_round(self, fl_round: FLRoundResponse) -> FLRoundResponse:
+        """Overlay unpersisted progress on a round read from the database"""
+        if self.dirty and self.active is not None and fl_round.id == self.active.id:
+            fl_round.progress = self.active.progress
+            fl_round.phase = self.active.phase
+        return fl_round
+
+    async def flush(self, session_factory: Optional[Callable[[], AsyncSession]] = None) -> bool:
+        """Write the active round's progress if it changed; returns whether it did"""
+        async with self._lock:
+            if not self.dirty:
+                return False
+            session_factory = session_factory or database.async_session_maker
+            try:
+                async with session_factory() as session:
+                    await self._save(session, self.active)
+                    await session.commit()
+            except BaseException:
+                self.dirty = True
+                raise
+            return True
+
+    def start(self):
+        """Start the periodic snapshot task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the snapshot task and write the last state"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def clear(self):
+        """Forget the active round and counters"""
+        self.active = None
+        self.dirty = False
+        self.updates = self.persists = 0
+
+    def status(self) -> dict:
+        """Active round and persistence counters"""
+        return {
+            "persist_interval_seconds": self.persist_interval,
+            "active_round": self.active.id if self.active else None,
+            "phase": self.active.phase if self.active else None,
+            "unpersisted": self.dirty,
+            "updates": self.updates,
+            "persists": self.persists,
+        }
+
+    async def _load(self, db: AsyncSession, round_id: int) -> Optional[FLRoundResponse]:
+        if self.active is not None and self.active.id == round_id:
+            return self.active
+        fl_round = await FLRepository(db).get_by_id(round_id)
+        if fl_round is None:
+            return None
+        state = FLRoundResponse.model_validate(fl_round)
+        if state.status != "in-progress":
+            return state
+        if self.dirty:
+            # Another round is being replaced; keep its last progress
+            await self._save(db, self.active)
+        self.active = state
+        return state
+
+    async def _save(self, db: AsyncSession, state: FLRoundResponse):
+        await FLRepository(db).save_round_state(state.id, state.progress, state.phase)
+        self.dirty = False
+        self.persists += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.persist_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"FL round snapshot failed, retrying next interval: {e}")
+
+
+def present_round(fl_round: FLRoundResponse) -> FLRoundResponse:
+    """A round as the API serves it: stored state plus in-memory overlays"""
+    return telemetry_buffer.apply_round(round_coordinator.apply_round(fl_round))
+
+
+# Global coordinator, snapshotted by a task started in the app lifespan
+round_coordinator = RoundCoordinator()
@@ -4,7 +4,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import alerts, fl_status, mitre, predictions, test_events, websocket
+from app.caching import ConditionalRequestMiddleware
 from app.config import settings
+from app.fl import round_coordinator
+from app.responses import FastJSONResponse
+from app.telemetry import telemetry_buffer
 
 
 @asynccontextmanager
@@ -12,9 +16,13 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("🚀 Starting ICS Threat Detection API...")
+    telemetry_buffer.start()
+    round_coordinator.start()
     yield
     # Shutdown
     print("👋 Shutting down ICS Threat Detection API...")
+    await round_coordinator.stop()
+    await telemetry_buffer.stop()
 
 
 app = FastAPI(
@@ -22,8 +30,12 @@ app = FastAPI(
     description="Federated Network-Based ICS Threat Detection System",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Conditional GET (ETag / Last-Modified) for read-mostly routes
+app.add_middleware(ConditionalRequestMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -66,6 +78,34 @@ async def websocket_status():
     }
 
 
+@app.get("/db/pool/status")
+async def database_pool_status():
+    """Get database connection pool usage (checkouts, wait time, overflow)"""
+    from app.database import get_pool_status
+
+    return get_pool_status()
+
+
+@app.get("/cache/status")
+async def response_cache_status():
+    """Get response cache hit/miss counters per cached route"""
+    from app.caching import response_cache
+
+    return response_cache.status()
+
+
+@app.get("/telemetry/status")
+async def telemetry_status():
+    """Get FL client telemetry buffer size and flush counters"""
+    return telemetry_buffer.status()
+
+
+@app.get("/fl/coordinator/status")
+async def fl_coordinator_status():
+    """Get the active FL round held in memory and its snapshot counters"""
+    return round_coordinator.status()
+
+
 # Include routers
 app.include_router(alerts.router, prefix="/api/alerts", tags=["alerts"])
 app.include_router(fl_status.router, prefix="/api/fl", tags=["fl"])
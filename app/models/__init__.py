@@ -1,13 +1,16 @@
 from app.models.alert import Alert, AlertSource
-from app.models.fl_round import FLClient, FLRound
+from app.models.facility import Facility
+from app.models.fl_round import FLClient, FLClientMetric, FLRound
 from app.models.network_data import NetworkData
 from app.models.prediction import PredictedTechnique, Prediction
 
 __all__ = [
     "Alert",
     "AlertSource",
+    "Facility",
     "FLRound",
     "FLClient",
+    "FLClientMetric",
     "Prediction",
     "PredictedTechnique",
     "NetworkData",
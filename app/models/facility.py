@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, String, true
+
+from app.database import Base
+
+
+class Facility(Base):
+    """Registered facility; eligible facilities get a client in each new FL round"""
+
+    __tablename__ = "facilities"
+
+    id = Column(String, primary_key=True)  # e.g. "facility_a"
+    name = Column(String, nullable=False)
+    fl_eligible = Column(Boolean, nullable=False, default=True, server_default=true())
+    registered_at = Column(DateTime, nullable=False, default=datetime.utcnow)
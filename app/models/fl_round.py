@@ -77,3 +77,19 @@ class FLClient(Base):
 
     # Relationship
     round = relationship("FLRound", back_populates="clients")
+
+
+class FLClientMetric(Base):
+    """Append-only training history: one row per client per epoch"""
+
+    __tablename__ = "fl_client_metrics"
+
+    client_id = Column(
+        UUID(as_uuid=True), ForeignKey("fl_clients.id", ondelete="CASCADE"), primary_key=True
+    )
+    epoch = Column(Integer, primary_key=True)
+
+    loss = Column(Float)
+    accuracy = Column(Float)
+
+    recorded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
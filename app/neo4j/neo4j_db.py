@@ -1,6 +1,10 @@
+import json
 import os
 
 from neo4j import GraphDatabase
+from starlette.concurrency import run_in_threadpool
+
+from app.caching.single_flight import SingleFlight
 
 
 class Neo4jConnection:
@@ -9,6 +13,7 @@ class Neo4jConnection:
         user = os.getenv("NEO4J_USER", "neo4j")
         password = os.getenv("NEO4J_PASSWORD", "neo4j_password")
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.flights = SingleFlight()
 
     def close(self):
         self.driver.close()
@@ -18,5 +23,16 @@ class Neo4jConnection:
             result = session.run(query, parameters or {})
             return [record.data() for record in result]
 
+    async def read(self, query: str, parameters: dict | None = None):
+        """
+        Run a read query off the event loop
+
+        Identical concurrent reads (same query and parameters) share one
+        round trip to Neo4j. The shared rows must not be mutated by callers.
+        """
+        parameters = parameters or {}
+        key = f"{query}\0{json.dumps(parameters, sort_keys=True, default=str)}"
+        return await self.flights.do(key, lambda: run_in_threadpool(self.query, query, parameters))
+
 
 neo4j_conn = Neo4jConnection()
@@ -0,0 +1,9 @@
+# Differential privacy accounting for FL rounds
+from app.privacy.accountant import (
+    CompositionTotals,
+    PrivacyAccountant,
+    format_delta,
+    privacy_accountant,
+)
+
+__all__ = ["CompositionTotals", "PrivacyAccountant", "format_delta", "privacy_accountant"]
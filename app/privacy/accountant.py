@@ -0,0 +1,143 @@
+"""
+Privacy Accountant
+Composes the per-round differential privacy cost (each completed round's
+epsilon) into the total privacy loss spent so far. Keeps running sums, so a
+completed round is added in O(1) and the total is never recomputed by
+scanning fl_rounds after the first load.
+"""
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.fl_round import FLRound, RoundStatusEnum
+
+SUPERSCRIPT_DIGITS = str.maketrans("-0123456789", "⁻⁰¹²³⁴⁵⁶⁷⁸⁹")
+
+
+def format_delta(delta: float) -> str:
+    """Format delta for display, e.g. 1e-05 -> 10⁻⁵"""
+    exponent = math.log10(delta)
+    if exponent == int(exponent):
+        return "10" + str(int(exponent)).translate(SUPERSCRIPT_DIGITS)
+    return f"{delta:g}"
+
+
+@dataclass
+class CompositionTotals:
+    """Sufficient statistics for composing pure epsilon-DP rounds"""
+
+    rounds: int = 0
+    sum_epsilon: float = 0.0
+    sum_epsilon_squared: float = 0.0
+    # sum of eps * (e^eps - 1), the drift term of advanced composition
+    sum_drift: float = 0.0
+
+    def add(self, epsilon: float):
+        self.rounds += 1
+        self.sum_epsilon += epsilon
+        self.sum_epsilon_squared += epsilon**2
+        self.sum_drift += epsilon * math.expm1(epsilon)
+
+    def basic(self) -> float:
+        """Basic composition: epsilons add up"""
+        return self.sum_epsilon
+
+    def advanced(self, delta: float) -> float:
+        """Advanced composition (Dwork-Rothblum-Vadhan), heterogeneous epsilons"""
+        return math.sqrt(2 * math.log(1 / delta) * self.sum_epsilon_squared) + self.sum_drift
+
+    def rdp(self, delta: float) -> float:
+        """
+        Renyi/zero-concentrated DP composition
+
+        A pure eps-DP round is (eps^2 / 2)-zCDP; zCDP costs add up, and
+        rho-zCDP converts to (rho + 2 sqrt(rho ln(1/delta)), delta)-DP.
+        """
+        rho = self.sum_epsilon_squared / 2
+        return rho + 2 * math.sqrt(rho * math.log(1 / delta))
+
+    def spent(self, delta: float) -> Dict[str, float]:
+        """Epsilon spent under each composition theorem"""
+        return {
+            "basic": self.basic(),
+            "advanced": self.advanced(delta),
+            "rdp": self.rdp(delta),
+        }
+
+
+class PrivacyAccountant:
+    """
+    Running privacy loss over completed FL rounds
+
+    All three bounds hold at once, so the tightest is reported. Totals are
+    loaded from fl_rounds on first use and then updated as rounds complete
+    through this API process; rounds completed by other processes (workers,
+    scripts) are picked up after a restart, like the other in-process state.
+    """
+
+    def __init__(
+        self,
+        budget: float = settings.FL_PRIVACY_BUDGET_EPSILON,
+        delta: float = settings.FL_PRIVACY_DELTA,
+    ):
+        self.budget = budget
+        self.delta = delta
+        self.totals = CompositionTotals()
+        # round id -> epsilon of each round already composed
+        self.rounds: Dict[int, float] = {}
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load(self, db: AsyncSession):
+        """Compose all completed rounds once (no-op after the first call)"""
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            query = select(FLRound.id, FLRound.epsilon).where(
+                FLRound.status == RoundStatusEnum.completed, FLRound.epsilon.is_not(None)
+            )
+            for round_id, epsilon in await db.execute(query):
+                # Rounds recorded before or during the load are skipped
+                self.record_round(round_id, epsilon)
+            self.loaded = True
+
+    def record_round(self, round_id: int, epsilon: float):
+        """Add a completed round's cost (each round is counted once)"""
+        if round_id in self.rounds or epsilon is None:
+            return
+        self.rounds[round_id] = epsilon
+        self.totals.add(epsilon)
+
+    def epsilon_spent(self) -> float:
+        """Tightest bound on the total epsilon spent"""
+        if not self.totals.rounds:
+            return 0.0
+        return min(self.totals.spent(self.delta).values())
+
+    def composition(self) -> str:
+        """Name of the composition giving the tightest bound"""
+        if not self.totals.rounds:
+            return "basic"
+        spent = self.totals.spent(self.delta)
+        return min(spent, key=spent.get)
+
+    def budget_remaining(self) -> float:
+        """Remaining share of the epsilon budget, in percent"""
+        return max(0.0, 100.0 * (1 - self.epsilon_spent() / self.budget))
+
+    def clear(self):
+        """Forget all totals (reloaded on next use)"""
+        self.totals = CompositionTotals()
+        self.rounds = {}
+        self.loaded = False
+
+
+# Global accountant, updated when rounds complete
+privacy_accountant = PrivacyAccountant()
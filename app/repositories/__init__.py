@@ -1,9 +1,11 @@
 from app.repositories.alert_repository import AlertRepository
+from app.repositories.facility_repository import FacilityRepository
 from app.repositories.fl_repository import FLRepository
 from app.repositories.prediction_repository import PredictionRepository
 
 __all__ = [
     "AlertRepository",
+    "FacilityRepository",
     "FLRepository",
     "PredictionRepository",
 ]
@@ -1,13 +1,34 @@
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import RowMapping, and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.models.alert import Alert, AlertSource, SeverityEnum, StatusEnum
-from app.schemas.alert import AlertCreate, AlertStats
+from app.schemas.alert import (
+    AlertCreate,
+    AlertListItem,
+    AlertResponse,
+    AlertSourceSchema,
+    AlertStats,
+)
+
+# Columns selected for list views (see AlertListItem)
+LIST_COLUMNS = (
+    Alert.id,
+    Alert.timestamp,
+    Alert.facility_id,
+    Alert.severity,
+    Alert.title,
+    Alert.description,
+    Alert.status,
+    Alert.attack_type,
+    Alert.attack_name,
+    Alert.correlation_confidence,
+)
 
 
 class AlertRepository:
@@ -31,6 +52,8 @@ class AlertRepository:
             else None,
             timestamp=datetime.utcnow(),
             status=StatusEnum.new,
+            # Start the collection loaded so it needs no reload after the flush
+            sources=[],
         )
 
         # Add sources
@@ -46,8 +69,7 @@ class AlertRepository:
             alert.sources.append(source)
 
         self.db.add(alert)
-        await self.db.commit()
-        await self.db.refresh(alert, ["sources"])  # Eagerly load sources
+        await self.db.flush()
 
         return alert
 
@@ -68,11 +90,105 @@ class AlertRepository:
         limit: int = 10,
     ) -> Tuple[List[Alert], int]:
         """Get alerts with filtering and pagination"""
+        filters = self._build_filters(severity, facility, status, search, time_range)
 
         # Build base query
         query = select(Alert).options(selectinload(Alert.sources))
+        if filters:
+            query = query.where(and_(*filters))
+
+        total = await self._count(filters)
+
+        # Apply pagination and ordering
+        query = query.order_by(Alert.timestamp.desc()).offset((page - 1) * limit).limit(limit)
+
+        result = await self.db.execute(query)
+        alerts = result.scalars().all()
+
+        return list(alerts), total
+
+    async def get_list(
+        self,
+        severity: Optional[str] = None,
+        facility: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        time_range: Optional[str] = None,
+        page: int = 1,
+        limit: int = 10,
+        include_sources: bool = False,
+    ) -> Tuple[List[AlertListItem], int]:
+        """
+        Get a page of slim alert rows for list views
+
+        Selects only the list columns and maps the rows straight to
+        AlertListItem without hydrating ORM objects. Sources are loaded with
+        one extra SELECT for the whole page when include_sources is set.
+        """
+        filters = self._build_filters(severity, facility, status, search, time_range)
+
+        query = select(*LIST_COLUMNS)
+        if filters:
+            query = query.where(and_(*filters))
+        query = query.order_by(Alert.timestamp.desc()).offset((page - 1) * limit).limit(limit)
+
+        total = await self._count(filters)
+        rows = (await self.db.execute(query)).mappings().all()
+
+        if not include_sources:
+            return [AlertListItem.model_validate(row) for row in rows], total
+
+        sources_by_alert: Dict[UUID, List[AlertSourceSchema]] = {row["id"]: [] for row in rows}
+        if sources_by_alert:
+            sources = AlertSource.__table__
+            source_rows = await self.db.execute(
+                select(*sources.c).where(sources.c.alert_id.in_(list(sources_by_alert)))
+            )
+            for source in source_rows.mappings():
+                sources_by_alert[source["alert_id"]].append(
+                    AlertSourceSchema.model_validate(source)
+                )
+
+        return [
+            AlertListItem.model_validate({**row, "sources": sources_by_alert[row["id"]]})
+            for row in rows
+        ], total
+
+    async def stream_rows(
+        self,
+        severity: Optional[str] = None,
+        facility: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        time_range: Optional[str] = None,
+        batch_size: int = settings.DB_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Stream every matching alert row (list columns), newest first
+
+        Rows come from a server-side cursor in batches of batch_size, so memory
+        stays constant however many alerts match.
+        """
+        filters = self._build_filters(severity, facility, status, search, time_range)
 
-        # Apply filters
+        query = select(*LIST_COLUMNS)
+        if filters:
+            query = query.where(and_(*filters))
+        query = query.order_by(Alert.timestamp.desc()).execution_options(yield_per=batch_size)
+
+        result = await self.db.stream(query)
+        async for batch in result.mappings().partitions():
+            yield batch
+
+    def _build_filters(
+        self,
+        severity: Optional[str],
+        facility: Optional[str],
+        status: Optional[str],
+        search: Optional[str],
+        time_range: Optional[str],
+    ) -> list:
+        """Build the WHERE clauses shared by the alert list queries"""
         filters = []
 
         if severity and severity != "all":
@@ -100,35 +216,47 @@ class AlertRepository:
             elif time_range == "Last 30 days":
                 filters.append(Alert.timestamp >= now - timedelta(days=30))
 
-        if filters:
-            query = query.where(and_(*filters))
+        return filters
 
-        # Get total count
+    async def _count(self, filters: list) -> int:
+        """Count the alerts matching the filters"""
         count_query = select(func.count()).select_from(Alert)
         if filters:
             count_query = count_query.where(and_(*filters))
         total_result = await self.db.execute(count_query)
-        total = total_result.scalar() or 0
-
-        # Apply pagination and ordering
-        query = query.order_by(Alert.timestamp.desc()).offset((page - 1) * limit).limit(limit)
-
-        result = await self.db.execute(query)
-        alerts = result.scalars().all()
-
-        return list(alerts), total
-
-    async def update_status(self, alert_id: UUID, status: str) -> Optional[Alert]:
-        """Update alert status"""
-        alert = await self.get_by_id(alert_id)
-        if not alert:
+        return total_result.scalar() or 0
+
+    async def update_status(self, alert_id: UUID, status: str) -> Optional[AlertResponse]:
+        """
+        Update alert status
+
+        Issues a single UPDATE ... RETURNING of plain columns and builds the
+        response from the returned row plus one SELECT of the (unchanged)
+        sources, without hydrating ORM objects.
+        """
+        alerts = Alert.__table__
+        query = (
+            update(Alert)
+            .where(Alert.id == alert_id)
+            .values(status=StatusEnum(status))
+            .returning(*alerts.c)
+        )
+        row = (await self.db.execute(query)).mappings().one_or_none()
+        if row is None:
             return None
 
-        alert.status = StatusEnum(status)  # type: ignore
-        await self.db.commit()
-        await self.db.refresh(alert, ["sources"])  # Eagerly load sources
-
-        return alert
+        sources = AlertSource.__table__
+        source_rows = await self.db.execute(
+            select(*sources.c).where(sources.c.alert_id == alert_id)
+        )
+        return AlertResponse.model_validate(
+            {
+                **row,
+                "sources": [
+                    AlertSourceSchema.model_validate(source) for source in source_rows.mappings()
+                ],
+            }
+        )
 
     async def get_stats(self) -> AlertStats:
         """Calculate alert statistics"""
@@ -174,5 +302,5 @@ class AlertRepository:
             return False
 
         await self.db.delete(alert)
-        await self.db.commit()
+        await self.db.flush()
         return True
@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.facility import Facility
+from app.schemas.facility import FacilityCreate, FacilityResponse
+
+
+class FacilityRepository:
+    """Repository for the facility registry"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def register(self, facilities: List[FacilityCreate]) -> List[FacilityResponse]:
+        """
+        Register facilities in one INSERT ... ON CONFLICT
+
+        Already registered facilities get the new name and eligibility. An id
+        repeated in the batch is registered once, with its last entry (one
+        upsert can't touch a row twice).
+        """
+        if not facilities:
+            return []
+
+        latest = {f.id: f for f in facilities}
+        query = insert(Facility).values([f.model_dump() for f in latest.values()])
+        query = query.on_conflict_do_update(
+            index_elements=[Facility.id],
+            set_={"name": query.excluded.name, "fl_eligible": query.excluded.fl_eligible},
+        ).returning(*Facility.__table__.c)
+        rows = (await self.db.execute(query)).mappings()
+        return [FacilityResponse.model_validate(row) for row in rows]
+
+    async def get_all(self, fl_eligible: Optional[bool] = None) -> List[FacilityResponse]:
+        """Get registered facilities"""
+        query = select(*Facility.__table__.c).order_by(Facility.id)
+        if fl_eligible is not None:
+            query = query.where(Facility.fl_eligible.is_(fl_eligible))
+        rows = (await self.db.execute(query)).mappings()
+        return [FacilityResponse.model_validate(row) for row in rows]
+
+    async def update(self, facility_id: str, values: dict) -> Optional[FacilityResponse]:
+        """Update a facility's name or eligibility"""
+        if not values:
+            query = select(*Facility.__table__.c).where(Facility.id == facility_id)
+            row = (await self.db.execute(query)).mappings().one_or_none()
+            return FacilityResponse.model_validate(row) if row is not None else None
+
+        query = (
+            update(Facility)
+            .where(Facility.id == facility_id)
+            .values(**values)
+            .returning(*Facility.__table__.c)
+        )
+        row = (await self.db.execute(query)).mappings().one_or_none()
+        return FacilityResponse.model_validate(row) if row is not None else None
@@ -1,12 +1,81 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import cast, column, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.fl_round import ClientStatusEnum, FLClient, FLRound, PhaseEnum, RoundStatusEnum
+from app.config import settings
+from app.models.facility import Facility
+from app.models.fl_round import (
+    ClientStatusEnum,
+    FLClient,
+    FLClientMetric,
+    FLRound,
+    PhaseEnum,
+    RoundStatusEnum,
+)
+from app.schemas.fl_status import ClientMetricSeries, FLClientSchema, RoundHistoryItem, RoundMetrics
+
+# Local epochs each client trains per round
+DEFAULT_TOTAL_EPOCHS = 10
+
+# Rows per INSERT when appending metrics (5 parameters each, well under
+# Postgres' 32767 bind parameter limit)
+METRICS_INSERT_BATCH = 2000
+
+
+class RoundPointer:
+    """
+    Ids of the newest round and the current (newest in-progress) round
+
+    Lets the dashboard's current-round poll load one round by primary key
+    instead of searching fl_rounds. Updated by the API after a round is
+    created or completed and committed; until then (and after a restart)
+    the repository finds the rounds with a LIMIT 1 query and remembers
+    them. Lookups that raced a create/complete don't overwrite the newer
+    pointer. Rounds created by other processes are seen once the pointer
+    is cleared, so run a single API worker (like the response cache).
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def created(self, round_id: int):
+        """A new round was committed; it is both the latest and the current round"""
+        self.generation += 1
+        self.latest_id = self.current_id = round_id
+        self.latest_known = self.current_known = True
+
+    def completed(self, round_id: int):
+        """A round was committed as completed"""
+        self.generation += 1
+        if self.current_id == round_id:
+            # An older round may still be in progress; look it up once
+            self.current_known = False
+
+    def found_latest(self, generation: int, round_id: Optional[int]):
+        if generation == self.generation:
+            self.latest_id, self.latest_known = round_id, True
+
+    def found_current(self, generation: int, round_id: Optional[int]):
+        if generation == self.generation:
+            self.current_id, self.current_known = round_id, True
+
+    def clear(self):
+        """Forget both pointers (looked up again on next use)"""
+        self.generation = 0
+        self.latest_id: Optional[int] = None
+        self.current_id: Optional[int] = None
+        self.latest_known = False
+        self.current_known = False
+
+
+# Global round pointer, shared by all requests
+round_pointer = RoundPointer()
 
 
 class FLRepository:
@@ -16,39 +85,66 @@ class FLRepository:
         self.db = db
 
     async def create_round(self, round_number: int) -> FLRound:
-        """Create a new FL round"""
+        """
+        Create a new FL round with a client for every eligible facility
+
+        The clients are created by one INSERT ... SELECT from the facility
+        registry, so the statement count doesn't grow with the number of
+        facilities.
+        """
+        now = datetime.utcnow()
         fl_round = FLRound(
             round_number=round_number,
             status=RoundStatusEnum.in_progress,
             phase=PhaseEnum.distributing,
-            start_time=datetime.utcnow(),
+            start_time=now,
             progress=0,
-            epsilon=0.5,
+            epsilon=settings.FL_ROUND_EPSILON,
             clients_active=0,
-            total_clients=2,
-        )
-
-        # Create clients for each facility
-        facilities = [
-            ("facility_a", "Facility A"),
-            ("facility_b", "Facility B"),
-        ]
-
-        for facility_id, name in facilities:
-            client = FLClient(
-                facility_id=facility_id,
-                name=name,
-                status=ClientStatusEnum.active,
-                progress=0,
-                current_epoch=0,
-                total_epochs=10,
-                last_update=datetime.utcnow(),
+            total_clients=0,
+            clients=[],
+        )
+        self.db.add(fl_round)
+        await self.db.flush()
+
+        eligible = (
+            select(
+                func.gen_random_uuid(),
+                literal(fl_round.id),
+                Facility.id,
+                Facility.name,
+                literal(ClientStatusEnum.active, FLClient.__table__.c.status.type),
+                literal(0),
+                literal(0),
+                literal(DEFAULT_TOTAL_EPOCHS),
+                literal(now, FLClient.__table__.c.last_update.type),
             )
-            fl_round.clients.append(client)
+            .where(Facility.fl_eligible.is_(True))
+            .order_by(Facility.id)
+        )
+        query = (
+            insert(FLClient)
+            .from_select(
+                [
+                    "id",
+                    "round_id",
+                    "facility_id",
+                    "name",
+                    "status",
+                    "progress",
+                    "current_epoch",
+                    "total_epochs",
+                    "last_update",
+                ],
+                eligible,
+            )
+            .returning(FLClient)
+        )
+        clients = list((await self.db.scalars(query)).all())
 
-        self.db.add(fl_round)
-        await self.db.commit()
-        await self.db.refresh(fl_round, ["clients"])
+        set_committed_value(fl_round, "clients", clients)
+        fl_round.total_clients = len(clients)
+        await self.db.flush()
 
         return fl_round
 
@@ -69,7 +165,15 @@ class FLRepository:
         return result.scalar_one_or_none()
 
     async def get_current_round(self) -> Optional[FLRound]:
-        """Get the current active FL round"""
+        """Get the current active FL round (the newest in-progress round)"""
+        if round_pointer.current_known:
+            if round_pointer.current_id is None:
+                return None
+            fl_round = await self.get_by_id(round_pointer.current_id)
+            if fl_round is not None and fl_round.status == RoundStatusEnum.in_progress:
+                return fl_round
+
+        generation = round_pointer.generation
         query = (
             select(FLRound)
             .options(selectinload(FLRound.clients))
@@ -77,18 +181,27 @@ class FLRepository:
             .order_by(FLRound.round_number.desc())
             .limit(1)
         )
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        fl_round = (await self.db.execute(query)).scalar_one_or_none()
+        round_pointer.found_current(generation, fl_round.id if fl_round else None)
+        return fl_round
 
     async def get_latest_round(self) -> Optional[FLRound]:
         """Get the most recent FL round (active or completed)"""
+        if round_pointer.latest_known and round_pointer.latest_id is not None:
+            fl_round = await self.get_by_id(round_pointer.latest_id)
+            if fl_round is not None:
+                return fl_round
+
+        generation = round_pointer.generation
         query = (
             select(FLRound)
             .options(selectinload(FLRound.clients))
             .order_by(FLRound.round_number.desc())
+            .limit(1)
         )
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        fl_round = (await self.db.execute(query)).scalar_one_or_none()
+        round_pointer.found_latest(generation, fl_round.id if fl_round else None)
+        return fl_round
 
     async def get_all_rounds(self, limit: int = 10, offset: int = 0) -> List[FLRound]:
         """Get all FL rounds with pagination"""
@@ -102,46 +215,107 @@ class FLRepository:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_round_history(
+        self, limit: int = 10, before: Optional[int] = None
+    ) -> List[RoundHistoryItem]:
+        """
+        Get per-round summaries, newest first, in one query
+
+        Duration, client ratio and the accuracy change from the previous
+        round are computed in SQL without loading client rows. Pages are
+        keyset-paginated on round_number: pass the last round_number seen as
+        `before`. One extra, older round is fetched so LAG has the previous
+        accuracy for the oldest round on the page.
+        """
+        rounds = FLRound.__table__
+        clients = FLClient.__table__
+
+        window = select(rounds).order_by(rounds.c.round_number.desc()).limit(limit + 1)
+        if before is not None:
+            window = window.where(rounds.c.round_number < before)
+        window = window.subquery()
+
+        clients_total = (
+            select(func.count()).where(clients.c.round_id == window.c.id).scalar_subquery()
+        )
+        clients_active = (
+            select(func.count())
+            .where(clients.c.round_id == window.c.id)
+            .where(clients.c.status == ClientStatusEnum.active)
+            .scalar_subquery()
+        )
+        previous_accuracy = func.lag(window.c.model_accuracy).over(order_by=window.c.round_number)
+        summary = select(
+            window.c.round_number,
+            window.c.status,
+            window.c.epsilon,
+            window.c.start_time,
+            window.c.end_time,
+            (func.extract("epoch", window.c.end_time - window.c.start_time) / 60).label("duration"),
+            func.concat(clients_active, "/", clients_total).label("clients"),
+            (window.c.model_accuracy - previous_accuracy).label("accuracy_change"),
+        ).subquery()
+
+        query = select(summary).order_by(summary.c.round_number.desc()).limit(limit)
+        result = await self.db.execute(query)
+        return [RoundHistoryItem.model_validate(row) for row in result.mappings()]
+
     async def update_round_progress(
         self,
         round_id: int,
         progress: int,
         phase: Optional[str] = None,
     ) -> Optional[FLRound]:
-        """Update FL round progress"""
-        fl_round = await self.get_by_id(round_id)
-        if not fl_round:
-            return None
-
-        fl_round.progress = progress  # type: ignore
+        """Update FL round progress with a single UPDATE ... RETURNING"""
+        values: dict = {"progress": progress}
         if phase:
-            fl_round.phase = PhaseEnum(phase)  # type: ignore
+            values["phase"] = PhaseEnum(phase)
 
-        await self.db.commit()
-        await self.db.refresh(fl_round, ["clients"])
+        return await self._update_round(round_id, values)
 
-        return fl_round
+    async def save_round_state(self, round_id: int, progress: int, phase: str):
+        """Write a round's progress and phase (a single UPDATE, nothing returned)"""
+        await self.db.execute(
+            update(FLRound)
+            .where(FLRound.id == round_id)
+            .values(progress=progress, phase=PhaseEnum(phase))
+            .execution_options(synchronize_session=False)
+        )
 
     async def complete_round(
         self,
         round_id: int,
-        model_accuracy: float,
+        model_accuracy: Optional[float],
     ) -> Optional[FLRound]:
         """Mark FL round as completed"""
-        fl_round = await self.get_by_id(round_id)
-        if not fl_round:
-            return None
-
-        fl_round.status = RoundStatusEnum.completed  # type: ignore
-        fl_round.phase = PhaseEnum.complete  # type: ignore
-        fl_round.progress = 100  # type: ignore
-        fl_round.end_time = datetime.utcnow()  # type: ignore
-        fl_round.model_accuracy = model_accuracy  # type: ignore
+        return await self._update_round(
+            round_id,
+            {
+                "status": RoundStatusEnum.completed,
+                "phase": PhaseEnum.complete,
+                "progress": 100,
+                "end_time": datetime.utcnow(),
+                "model_accuracy": model_accuracy,
+            },
+        )
 
-        await self.db.commit()
-        await self.db.refresh(fl_round, ["clients"])
+    async def _update_round(self, round_id: int, values: dict) -> Optional[FLRound]:
+        """
+        UPDATE a round and return it with its clients
 
-        return fl_round
+        The clients are unchanged, so they are loaded with one SELECT rather
+        than fetching, flushing and refreshing the round.
+        """
+        query = (
+            update(FLRound)
+            .where(FLRound.id == round_id)
+            .values(**values)
+            .returning(FLRound)
+            .options(selectinload(FLRound.clients))
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
 
     async def get_all_clients(self) -> List[FLClient]:
         """Get all FL clients from current round"""
@@ -156,6 +330,17 @@ class FLRepository:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_client_round_status(
+        self, round_id: int, client_id: UUID
+    ) -> Optional[RoundStatusEnum]:
+        """Status of the round a client belongs to, or None if it isn't in that round"""
+        query = (
+            select(FLRound.status)
+            .join(FLClient, FLClient.round_id == FLRound.id)
+            .where(FLRound.id == round_id, FLClient.id == client_id)
+        )
+        return (await self.db.execute(query)).scalar_one_or_none()
+
     async def update_client_status(
         self,
         client_id: UUID,
@@ -164,29 +349,167 @@ class FLRepository:
         current_epoch: Optional[int] = None,
         loss: Optional[float] = None,
         accuracy: Optional[float] = None,
-    ) -> Optional[FLClient]:
-        """Update FL client status"""
-        client = await self.get_client_by_id(client_id)
-        if not client:
-            return None
+    ) -> Optional[FLClientSchema]:
+        """
+        Update FL client status
 
+        Issues a single UPDATE ... RETURNING of plain columns and builds the
+        response from the returned row, without hydrating an ORM object. A
+        report carrying an epoch, loss or accuracy also appends the client's
+        new state to its per-epoch history, in the same transaction.
+        """
+        values: dict = {"last_update": datetime.utcnow()}
         if status:
-            client.status = ClientStatusEnum(status)  # type: ignore
+            values["status"] = ClientStatusEnum(status)
         if progress is not None:
-            client.progress = progress  # type: ignore
+            values["progress"] = progress
         if current_epoch is not None:
-            client.current_epoch = current_epoch  # type: ignore
+            values["current_epoch"] = current_epoch
         if loss is not None:
-            client.loss = loss  # type: ignore
+            values["loss"] = loss
         if accuracy is not None:
-            client.accuracy = accuracy  # type: ignore
+            values["accuracy"] = accuracy
+
+        clients = FLClient.__table__
+        query = (
+            update(FLClient).where(FLClient.id == client_id).values(**values).returning(*clients.c)
+        )
+        row = (await self.db.execute(query)).mappings().one_or_none()
+        if row is None:
+            return None
+
+        if current_epoch is not None or loss is not None or accuracy is not None:
+            await self.append_client_metrics(
+                [
+                    {
+                        "client_id": client_id,
+                        "epoch": row["current_epoch"],
+                        "loss": row["loss"],
+                        "accuracy": row["accuracy"],
+                        "recorded_at": values["last_update"],
+                    }
+                ]
+            )
+        return FLClientSchema.model_validate(row)
 
-        client.last_update = datetime.utcnow()  # type: ignore
+    async def bulk_update_clients(self, updates: Dict[UUID, dict]) -> int:
+        """
+        Apply buffered client telemetry in one UPDATE ... FROM (VALUES ...)
 
-        await self.db.commit()
-        # No relationships to refresh for client
+        Each update maps field -> value for status, progress, current_epoch,
+        loss, accuracy and last_update; fields a client didn't report keep
+        their stored value. Returns the number of rows updated.
+        """
+        if not updates:
+            return 0
+
+        clients = FLClient.__table__
+        fields = ("status", "progress", "current_epoch", "loss", "accuracy", "last_update")
+        rows = [(client_id, *(u.get(f) for f in fields)) for client_id, u in updates.items()]
+        batch = values(
+            *(column(name, clients.c[name].type) for name in ("id", *fields)),
+            name="telemetry",
+        ).data(rows)
+
+        # Columns that are NULL in every row come back untyped from VALUES,
+        # so cast before falling back to the stored value
+        query = (
+            update(FLClient)
+            .where(FLClient.id == batch.c.id)
+            .values(
+                {
+                    f: func.coalesce(cast(batch.c[f], clients.c[f].type), clients.c[f])
+                    for f in fields
+                }
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(query)
+        return result.rowcount
+
+    async def append_client_metrics(self, points: List[dict]):
+        """
+        Bulk append per-epoch metrics
+
+        Each point has client_id, epoch, loss, accuracy and optionally
+        recorded_at. A re-sent epoch replaces the earlier point, so retried
+        flushes are idempotent.
+        """
+        for start in range(0, len(points), METRICS_INSERT_BATCH):
+            query = insert(FLClientMetric).values(points[start : start + METRICS_INSERT_BATCH])
+            query = query.on_conflict_do_update(
+                index_elements=[FLClientMetric.client_id, FLClientMetric.epoch],
+                set_={
+                    "loss": query.excluded.loss,
+                    "accuracy": query.excluded.accuracy,
+                    "recorded_at": query.excluded.recorded_at,
+                },
+            )
+            await self.db.execute(query)
+
+    async def get_round_metrics(self, round_id: int, points: int = 200) -> RoundMetrics:
+        """
+        Get a round's training curves, downsampled to at most `points` per client
+
+        Each client's epochs are split into `points` equal-width buckets and
+        averaged in Postgres, so the response size doesn't grow with the
+        number of epochs. Clients with fewer epochs get every epoch.
+        """
+        clients = FLClient.__table__
+        metrics = FLClientMetric.__table__
+
+        span = (
+            select(
+                metrics.c.client_id,
+                metrics.c.epoch,
+                metrics.c.loss,
+                metrics.c.accuracy,
+                func.min(metrics.c.epoch).over(partition_by=metrics.c.client_id).label("first"),
+                func.max(metrics.c.epoch).over(partition_by=metrics.c.client_id).label("last"),
+                func.count().over(partition_by=metrics.c.client_id).label("recorded"),
+            )
+            .join(clients, clients.c.id == metrics.c.client_id)
+            .where(clients.c.round_id == round_id)
+            .subquery()
+        )
+        # Bucket 0 .. points-1 across each client's epoch span
+        bucket = (span.c.epoch - span.c.first) * points // (span.c.last - span.c.first + 1)
+        query = (
+            select(
+                span.c.client_id,
+                func.max(span.c.epoch).label("epoch"),
+                func.avg(span.c.loss).label("loss"),
+                func.avg(span.c.accuracy).label("accuracy"),
+                func.max(span.c.recorded).label("recorded"),
+            )
+            .group_by(span.c.client_id, bucket)
+            .order_by(span.c.client_id, func.max(span.c.epoch))
+        )
+
+        round_clients = await self.db.execute(
+            select(clients.c.id, clients.c.facility_id)
+            .where(clients.c.round_id == round_id)
+            .order_by(clients.c.facility_id)
+        )
+        series = {
+            row.id: ClientMetricSeries(
+                client_id=row.id,
+                facility_id=row.facility_id,
+                epochs_recorded=0,
+                epochs=[],
+                loss=[],
+                accuracy=[],
+            )
+            for row in round_clients
+        }
+        for row in await self.db.execute(query):
+            client = series[row.client_id]
+            client.epochs_recorded = row.recorded
+            client.epochs.append(row.epoch)
+            client.loss.append(row.loss)
+            client.accuracy.append(row.accuracy)
 
-        return client
+        return RoundMetrics(round_id=round_id, points=points, clients=list(series.values()))
 
     async def get_next_round_number(self) -> int:
         """Get the next round number"""
@@ -2,12 +2,12 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.prediction import PredictedTechnique, Prediction
-from app.schemas.prediction import PredictionCreate
+from app.schemas.prediction import PredictedTechniqueSchema, PredictionCreate, PredictionResponse
 
 
 class PredictionRepository:
@@ -24,6 +24,8 @@ class PredictionRepository:
             alert_id=prediction_data.alert_id,
             timestamp=datetime.utcnow(),
             validated=False,
+            # Start the collection loaded so it needs no reload after the flush
+            predicted_techniques=[],
         )
 
         # Add predicted techniques
@@ -38,8 +40,7 @@ class PredictionRepository:
             prediction.predicted_techniques.append(technique)
 
         self.db.add(prediction)
-        await self.db.commit()
-        await self.db.refresh(prediction, ["predicted_techniques"])
+        await self.db.flush()
 
         return prediction
 
@@ -96,19 +97,38 @@ class PredictionRepository:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
-    async def validate_prediction(self, prediction_id: UUID) -> Optional[Prediction]:
-        """Mark a prediction as validated"""
-        prediction = await self.get_by_id(prediction_id)
-        if not prediction:
-            return None
+    async def validate_prediction(self, prediction_id: UUID) -> Optional[PredictionResponse]:
+        """
+        Mark a prediction as validated
 
-        prediction.validated = True  # type: ignore
-        prediction.validation_time = datetime.utcnow()  # type: ignore
-
-        await self.db.commit()
-        await self.db.refresh(prediction, ["predicted_techniques"])
+        Issues a single UPDATE ... RETURNING of plain columns and builds the
+        response from the returned row plus one SELECT of the (unchanged)
+        predicted techniques, without hydrating ORM objects.
+        """
+        predictions = Prediction.__table__
+        query = (
+            update(Prediction)
+            .where(Prediction.id == prediction_id)
+            .values(validated=True, validation_time=datetime.utcnow())
+            .returning(*predictions.c)
+        )
+        row = (await self.db.execute(query)).mappings().one_or_none()
+        if row is None:
+            return None
 
-        return prediction
+        techniques = PredictedTechnique.__table__
+        technique_rows = await self.db.execute(
+            select(*techniques.c).where(techniques.c.prediction_id == prediction_id)
+        )
+        return PredictionResponse.model_validate(
+            {
+                **row,
+                "predicted_techniques": [
+                    PredictedTechniqueSchema.model_validate(technique)
+                    for technique in technique_rows.mappings()
+                ],
+            }
+        )
 
     async def delete(self, prediction_id: UUID) -> bool:
         """Delete a prediction"""
@@ -117,5 +137,5 @@ class PredictionRepository:
             return False
 
         await self.db.delete(prediction)
-        await self.db.commit()
+        await self.db.flush()
         return True
@@ -0,0 +1,41 @@
+"""
+Fast JSON Responses
+App-wide response class that serializes Pydantic models, dicts of models,
+datetimes and UUIDs in a single pass (orjson when installed, otherwise
+Pydantic's Rust serializer)
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize content to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=to_jsonable_python, option=orjson.OPT_NON_STR_KEYS)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that skips jsonable_encoder and the stdlib json encoder
+
+    Endpoints can return FastJSONResponse(model_or_dict) directly to also skip
+    FastAPI's response_model re-validation; the response_model is then only
+    used for the OpenAPI docs. Already-encoded bytes are sent as-is.
+
+    FastAPI doesn't merge headers set on the injected Response (e.g. the
+    read-your-writes cookie from get_db) into a returned response, so write
+    endpoints keep returning models.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
@@ -55,6 +55,21 @@ class AlertResponse(AlertBase):
         from_attributes = True
 
 
+class AlertListItem(AlertBase):
+    """Slim alert row for list views; sources only with include=sources"""
+
+    id: UUID
+    timestamp: datetime
+    status: Literal["new", "acknowledged", "resolved", "false-positive"]
+    attack_type: Optional[str] = None
+    attack_name: Optional[str] = None
+    correlation_confidence: Optional[float] = None
+    sources: Optional[List[AlertSourceSchema]] = None
+
+    class Config:
+        from_attributes = True
+
+
 class AlertUpdate(BaseModel):
     status: Literal["acknowledged", "resolved", "false-positive"]
 
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class FacilityBase(BaseModel):
+    id: str
+    name: str
+    fl_eligible: bool = True
+
+
+class FacilityCreate(FacilityBase):
+    pass
+
+
+class FacilityUpdate(BaseModel):
+    name: Optional[str] = None
+    fl_eligible: Optional[bool] = None
+
+
+class FacilityResponse(FacilityBase):
+    registered_at: datetime
+
+    class Config:
+        from_attributes = True
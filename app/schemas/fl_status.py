@@ -43,12 +43,42 @@ class FLRoundResponse(FLRoundBase):
         from_attributes = True
 
 
+class ClientMetricSeries(BaseModel):
+    """One client's training curve, as parallel arrays"""
+
+    client_id: UUID
+    facility_id: str
+    epochs_recorded: int
+    epochs: List[int]  # last epoch of each bucket
+    loss: List[Optional[float]]
+    accuracy: List[Optional[float]]
+
+
+class RoundMetrics(BaseModel):
+    round_id: int
+    points: int  # max points per client
+    clients: List[ClientMetricSeries]
+
+
+class RoundAggregation(BaseModel):
+    """Model updates folded into a round's FedAvg so far"""
+
+    round_id: int
+    updates_received: int
+    total_samples: int
+    shape: List[int]
+
+
 class PrivacyMetrics(BaseModel):
     epsilon: float
     delta: str
     data_size: str
     encryption: str
-    privacy_budget_remaining: float
+    privacy_budget_remaining: float  # percent
+    epsilon_spent: float = 0.0  # composed over completed rounds
+    epsilon_budget: Optional[float] = None
+    rounds_composed: int = 0
+    composition: Literal["basic", "advanced", "rdp"] = "basic"
 
 
 class RoundHistoryItem(BaseModel):
@@ -63,3 +93,8 @@ class RoundHistoryItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RoundHistoryPage(BaseModel):
+    rounds: List[RoundHistoryItem]
+    next_before: Optional[int] = None  # pass as `before` for the next page
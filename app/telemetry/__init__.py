@@ -0,0 +1,5 @@
+# FL client telemetry ingestion
+from app.telemetry.buffer import ClientTelemetryBuffer, telemetry_buffer
+from app.telemetry.eta import RoundETAEstimator, round_eta
+
+__all__ = ["ClientTelemetryBuffer", "RoundETAEstimator", "round_eta", "telemetry_buffer"]
@@ -0,0 +1,293 @@
+"""
+Client Telemetry Buffer
+Coalesces high-frequency FL client reports (epoch, loss, accuracy) in
+memory, keeping only the latest values per client, and writes them to the
+database in one batched UPDATE per flush interval, along with the per-epoch
+training history. Reads in between are served from the buffered state.
+"""
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.models.fl_round import ClientStatusEnum
+from app.repositories.fl_repository import FLRepository
+from app.schemas.fl_status import FLClientSchema, FLRoundResponse
+from app.telemetry.eta import round_eta
+
+logger = logging.getLogger(__name__)
+
+# Clients whose last known state is kept for responses between flushes
+MAX_TRACKED_CLIENTS = 1024
+
+# Failed flushes after which a client's buffered reports are dropped
+MAX_FLUSH_ATTEMPTS = 10
+
+# Errors that retrying the same rows can't fix (e.g. the client was deleted)
+PERMANENT_ERRORS = (DataError, IntegrityError)
+
+
+class ClientTelemetryBuffer:
+    """
+    Latest unflushed telemetry per client
+
+    A report for a client not seen before is checked against the database
+    once; later reports only touch memory until the next flush. Reports
+    don't invalidate cached FL responses or ETags (only responses without
+    either serve buffered state); the flush's commit does. Like the
+    response cache, the buffer lives in one API process: run a single worker
+    or route each client's reports to the same worker.
+    """
+
+    def __init__(self, flush_interval: float = settings.FL_TELEMETRY_FLUSH_SECONDS):
+        self.flush_interval = flush_interval
+        # client_id -> fields reported since the last flush
+        self.pending: Dict[UUID, dict] = {}
+        # (client_id, epoch) -> latest metrics point for that epoch
+        self.history: Dict[Tuple[UUID, int], dict] = {}
+        # client_id -> last known client state, least recently reported first
+        self.clients: "OrderedDict[UUID, FLClientSchema]" = OrderedDict()
+        # client_id -> consecutive failed flushes of its reports
+        self.attempts: Dict[UUID, int] = {}
+        self.reports = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.dropped_clients = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def record(
+        self,
+        db: AsyncSession,
+        client_id: UUID,
+        status: Optional[str] = None,
+        progress: Optional[int] = None,
+        current_epoch: Optional[int] = None,
+        loss: Optional[float] = None,
+        accuracy: Optional[float] = None,
+    ) -> Optional[FLClientSchema]:
+        """
+        Buffer a client report and return the client's merged state
+
+        Returns None if the client doesn't exist.
+        """
+        client = self.clients.get(client_id)
+        if client is None:
+            row = await FLRepository(db).get_client_by_id(client_id)
+            if row is None:
+                return None
+            client = FLClientSchema.model_validate(row)
+
+        fields: dict = {"last_update": datetime.utcnow()}
+        if status:
+            fields["status"] = ClientStatusEnum(status)
+        if progress is not None:
+            fields["progress"] = progress
+        if current_epoch is not None:
+            fields["current_epoch"] = current_epoch
+        if loss is not None:
+            fields["loss"] = loss
+        if accuracy is not None:
+            fields["accuracy"] = accuracy
+
+        self.pending[client_id] = {**self.pending.get(client_id, {}), **fields}
+        client = client.model_copy(update=fields)
+        if current_epoch is not None or loss is not None or accuracy is not None:
+            self.history[(client_id, client.current_epoch)] = {
+                "client_id": client_id,
+                "epoch": client.current_epoch,
+                "loss": client.loss,
+                "accuracy": client.accuracy,
+                "recorded_at": fields["last_update"],
+            }
+        self.clients[client_id] = client
+        self.clients.move_to_end(client_id)
+        round_eta.observe(client)
+        self.reports += 1
+        return client
+
+    def discard(self, client_id: UUID):
+        """Drop buffered state for a client written directly (newest write wins)"""
+        self.pending.pop(client_id, None)
+        self.clients.pop(client_id, None)
+
+    def apply(self, client: FLClientSchema) -> FLClientSchema:
+        """Overlay unflushed telemetry on a client read from the database"""
+        if client.id not in self.pending:
+            return client
+        return self.clients[client.id]
+
+    def latest(self, client: FLClientSchema) -> FLClientSchema:
+        """Newest known state of a client held in memory, flushed or not"""
+        return self.clients.get(client.id, client)
+
+    def apply_round(self, fl_round: FLRoundResponse) -> FLRoundResponse:
+        """Overlay unflushed telemetry on a round's clients and fill in its ETA"""
+        if self.pending:
+            fl_round.clients = [self.apply(client) for client in fl_round.clients]
+        if fl_round.status == "in-progress":
+            fl_round.time_remaining = round_eta.minutes_remaining(fl_round.clients)
+        return fl_round
+
+    async def flush(self, session_factory: Optional[Callable[[], AsyncSession]] = None) -> int:
+        """
+        Write all buffered reports in one UPDATE, append the epoch history,
+        and commit
+
+        Reports arriving during the flush are kept for the next one. If the
+        batch hits a row that can't be written, each client is retried in its
+        own transaction and the failing ones are dropped, so one bad row
+        doesn't block everyone else. Otherwise a failed batch is merged back
+        under any newer reports, until a client has failed MAX_FLUSH_ATTEMPTS
+        times. Returns the number of client rows updated.
+        """
+        if not self.pending and not self.history:
+            return 0
+
+        batch, self.pending = self.pending, {}
+        history, self.history = self.history, {}
+        session_factory = session_factory or database.async_session_maker
+        try:
+            rows = await self._write(session_factory, batch, list(history.values()))
+        except PERMANENT_ERRORS:
+            rows = await self._write_each(session_factory, batch, history)
+        except BaseException:
+            self._requeue(batch, history)
+            raise
+        else:
+            for client_id in batch:
+                self.attempts.pop(client_id, None)
+
+        self.flushes += 1
+        self.rows_written += rows
+        self._trim()
+        return rows
+
+    def start(self):
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write what's left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def clear(self):
+        """Drop all buffered state and counters"""
+        self.pending.clear()
+        self.history.clear()
+        self.clients.clear()
+        self.attempts.clear()
+        self.reports = self.flushes = self.rows_written = self.dropped_clients = 0
+
+    def status(self) -> dict:
+        """Buffer size and write coalescing counters"""
+        return {
+            "flush_interval_seconds": self.flush_interval,
+            "pending_clients": len(self.pending),
+            "pending_epochs": len(self.history),
+            "reports": self.reports,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "retrying_clients": len(self.attempts),
+            "dropped_clients": self.dropped_clients,
+        }
+
+    async def _write(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch: Dict[UUID, dict],
+        points: List[dict],
+    ) -> int:
+        async with session_factory() as session:
+            repo = FLRepository(session)
+            rows = await repo.bulk_update_clients(batch)
+            await repo.append_client_metrics(points)
+            await session.commit()
+        return rows
+
+    async def _write_each(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch: Dict[UUID, dict],
+        history: Dict[Tuple[UUID, int], dict],
+    ) -> int:
+        """Write each client's reports in its own transaction"""
+        points: Dict[UUID, Dict[Tuple[UUID, int], dict]] = defaultdict(dict)
+        for key, point in history.items():
+            points[key[0]][key] = point
+
+        rows = 0
+        for client_id in {*batch, *points}:
+            client_batch = {client_id: batch[client_id]} if client_id in batch else {}
+            client_history = points.get(client_id, {})
+            try:
+                rows += await self._write(
+                    session_factory, client_batch, list(client_history.values())
+                )
+            except PERMANENT_ERRORS as e:
+                self._drop({client_id}, e)
+            except Exception:
+                self._requeue(client_batch, client_history)
+            else:
+                self.attempts.pop(client_id, None)
+        return rows
+
+    def _requeue(self, batch: Dict[UUID, dict], history: Dict[Tuple[UUID, int], dict]):
+        """Merge failed reports back under newer ones, dropping clients that keep failing"""
+        exhausted = set()
+        for client_id in {*batch, *(key[0] for key in history)}:
+            self.attempts[client_id] = self.attempts.get(client_id, 0) + 1
+            if self.attempts[client_id] >= MAX_FLUSH_ATTEMPTS:
+                exhausted.add(client_id)
+
+        for client_id, fields in batch.items():
+            if client_id not in exhausted:
+                self.pending[client_id] = {**fields, **self.pending.get(client_id, {})}
+        for key, point in history.items():
+            if key[0] not in exhausted:
+                self.history.setdefault(key, point)
+        if exhausted:
+            self._drop(exhausted, f"failed {MAX_FLUSH_ATTEMPTS} flushes")
+
+    def _drop(self, client_ids: Set[UUID], reason):
+        """Forget clients' buffered reports, including any newer than the failed flush"""
+        for client_id in client_ids:
+            logger.error(f"Dropping buffered telemetry for FL client {client_id}: {reason}")
+            self.attempts.pop(client_id, None)
+            self.pending.pop(client_id, None)
+            self.clients.pop(client_id, None)
+        self.history = {key: p for key, p in self.history.items() if key[0] not in client_ids}
+        self.dropped_clients += len(client_ids)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Telemetry flush failed, retrying next interval: {e}")
+
+    def _trim(self):
+        for client_id in list(self.clients):
+            if len(self.clients) <= MAX_TRACKED_CLIENTS:
+                break
+            if client_id not in self.pending:
+                del self.clients[client_id]
+
+
+# Global telemetry buffer, flushed by a task started in the app lifespan
+telemetry_buffer = ClientTelemetryBuffer()
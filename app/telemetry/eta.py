@@ -0,0 +1,112 @@
+"""
+Round ETA
+Estimates FL round completion from each client's epoch throughput, kept as
+an exponentially weighted moving average of seconds per epoch and updated
+on every client report. A round finishes when its slowest active client
+does.
+"""
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+
+from app.schemas.fl_status import FLClientSchema
+
+# Weight of the newest seconds-per-epoch sample
+EWMA_ALPHA = 0.3
+
+# Clients tracked at once (a few rounds' worth)
+MAX_TRACKED_CLIENTS = 1024
+
+
+@dataclass
+class ClientThroughput:
+    """Throughput and projected finish time of one client"""
+
+    epoch: int
+    reached_at: datetime  # when `epoch` was first reported
+    seconds_per_epoch: Optional[float] = None
+    finish_at: Optional[datetime] = None
+
+
+class RoundETAEstimator:
+    """
+    Per-client EWMA throughput and projected finish times
+
+    Each report updates one client's projection in O(1); a round's ETA is
+    the latest projection among its active clients, so nothing scans the
+    epoch history. Timestamps are the clients' last_update values (naive
+    UTC, like the rest of the FL tables).
+    """
+
+    def __init__(self, alpha: float = EWMA_ALPHA):
+        self.alpha = alpha
+        self.clients: "OrderedDict[UUID, ClientThroughput]" = OrderedDict()
+
+    def observe(self, client: FLClientSchema):
+        """Update a client's throughput from its latest state"""
+        state = self.clients.get(client.id)
+        if state is None or client.current_epoch < state.epoch:
+            # First report, or the client restarted its epochs
+            state = ClientThroughput(epoch=client.current_epoch, reached_at=client.last_update)
+        elif client.current_epoch > state.epoch:
+            elapsed = (client.last_update - state.reached_at).total_seconds()
+            sample = max(elapsed, 0.0) / (client.current_epoch - state.epoch)
+            if state.seconds_per_epoch is None:
+                state.seconds_per_epoch = sample
+            else:
+                state.seconds_per_epoch = (
+                    self.alpha * sample + (1 - self.alpha) * state.seconds_per_epoch
+                )
+            state.epoch = client.current_epoch
+            state.reached_at = client.last_update
+
+        if state.seconds_per_epoch is not None:
+            remaining = max(client.total_epochs - state.epoch, 0)
+            state.finish_at = state.reached_at + timedelta(
+                seconds=remaining * state.seconds_per_epoch
+            )
+
+        self.clients[client.id] = state
+        self.clients.move_to_end(client.id)
+        while len(self.clients) > MAX_TRACKED_CLIENTS:
+            self.clients.popitem(last=False)
+
+    def minutes_remaining(
+        self, clients: Iterable[FLClientSchema], now: Optional[datetime] = None
+    ) -> Optional[int]:
+        """
+        Minutes until the slowest active (not offline) client finishes
+
+        None while an unfinished active client has no throughput estimate
+        yet, or if no client is active.
+        """
+        finishes = []
+        for client in clients:
+            if client.status == "offline":
+                continue
+            if client.current_epoch >= client.total_epochs:
+                finishes.append(None)
+                continue
+            state = self.clients.get(client.id)
+            if state is None or state.finish_at is None:
+                return None
+            finishes.append(state.finish_at)
+
+        if not finishes:
+            return None
+        pending = [finish for finish in finishes if finish is not None]
+        if not pending:
+            return 0
+        seconds = (max(pending) - (now or datetime.utcnow())).total_seconds()
+        return math.ceil(max(seconds, 0.0) / 60)
+
+    def clear(self):
+        """Drop all tracked clients"""
+        self.clients.clear()
+
+
+# Global estimator, fed by client updates and telemetry reports
+round_eta = RoundETAEstimator()
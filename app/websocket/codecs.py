@@ -0,0 +1,84 @@
+"""
+WebSocket Message Codecs
+Wire formats selectable at connect time on /ws
+(e.g. /ws?encoding=msgpack&compression=deflate)
+"""
+import json
+import zlib
+from functools import lru_cache
+from typing import Union
+
+from fastapi import WebSocket
+from pydantic_core import to_jsonable_python
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+ENCODINGS = ("json", "msgpack")
+COMPRESSIONS = ("none", "deflate")
+
+# zlib's default level; each broadcast is compressed once, not per connection
+DEFLATE_LEVEL = 6
+
+Payload = Union[str, bytes]
+
+
+class Codec:
+    """
+    Encodes outgoing messages for one wire format
+
+    Plain JSON goes out as text frames. MessagePack and/or zlib "deflate"
+    compression go out as binary frames (decompress with
+    DecompressionStream("deflate") in the browser). Compression is applied
+    once per broadcast rather than once per connection, so don't also enable
+    permessage-deflate on the server for these clients.
+    """
+
+    def __init__(self, encoding: str = "json", compression: str = "none"):
+        self.encoding = encoding
+        self.compression = compression
+        self.binary = encoding != "json" or compression != "none"
+
+    def encode(self, message: dict) -> Payload:
+        """Serialize a message for this wire format"""
+        if self.encoding == "msgpack":
+            data: Payload = msgpack.packb(message, default=to_jsonable_python)
+        else:
+            data = json.dumps(message, default=to_jsonable_python)
+
+        if self.compression == "deflate":
+            raw = data.encode() if isinstance(data, str) else data
+            return zlib.compress(raw, DEFLATE_LEVEL)
+        return data
+
+    async def send(self, websocket: WebSocket, payload: Payload):
+        """Send an already-encoded payload"""
+        if self.binary:
+            await websocket.send_bytes(payload)  # type: ignore[arg-type]
+        else:
+            await websocket.send_text(payload)  # type: ignore[arg-type]
+
+    def __repr__(self) -> str:
+        return f"Codec({self.encoding!r}, {self.compression!r})"
+
+
+@lru_cache(maxsize=None)
+def get_codec(encoding: str = "json", compression: str = "none") -> Codec:
+    """
+    Get the shared codec for a wire format
+
+    Codecs are shared so broadcasts can encode once per codec.
+    Raises ValueError for unsupported formats.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"encoding must be one of: {', '.join(ENCODINGS)}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of: {', '.join(COMPRESSIONS)}")
+    if encoding == "msgpack" and msgpack is None:
+        raise ValueError("msgpack encoding is not available on this server")
+    return Codec(encoding, compression)
+
+
+JSON_CODEC = get_codec()
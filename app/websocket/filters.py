@@ -0,0 +1,102 @@
+"""
+WebSocket Subscription Filters
+Compiles the filter predicates sent with a subscribe action into matchers
+"""
+from typing import FrozenSet, Optional
+
+# Severity order used by the min_severity predicate
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+FILTER_KEYS = {"facility_id", "min_severity", "attack_type"}
+
+
+class SubscriptionFilter:
+    """
+    Compiled filter for a room subscription
+
+    Each predicate only applies to events whose data carries that field, so a
+    facility-filtered client in the dashboard room still receives fl_progress.
+    """
+
+    __slots__ = ("facility_ids", "min_severity_rank", "attack_types")
+
+    def __init__(
+        self,
+        facility_ids: Optional[FrozenSet[str]] = None,
+        min_severity_rank: Optional[int] = None,
+        attack_types: Optional[FrozenSet[str]] = None,
+    ):
+        self.facility_ids = facility_ids
+        self.min_severity_rank = min_severity_rank
+        self.attack_types = attack_types
+
+    def matches(self, data) -> bool:
+        """Check all predicates against an event's data"""
+        if (
+            self.facility_ids is not None
+            and isinstance(data, dict)
+            and "facility_id" in data
+            and data["facility_id"] not in self.facility_ids
+        ):
+            return False
+        return self.matches_attributes(data)
+
+    def matches_attributes(self, data) -> bool:
+        """Check the non-facility predicates (facility is resolved by the manager's index)"""
+        if not isinstance(data, dict):
+            return True
+
+        if self.min_severity_rank is not None and "severity" in data:
+            if SEVERITY_RANK.get(data["severity"], -1) < self.min_severity_rank:
+                return False
+
+        if self.attack_types is not None and "attack_type" in data:
+            if data["attack_type"] not in self.attack_types:
+                return False
+
+        return True
+
+
+def _as_string_set(name: str, value) -> FrozenSet[str]:
+    values = [value] if isinstance(value, str) else value
+    if not isinstance(values, list) or not values or not all(isinstance(v, str) for v in values):
+        raise ValueError(f"{name} must be a string or a non-empty list of strings")
+    return frozenset(values)
+
+
+def compile_filter(spec) -> Optional[SubscriptionFilter]:
+    """
+    Compile a subscribe action's "filters" object
+
+    Example: {"facility_id": ["facility_a"], "min_severity": "high", "attack_type": "T0846"}
+
+    Returns None when there is nothing to filter on.
+    Raises ValueError for malformed filters.
+    """
+    if spec is None:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("filters must be an object")
+
+    unknown = set(spec) - FILTER_KEYS
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+
+    facility_ids = None
+    if spec.get("facility_id") is not None:
+        facility_ids = _as_string_set("facility_id", spec["facility_id"])
+
+    min_severity_rank = None
+    if spec.get("min_severity") is not None:
+        if spec["min_severity"] not in SEVERITY_RANK:
+            raise ValueError(f"min_severity must be one of: {', '.join(SEVERITY_RANK)}")
+        min_severity_rank = SEVERITY_RANK[spec["min_severity"]]
+
+    attack_types = None
+    if spec.get("attack_type") is not None:
+        attack_types = _as_string_set("attack_type", spec["attack_type"])
+
+    if facility_ids is None and min_severity_rank is None and attack_types is None:
+        return None
+
+    return SubscriptionFilter(facility_ids, min_severity_rank, attack_types)
@@ -2,56 +2,260 @@
 WebSocket Connection Manager
 Handles WebSocket connections, rooms, and broadcasting
 """
-from typing import Dict, List
+import logging
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional, Set
 
 from fastapi import WebSocket
 
+from app.config import settings
+from app.websocket.codecs import JSON_CODEC, Codec, Payload
+from app.websocket.filters import SubscriptionFilter
+
+logger = logging.getLogger(__name__)
+
 
 class ConnectionManager:
     """Manages WebSocket connections and rooms"""
 
-    def __init__(self):
+    def __init__(self, replay_buffer_size: int = settings.WS_REPLAY_BUFFER_SIZE):
         # List of all active connections
         self.active_connections: List[WebSocket] = []
+        # Wire format negotiated by each connection (JSON text if absent)
+        self.codecs: Dict[WebSocket, Codec] = {}
         # Map of room name to list of connections
         self.rooms: Dict[str, List[WebSocket]] = {}
+        # Filters of filtered subscriptions, per room
+        self.room_filters: Dict[str, Dict[WebSocket, SubscriptionFilter]] = {}
+        # Per room: connections without a facility predicate, and the
+        # connections interested in each facility
+        self.unscoped_connections: Dict[str, List[WebSocket]] = {}
+        self.facility_index: Dict[str, Dict[str, List[WebSocket]]] = {}
+        # Connections that asked for delta state updates, per room
+        self.delta_subscribers: Dict[str, Set[WebSocket]] = {}
+        # Identifies this process's sequence space; clients holding a seq from
+        # another epoch (e.g. before a restart) must resync from a snapshot
+        self.epoch = uuid.uuid4().hex
+        # Last sequence number stamped per room
+        self.room_seq: Dict[str, int] = {}
+        # Bounded ring buffer of recent stamped events per room
+        self.replay_buffer_size = replay_buffer_size
+        self.replay_buffers: Dict[str, Deque[dict]] = {}
+
+    def connect(
+        self,
+        websocket: WebSocket,
+        room: str | None = None,
+        subscription_filter: Optional[SubscriptionFilter] = None,
+        codec: Optional[Codec] = None,
+        deltas: bool = False,
+    ):
+        """Add a new WebSocket connection, optionally subscribed to a filtered room"""
+        if websocket not in self.active_connections:
+            self.active_connections.append(websocket)
 
-    def connect(self, websocket: WebSocket, room: str | None = None):
-        """Add a new WebSocket connection"""
-        self.active_connections.append(websocket)
+        if codec is not None and codec is not JSON_CODEC:
+            self.codecs[websocket] = codec
 
         # Add to room if specified
         if room:
-            if room not in self.rooms:
-                self.rooms[room] = []
-            self.rooms[room].append(websocket)
+            # Resubscribing replaces the previous filter
+            self.leave_room(websocket, room)
+
+            self.rooms.setdefault(room, []).append(websocket)
+
+            if deltas:
+                self.delta_subscribers.setdefault(room, set()).add(websocket)
+
+            if subscription_filter is not None:
+                self.room_filters.setdefault(room, {})[websocket] = subscription_filter
+
+            if subscription_filter is None or subscription_filter.facility_ids is None:
+                self.unscoped_connections.setdefault(room, []).append(websocket)
+            else:
+                index = self.facility_index.setdefault(room, {})
+                for facility_id in subscription_filter.facility_ids:
+                    index.setdefault(facility_id, []).append(websocket)
+
+    def leave_room(self, websocket: WebSocket, room: str):
+        """Remove a WebSocket connection from a single room"""
+        room_connections = self.rooms.get(room)
+        if not room_connections or websocket not in room_connections:
+            return
+        room_connections.remove(websocket)
+        self.delta_subscribers.get(room, set()).discard(websocket)
+
+        subscription_filter = self.room_filters.get(room, {}).pop(websocket, None)
+        if subscription_filter is None or subscription_filter.facility_ids is None:
+            self.unscoped_connections[room].remove(websocket)
+        else:
+            index = self.facility_index[room]
+            for facility_id in subscription_filter.facility_ids:
+                index[facility_id].remove(websocket)
+                if not index[facility_id]:
+                    del index[facility_id]
 
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
         # Remove from active connections
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.codecs.pop(websocket, None)
 
         # Remove from all rooms
-        for room_connections in self.rooms.values():
-            if websocket in room_connections:
-                room_connections.remove(websocket)
+        for room in list(self.rooms):
+            self.leave_room(websocket, room)
 
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
-        for connection in self.active_connections:
-            await connection.send_json(message)
+        await self._send_to(list(self.active_connections), message)
 
-    async def broadcast_to_room(self, room: str, message: dict):
-        """Broadcast message to all clients in a specific room"""
-        if room in self.rooms:
-            for connection in self.rooms[room]:
-                await connection.send_json(message)
+    async def broadcast_to_room(self, room: str, message: dict, delta: Optional[dict] = None):
+        """
+        Broadcast message to all clients in a specific room
+
+        The message is stamped with the room name and the room's next sequence
+        number, and kept in the room's replay buffer even when nobody is
+        listening so reconnecting clients can catch up. It is only sent to
+        connections whose filters match.
+
+        If a delta version of the message is given, connections subscribed
+        with deltas receive it (under the same seq) instead; replays always
+        use the full message.
+        """
+        stamped = self._stamp(room, message)
+
+        recipients = self._match_recipients(room, message.get("data"))
+        if not recipients:
+            return
+
+        delta_subscribers = self.delta_subscribers.get(room)
+        if delta is None or not delta_subscribers:
+            await self._send_to(recipients, stamped)
+            return
+
+        full_recipients = [ws for ws in recipients if ws not in delta_subscribers]
+        delta_recipients = [ws for ws in recipients if ws in delta_subscribers]
+        if full_recipients:
+            await self._send_to(full_recipients, stamped)
+        if delta_recipients:
+            await self._send_to(delta_recipients, {**delta, "room": room, "seq": stamped["seq"]})
+
+    async def send_personal_message(self, websocket: WebSocket, message: dict):
+        """Send a message to a single connection in its negotiated wire format"""
+        codec = self.get_codec(websocket)
+        await codec.send(websocket, codec.encode(message))
+
+    def get_codec(self, websocket: WebSocket) -> Codec:
+        """Get the wire format a connection negotiated"""
+        return self.codecs.get(websocket, JSON_CODEC)
 
     def get_room_connections(self, room: str) -> List[WebSocket]:
         """Get all connections in a specific room"""
         return self.rooms.get(room, [])
 
+    def get_subscription_filter(
+        self, websocket: WebSocket, room: str
+    ) -> Optional[SubscriptionFilter]:
+        """Get the filter a connection subscribed to a room with, if any"""
+        return self.room_filters.get(room, {}).get(websocket)
+
+    def get_room_seq(self, room: str) -> int:
+        """Get the last sequence number stamped in a room (0 if none yet)"""
+        return self.room_seq.get(room, 0)
+
+    def get_missed_events(
+        self,
+        room: str,
+        since_seq: int,
+        epoch: Optional[str] = None,
+        subscription_filter: Optional[SubscriptionFilter] = None,
+    ) -> Optional[List[dict]]:
+        """
+        Get the events a client missed in a room after since_seq
+
+        Returns None when the gap cannot be filled from the replay buffer
+        (events already evicted, or the seq belongs to another epoch), in which
+        case the client needs a snapshot instead.
+        """
+        if epoch is not None and epoch != self.epoch:
+            return None
+
+        current_seq = self.get_room_seq(room)
+        if since_seq == current_seq:
+            return []
+        if since_seq > current_seq:
+            return None
+
+        buffer = self.replay_buffers.get(room)
+        if not buffer or buffer[0]["seq"] > since_seq + 1:
+            return None
+
+        # Sequence numbers are contiguous within the buffer
+        start = since_seq + 1 - buffer[0]["seq"]
+        missed = islice(buffer, start, None)
+        if subscription_filter is not None:
+            return [m for m in missed if subscription_filter.matches(m.get("data"))]
+        return list(missed)
+
+    def _match_recipients(self, room: str, data) -> List[WebSocket]:
+        """Select the room's connections whose filters accept the event data"""
+        filters = self.room_filters.get(room)
+        if not filters:
+            return list(self.rooms.get(room, []))
+
+        if isinstance(data, dict) and "facility_id" in data:
+            candidates: Iterable[WebSocket] = self.unscoped_connections.get(room, []) + (
+                self.facility_index.get(room, {}).get(data["facility_id"], [])
+            )
+        else:
+            candidates = self.rooms.get(room, [])
+
+        recipients = []
+        for connection in candidates:
+            subscription_filter = filters.get(connection)
+            if subscription_filter is None or subscription_filter.matches_attributes(data):
+                recipients.append(connection)
+        return recipients
+
+    async def _send_to(self, connections: List[WebSocket], message: dict):
+        """
+        Send a message to many connections, dropping connections that fail
+
+        The message is serialized at most once per wire format in use.
+        """
+        payloads: Dict[Codec, Payload] = {}
+        failed = []
+        for connection in connections:
+            codec = self.codecs.get(connection, JSON_CODEC)
+            payload = payloads.get(codec)
+            if payload is None:
+                payload = payloads[codec] = codec.encode(message)
+            try:
+                await codec.send(connection, payload)
+            except Exception as e:
+                logger.warning(f"Dropping WebSocket connection after send error: {e}")
+                failed.append(connection)
+
+        for connection in failed:
+            self.disconnect(connection)
+
+    def _stamp(self, room: str, message: dict) -> dict:
+        """Assign the room's next sequence number and record it for replay"""
+        seq = self.room_seq.get(room, 0) + 1
+        self.room_seq[room] = seq
+
+        stamped = {**message, "room": room, "seq": seq}
+
+        buffer = self.replay_buffers.get(room)
+        if buffer is None:
+            buffer = self.replay_buffers[room] = deque(maxlen=self.replay_buffer_size)
+        buffer.append(stamped)
+
+        return stamped
+
 
 # Global connection manager instance
 manager = ConnectionManager()
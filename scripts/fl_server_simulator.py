@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+FL server simulator for load testing the FL API
+Stands in for the FL server: registers simulated facilities, then drives
+rounds end to end (trigger -> training -> aggregating -> complete) with one
+task per client reporting epochs at its own rate, with jitter and dropouts.
+
+Reports:
+- API latency per endpoint (p50/p95/p99/max)
+- Database write rate (from pg_stat_database, plus the API's buffer counters)
+- Event fan-out latency (progress update sent -> fl_progress received on /ws)
+
+Usage (API running on localhost:8000):
+    poetry run python scripts/fl_server_simulator.py --facilities 200 --rounds 3
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import websockets
+
+from app.config import settings
+
+FL_STATUS_ROOM = "fl-status"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sample list"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> str:
+    """Latency summary in milliseconds"""
+    if not samples:
+        return "no samples"
+    ms = [s * 1000 for s in samples]
+    return (
+        f"n={len(ms):<6} p50={percentile(ms, 50):7.1f}  p95={percentile(ms, 95):7.1f}  "
+        f"p99={percentile(ms, 99):7.1f}  max={max(ms):7.1f} ms"
+    )
+
+
+class Metrics:
+    """Latency samples and error counts collected during the run"""
+
+    def __init__(self):
+        self.latency: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        # (round_id, progress, phase) -> when the progress update was sent
+        self.progress_sent: Dict[Tuple[int, int, str], float] = {}
+        self.fanout: List[float] = []
+
+    async def call(
+        self, http: httpx.AsyncClient, method: str, label: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        """Send a request, timing it under `label`; returns None on failure"""
+        start = time.perf_counter()
+        try:
+            response = await http.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.latency[label].append(time.perf_counter() - start)
+        if response.is_error:
+            self.errors[label] += 1
+            return None
+        return response
+
+
+class DatabaseStats:
+    """Transaction and row write counters of the API's database"""
+
+    def __init__(self, database_url: str):
+        # asyncpg takes a plain postgresql:// URL
+        self.dsn = database_url.replace("postgresql+asyncpg://", "postgresql://")
+
+    async def sample(self) -> Optional[dict]:
+        try:
+            import asyncpg
+        except ImportError:
+            return None
+        try:
+            conn = await asyncpg.connect(self.dsn)
+        except Exception as e:
+            print(f"⚠️  Database stats unavailable: {e}")
+            return None
+        try:
+            row = await conn.fetchrow(
+                "SELECT xact_commit, tup_inserted, tup_updated, tup_deleted "
+                "FROM pg_stat_database WHERE datname = current_database()"
+            )
+            return dict(row)
+        finally:
+            await conn.close()
+
+
+class SimulatedClient:
+    """One facility's training: reports each epoch at its own rate"""
+
+    def __init__(self, client: dict, args: argparse.Namespace):
+        self.id = client["id"]
+        self.total_epochs = client["total_epochs"]
+        self.epoch = 0
+        self.dropped = False
+        self.loss = 1.0
+        self.accuracy = 50.0
+        # Slower or faster facilities, spread around the mean epoch time
+        self.seconds_per_epoch = args.epoch_seconds * random.uniform(
+            1 - args.rate_spread, 1 + args.rate_spread
+        )
+        self.jitter = args.jitter
+        self.dropout = args.dropout
+
+    @property
+    def done(self) -> bool:
+        return self.dropped or self.epoch >= self.total_epochs
+
+    async def train(self, http: httpx.AsyncClient, metrics: Metrics):
+        url = f"/api/fl/clients/{self.id}/telemetry"
+        while not self.done:
+            await asyncio.sleep(
+                max(0.0, self.seconds_per_epoch * random.uniform(1 - self.jitter, 1 + self.jitter))
+            )
+            if random.random() < self.dropout:
+                self.dropped = True
+                await metrics.call(http, "POST", "POST telemetry", url, json={"status": "offline"})
+                return
+
+            self.epoch += 1
+            self.loss *= random.uniform(0.75, 0.95)
+            self.accuracy = min(99.0, self.accuracy + random.uniform(2.0, 6.0))
+            await metrics.call(
+                http,
+                "POST",
+                "POST telemetry",
+                url,
+                json={
+                    "status": "active",
+                    "current_epoch": self.epoch,
+                    "progress": round(100 * self.epoch / self.total_epochs),
+                    "loss": round(self.loss, 4),
+                    "accuracy": round(self.accuracy, 2),
+                },
+            )
+
+
+async def update_progress(
+    http: httpx.AsyncClient, metrics: Metrics, round_id: int, progress: int, phase: str
+):
+    body = {"progress": progress, "phase": phase}
+    metrics.progress_sent.setdefault((round_id, progress, phase), time.perf_counter())
+    await metrics.call(
+        http, "PUT", "PUT round progress", f"/api/fl/rounds/{round_id}/progress", json=body
+    )
+
+
+async def run_round(http: httpx.AsyncClient, metrics: Metrics, args: argparse.Namespace) -> bool:
+    """Drive one round from trigger to completion"""
+    response = await metrics.call(http, "POST", "POST trigger round", "/api/fl/rounds/trigger")
+    if response is None:
+        print("❌ Could not trigger a round")
+        return False
+    fl_round = response.json()
+    round_id = fl_round["id"]
+    clients = [SimulatedClient(client, args) for client in fl_round["clients"]]
+    print(f"\n🔄 Round {fl_round['round_number']} (id {round_id}): {len(clients)} clients")
+
+    await update_progress(http, metrics, round_id, 0, "training")
+    # Training covers 0-90%; the first update moves the round to training
+    training = [asyncio.create_task(client.train(http, metrics)) for client in clients]
+    last_progress = 0
+    while not all(client.done for client in clients):
+        await asyncio.sleep(args.progress_interval)
+        live = [client for client in clients if not client.dropped] or clients
+        progress = round(90 * sum(c.epoch / c.total_epochs for c in live) / len(live))
+        if progress != last_progress:
+            await update_progress(http, metrics, round_id, progress, "training")
+            last_progress = progress
+    await asyncio.gather(*training)
+
+    dropped = sum(client.dropped for client in clients)
+    await update_progress(http, metrics, round_id, 95, "aggregating")
+    await asyncio.sleep(args.aggregation_seconds)
+
+    finished = [client for client in clients if not client.dropped] or clients
+    accuracy = sum(client.accuracy for client in finished) / len(finished)
+    await metrics.call(
+        http,
+        "POST",
+        "POST complete round",
+        f"/api/fl/rounds/{round_id}/complete",
+        json={"model_accuracy": round(accuracy, 2)},
+    )
+    print(f"   ✅ Complete: accuracy {accuracy:.1f}%, {dropped} client(s) dropped out")
+    return True
+
+
+async def subscribe(ws_url: str, metrics: Metrics, ready: asyncio.Event, stop: asyncio.Event):
+    """Listen on the FL status room and time each progress event's arrival"""
+    try:
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            await ws.send(json.dumps({"action": "subscribe", "room": FL_STATUS_ROOM}))
+            ready.set()
+            while not stop.is_set():
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                received = time.perf_counter()
+                message = json.loads(raw)
+                if message.get("type") != "fl_progress":
+                    continue
+                data = message["data"]
+                sent = metrics.progress_sent.get((data["id"], data["progress"], data["phase"]))
+                if sent is not None:
+                    metrics.fanout.append(received - sent)
+    except (OSError, websockets.WebSocketException) as e:
+        print(f"⚠️  WebSocket subscriber failed: {e}")
+        ready.set()
+
+
+async def register_facilities(http: httpx.AsyncClient, metrics: Metrics, count: int):
+    facilities = [
+        {"id": f"sim_facility_{i:04d}", "name": f"Simulated Facility {i}", "fl_eligible": True}
+        for i in range(1, count + 1)
+    ]
+    response = await metrics.call(
+        http, "POST", "POST facilities", "/api/fl/facilities", json=facilities
+    )
+    if response is None:
+        raise SystemExit("❌ Could not register facilities; is the API running?")
+    print(f"🏭 Registered {count} simulated facilities")
+
+
+async def retire_facilities(http: httpx.AsyncClient, metrics: Metrics, count: int):
+    """Make the simulated facilities ineligible so later rounds don't include them"""
+    for i in range(1, count + 1):
+        await metrics.call(
+            http,
+            "PATCH",
+            "PATCH facility",
+            f"/api/fl/facilities/sim_facility_{i:04d}",
+            json={"fl_eligible": False},
+        )
+
+
+async def report(
+    metrics: Metrics,
+    http: httpx.AsyncClient,
+    elapsed: float,
+    db_before: Optional[dict],
+    db_after: Optional[dict],
+    subscribers: int,
+):
+    print("\n" + "=" * 72)
+    print(f"📊 Results ({elapsed:.1f}s)")
+    print("=" * 72)
+
+    print("\nAPI latency:")
+    for label, samples in sorted(metrics.latency.items()):
+        errors = metrics.errors.get(label, 0)
+        print(f"  {label:<22} {summarize(samples)}  errors={errors}")
+    for label in sorted(set(metrics.errors) - set(metrics.latency)):
+        print(f"  {label:<22} errors={metrics.errors[label]}")
+
+    requests = sum(len(samples) for samples in metrics.latency.values())
+    print(f"  throughput: {requests / elapsed:.1f} requests/s")
+
+    print("\nDatabase writes:")
+    if db_before and db_after:
+        delta = {key: db_after[key] - db_before[key] for key in db_before}
+        rows = delta["tup_inserted"] + delta["tup_updated"] + delta["tup_deleted"]
+        print(
+            f"  {delta['xact_commit'] / elapsed:.1f} commits/s, {rows / elapsed:.1f} rows/s "
+            f"({delta['xact_commit']} commits, {rows} rows; includes other database activity)"
+        )
+    else:
+        print("  pg_stat_database not available")
+    for label, path in (
+        ("telemetry buffer", "/telemetry/status"),
+        ("round coordinator", "/fl/coordinator/status"),
+    ):
+        response = await metrics.call(http, "GET", f"GET {path}", path)
+        if response is not None:
+            print(f"  {label}: {response.json()}")
+
+    print(f"\nEvent fan-out ({subscribers} subscriber(s), update sent -> fl_progress received):")
+    print(f"  {summarize(metrics.fanout)}")
+
+
+async def main(args: argparse.Namespace):
+    random.seed(args.seed)
+    metrics = Metrics()
+    database_stats = None if args.no_db_stats else DatabaseStats(args.database_url)
+    ws_url = args.base_url.replace("http", "ws", 1) + "/ws"
+    limits = httpx.Limits(max_connections=args.max_connections)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as http:
+        await register_facilities(http, metrics, args.facilities)
+        try:
+            stop = asyncio.Event()
+            readies = [asyncio.Event() for _ in range(args.subscribers)]
+            listeners = [
+                asyncio.create_task(subscribe(ws_url, metrics, ready, stop)) for ready in readies
+            ]
+            await asyncio.gather(*(ready.wait() for ready in readies))
+
+            db_before = await database_stats.sample() if database_stats else None
+            start = time.perf_counter()
+            try:
+                for _ in range(args.rounds):
+                    if not await run_round(http, metrics, args):
+                        break
+            finally:
+                elapsed = time.perf_counter() - start
+                # Let the last events arrive
+                await asyncio.sleep(1)
+                stop.set()
+                await asyncio.gather(*listeners)
+
+            db_after = await database_stats.sample() if database_stats else None
+            await report(metrics, http, elapsed, db_before, db_after, args.subscribers)
+        finally:
+            # Even after a failed or interrupted run, so real rounds don't enroll them
+            if not args.keep_facilities:
+                await retire_facilities(http, metrics, args.facilities)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--facilities", type=int, default=50, help="Simulated facilities")
+    parser.add_argument("--rounds", type=int, default=1, help="Rounds to run")
+    parser.add_argument(
+        "--epoch-seconds", type=float, default=1.0, help="Mean seconds per epoch per client"
+    )
+    parser.add_argument(
+        "--rate-spread",
+        type=float,
+        default=0.5,
+        help="Spread of per-client epoch rates around the mean (0.5 = +/-50%%)",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.2, help="Per-epoch timing jitter (0.2 = +/-20%%)"
+    )
+    parser.add_argument(
+        "--dropout", type=float, default=0.01, help="Chance a client drops out at each epoch"
+    )
+    parser.add_argument(
+        "--progress-interval", type=float, default=1.0, help="Seconds between round updates"
+    )
+    parser.add_argument(
+        "--aggregation-seconds", type=float, default=2.0, help="Time spent aggregating"
+    )
+    parser.add_argument(
+        "--subscribers", type=int, default=5, help="WebSocket clients in the FL status room"
+    )
+    parser.add_argument(
+        "--max-connections", type=int, default=100, help="HTTP connection pool size"
+    )
+    parser.add_argument(
+        "--database-url", default=settings.DATABASE_URL, help="Database to read write stats from"
+    )
+    parser.add_argument("--no-db-stats", action="store_true", help="Skip pg_stat_database")
+    parser.add_argument(
+        "--keep-facilities",
+        action="store_true",
+        help="Leave the simulated facilities eligible for later rounds",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
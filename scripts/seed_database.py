@@ -14,9 +14,11 @@ from uuid import uuid4
 
 from app.database import async_session_maker
 from app.repositories.alert_repository import AlertRepository
+from app.repositories.facility_repository import FacilityRepository
 from app.repositories.fl_repository import FLRepository
 from app.repositories.prediction_repository import PredictionRepository
 from app.schemas.alert import AlertCreate, AlertSourceSchema
+from app.schemas.facility import FacilityCreate
 from app.schemas.prediction import PredictionCreate, PredictedTechniqueSchema
 
 
@@ -154,6 +156,14 @@ async def seed_fl_rounds(db):
     
     repo = FLRepository(db)
     
+    # Register the demo facilities so every round has a client for each
+    await FacilityRepository(db).register(
+        [
+            FacilityCreate(id=f"facility_{c}", name=f"Facility {c.upper()}")
+            for c in "abcdef"
+        ]
+    )
+    
     # Create 3 completed rounds
     for round_num in range(1, 4):
         fl_round = await repo.create_round(round_num)
@@ -286,6 +296,7 @@ async def main():
             alerts = await seed_alerts(db)
             fl_round = await seed_fl_rounds(db)
             predictions = await seed_predictions(db, alerts)
+            await db.commit()
             
             print()
             print("✅ Database seeding completed successfully!")
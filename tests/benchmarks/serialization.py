@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Response Serialization Micro-benchmark
+Compares, per endpoint payload, the classic FastAPI path (re-validate against
+the response_model, jsonable_encoder, stdlib json) with FastJSONResponse
+serializing the models the endpoint already built.
+
+Usage:
+    python -m tests.benchmarks.serialization --iterations 200
+"""
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.responses import FastJSONResponse, orjson
+from app.schemas.alert import AlertListItem, AlertResponse, AlertSourceSchema
+from app.schemas.fl_status import FLClientSchema, FLRoundResponse
+from app.schemas.prediction import PredictedTechniqueSchema, PredictionResponse
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _source(i: int) -> AlertSourceSchema:
+    return AlertSourceSchema(
+        layer=i % 3 + 1,
+        model_name="Isolation Forest",
+        confidence=0.87,
+        detection_time=NOW,
+        evidence="Unusual Modbus write frequency " * 4,
+        context_evidence={"window": "5m", "baseline": 12, "observed": 97},
+    )
+
+
+def _alert_list(rows: int = 100) -> dict:
+    alerts = [
+        AlertListItem(
+            id=uuid4(),
+            timestamp=NOW - timedelta(minutes=i),
+            facility_id=f"facility_{'abcdef'[i % 6]}",
+            severity="high",
+            title="Port Scan Detected",
+            description="Sequential connection attempts across the PLC subnet",
+            status="new",
+            attack_type="T0846",
+            attack_name="Remote System Discovery",
+        ).model_dump(exclude_unset=True)
+        for i in range(rows)
+    ]
+    return {"alerts": alerts, "total": 1000, "page": 1, "pages": 10, "limit": rows}
+
+
+def _alert_detail() -> AlertResponse:
+    return AlertResponse(
+        id=uuid4(),
+        timestamp=NOW,
+        facility_id="facility_a",
+        severity="critical",
+        title="Unauthorized PLC Write",
+        description="Write to holding registers from an unknown host",
+        status="new",
+        sources=[_source(i) for i in range(3)],
+        attack_type="T0855",
+        attack_name="Unauthorized Command Message",
+    )
+
+
+def _rounds(count: int = 10, clients: int = 6) -> dict:
+    rounds = [
+        FLRoundResponse(
+            id=r,
+            round_number=r,
+            status="completed",
+            phase="complete",
+            start_time=NOW,
+            end_time=NOW + timedelta(minutes=20),
+            progress=100,
+            epsilon=0.5,
+            model_accuracy=0.94,
+            clients_active=clients,
+            total_clients=clients,
+            clients=[
+                FLClientSchema(
+                    id=uuid4(),
+                    facility_id=f"facility_{c}",
+                    name=f"Facility {c}",
+                    status="active",
+                    progress=100,
+                    current_epoch=10,
+                    total_epochs=10,
+                    loss=0.12,
+                    accuracy=0.93,
+                    last_update=NOW,
+                )
+                for c in range(clients)
+            ],
+        )
+        for r in range(count)
+    ]
+    return {"rounds": rounds}
+
+
+def _predictions(count: int = 10, techniques: int = 5) -> dict:
+    predictions = [
+        PredictionResponse(
+            id=uuid4(),
+            current_technique="T0846",
+            current_technique_name="Remote System Discovery",
+            alert_id=uuid4(),
+            timestamp=NOW,
+            validated=False,
+            predicted_techniques=[
+                PredictedTechniqueSchema(
+                    technique_id=f"T08{60 + t}",
+                    technique_name="Program Download",
+                    probability=0.5 / (t + 1),
+                    rank=t + 1,
+                    timeframe="~15 min",
+                )
+                for t in range(techniques)
+            ],
+        )
+        for _ in range(count)
+    ]
+    return {"predictions": predictions}
+
+
+# endpoint -> (payload factory, response_model)
+ENDPOINTS: Dict[str, Tuple[Callable[[], Any], Any]] = {
+    "GET /api/alerts": (_alert_list, dict),
+    "GET /api/alerts/{id}": (_alert_detail, AlertResponse),
+    "GET /api/fl/rounds": (_rounds, dict),
+    "GET /api/predictions": (_predictions, dict),
+}
+
+
+def classic_render(content: Any, adapter: TypeAdapter) -> bytes:
+    """Re-validate against the response_model, then jsonable_encoder + json.dumps"""
+    validated = adapter.validate_python(content, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(validated),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_render(content: Any) -> bytes:
+    """Serialize the already-built content once"""
+    return FastJSONResponse(content).body
+
+
+@dataclass
+class EndpointResult:
+    endpoint: str
+    payload_bytes: int
+    classic_us: float
+    fast_us: float
+
+    @property
+    def speedup(self) -> float:
+        return self.classic_us / self.fast_us if self.fast_us else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "payload_bytes": self.payload_bytes,
+            "classic_us": round(self.classic_us, 1),
+            "fast_us": round(self.fast_us, 1),
+            "speedup": round(self.speedup, 2),
+        }
+
+
+def _time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    func()  # warm up caches (TypeAdapter schemas, encoders)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def run_benchmark(iterations: int = 200) -> List[EndpointResult]:
+    """Time both serialization paths for every endpoint payload"""
+    results = []
+    for endpoint, (factory, response_model) in ENDPOINTS.items():
+        content = factory()
+        adapter = TypeAdapter(response_model)
+        results.append(
+            EndpointResult(
+                endpoint=endpoint,
+                payload_bytes=len(fast_render(content)),
+                classic_us=_time_per_call(lambda: classic_render(content, adapter), iterations),
+                fast_us=_time_per_call(lambda: fast_render(content), iterations),
+            )
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.iterations)
+
+    if args.json:
+        print(json.dumps([result.as_dict() for result in results]))
+        return
+
+    print("\n" + "=" * 72)
+    print(f"🧮 Response Serialization ({'orjson' if orjson else 'pydantic-core'})")
+    print("=" * 72)
+    print(f"   {'Endpoint':<24}{'Bytes':>9}{'Classic µs':>13}{'Fast µs':>11}{'Speedup':>10}")
+    for r in results:
+        print(
+            f"   {r.endpoint:<24}{r.payload_bytes:>9}{r.classic_us:>13.1f}"
+            f"{r.fast_us:>11.1f}{r.speedup:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
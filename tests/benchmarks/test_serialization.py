@@ -0,0 +1,35 @@
+"""
+Tests for the fast JSON response path
+Run tests/benchmarks/serialization.py directly for the per-endpoint timings
+"""
+import json
+
+import pytest
+from pydantic import TypeAdapter
+
+from tests.benchmarks.serialization import ENDPOINTS, classic_render, fast_render, run_benchmark
+
+
+class TestFastJSONResponse:
+    """FastJSONResponse must produce the same documents as the classic path"""
+
+    @pytest.mark.parametrize("endpoint", list(ENDPOINTS))
+    def test_matches_classic_encoding(self, endpoint):
+        """Test that both paths encode an endpoint's payload identically"""
+        factory, response_model = ENDPOINTS[endpoint]
+        content = factory()
+
+        classic = json.loads(classic_render(content, TypeAdapter(response_model)))
+        fast = json.loads(fast_render(content))
+
+        assert fast == classic
+
+    def test_bytes_are_sent_as_is(self):
+        """Test that pre-serialized bytes are not encoded again"""
+        assert fast_render(b'{"ok":true}') == b'{"ok":true}'
+
+    @pytest.mark.slow
+    def test_fast_path_is_not_slower(self):
+        """Test that the fast path beats the classic path for every endpoint"""
+        for result in run_benchmark(iterations=50):
+            assert result.fast_us < result.classic_us, result.as_dict()
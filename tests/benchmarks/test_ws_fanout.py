@@ -0,0 +1,36 @@
+"""
+Fan-out regression benchmark for the WebSocket ConnectionManager
+Small enough for CI; run tests/benchmarks/ws_fanout.py directly for large N
+"""
+import pytest
+
+from tests.benchmarks.ws_fanout import run_benchmark
+
+# Generous ceilings: these catch order-of-magnitude regressions, not noise
+MAX_P99_MS = 250.0
+MAX_MEMORY_PER_CONNECTION = 256 * 1024
+
+
+@pytest.mark.slow
+class TestWebSocketFanout:
+    """Fan-out latency, throughput and memory through the real /ws endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_fanout_delivers_every_event(self):
+        """Test that every event reaches every subscribed client within budget"""
+        result = await run_benchmark(clients=200, rooms=("alerts", "fl-status"), events=20, rate=0)
+
+        # 100 clients per room, 10 events per room
+        assert result.deliveries == 2000
+        assert result.p99_ms < MAX_P99_MS
+        assert result.memory_per_connection < MAX_MEMORY_PER_CONNECTION
+
+    @pytest.mark.asyncio
+    async def test_fanout_with_compression(self):
+        """Test that compressed binary fan-out delivers every event"""
+        result = await run_benchmark(
+            clients=100, rooms=("alerts",), events=10, rate=0, compression="deflate"
+        )
+
+        assert result.deliveries == 1000
+        assert result.p99_ms < MAX_P99_MS
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+WebSocket Fan-out Benchmark
+Runs the app in-process, attaches simulated clients to /ws over an in-memory
+ASGI transport, drives emit_* at a configurable rate and reports delivery
+latency, send throughput and memory per connection.
+
+Usage:
+    python -m tests.benchmarks.ws_fanout --clients 10000 --events 100 --rate 20
+"""
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.events.emitter import Room, emit_alert_created, emit_attack_detected, emit_fl_progress
+from app.main import app
+from app.websocket.manager import manager
+
+# Which emitter drives each room
+ROOM_EMITTERS: Dict[str, Callable] = {
+    Room.ALERTS: emit_alert_created,
+    Room.DASHBOARD: emit_alert_created,
+    Room.FL_STATUS: emit_fl_progress,
+    Room.ATTACK_GRAPH: emit_attack_detected,
+}
+
+FACILITIES = ["facility_a", "facility_b", "facility_c", "facility_d"]
+
+
+class SimulatedClient:
+    """A /ws client driven directly through the ASGI interface"""
+
+    def __init__(self, client_id: int, room: str, query_string: str = ""):
+        self.client_id = client_id
+        self.room = room
+        self.query_string = query_string
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.frames: List[tuple] = []  # (received_at, payload)
+        self.acks = 0
+        self._ack_event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    async def _receive(self):
+        return await self.inbox.get()
+
+    async def _send(self, message):
+        if message["type"] == "websocket.send":
+            payload = message.get("text")
+            if payload is None:
+                payload = message.get("bytes")
+            if self.acks < 2:
+                # Welcome + subscription ack
+                self.acks += 1
+                if self.acks == 2:
+                    self._ack_event.set()
+                return
+            # Keep a reference only; payloads are shared between clients
+            self.frames.append((time.perf_counter(), payload))
+
+    async def connect(self):
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": "/ws",
+            "raw_path": b"/ws",
+            "root_path": "",
+            "query_string": self.query_string.encode(),
+            "headers": [],
+            "client": ("simulated", self.client_id),
+            "server": ("benchmark", 80),
+            "subprotocols": [],
+        }
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        self.inbox.put_nowait(
+            {"type": "websocket.receive", "text": json.dumps(self._subscribe_action())}
+        )
+        self.task = asyncio.create_task(app(scope, self._receive, self._send))
+        await self._ack_event.wait()
+
+    def _subscribe_action(self) -> dict:
+        return {"action": "subscribe", "room": self.room}
+
+    async def close(self):
+        self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        if self.task:
+            await self.task
+
+
+@dataclass
+class BenchmarkResult:
+    clients: int
+    rooms: Sequence[str]
+    events: int
+    target_rate: float
+    duration: float = 0.0
+    deliveries: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    memory_per_connection: float = 0.0
+
+    @property
+    def p50_ms(self) -> float:
+        return statistics.median(self.latencies_ms) if self.latencies_ms else 0.0
+
+    @property
+    def p99_ms(self) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+    @property
+    def sends_per_second(self) -> float:
+        return self.deliveries / self.duration if self.duration else 0.0
+
+    @property
+    def achieved_rate(self) -> float:
+        return self.events / self.duration if self.duration else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "clients": self.clients,
+            "rooms": list(self.rooms),
+            "events": self.events,
+            "target_rate": self.target_rate,
+            "achieved_rate": round(self.achieved_rate, 1),
+            "deliveries": self.deliveries,
+            "p50_ms": round(self.p50_ms, 3),
+            "p99_ms": round(self.p99_ms, 3),
+            "sends_per_second": round(self.sends_per_second, 1),
+            "memory_per_connection_bytes": round(self.memory_per_connection),
+        }
+
+
+def _event_payload(room: str, i: int) -> dict:
+    """Build the data for the i-th event driven into a room"""
+    if room == Room.FL_STATUS:
+        return {
+            "id": 1,
+            "round_number": 1,
+            "progress": i % 101,
+            "phase": "training",
+            "clients": [
+                {"id": f, "facility_id": f, "progress": (i + n) % 101}
+                for n, f in enumerate(FACILITIES)
+            ],
+        }
+    if room == Room.ATTACK_GRAPH:
+        return {"technique_id": "T0846", "facility_id": FACILITIES[i % len(FACILITIES)]}
+    return {
+        "id": f"bench-{i}",
+        "facility_id": FACILITIES[i % len(FACILITIES)],
+        "severity": "high",
+        "title": "Benchmark alert",
+        "description": "x" * 256,
+        "sources": [],
+    }
+
+
+def _decode(payload) -> dict:
+    if isinstance(payload, bytes):
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error:
+            pass
+        try:
+            return json.loads(payload)
+        except (UnicodeDecodeError, ValueError):
+            import msgpack
+
+            return msgpack.unpackb(payload)
+    return json.loads(payload)
+
+
+async def run_benchmark(
+    clients: int = 1000,
+    rooms: Sequence[str] = (Room.ALERTS, Room.FL_STATUS),
+    events: int = 50,
+    rate: float = 20.0,
+    encoding: str = "json",
+    compression: str = "none",
+) -> BenchmarkResult:
+    """
+    Attach clients spread evenly across rooms, emit events round-robin over the
+    driven rooms at the target rate, then collect per-delivery latency
+    """
+    result = BenchmarkResult(clients=clients, rooms=rooms, events=events, target_rate=rate)
+    query_string = f"encoding={encoding}&compression={compression}"
+
+    simulated = [SimulatedClient(i, rooms[i % len(rooms)], query_string) for i in range(clients)]
+
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    for client in simulated:
+        await client.connect()
+
+    gc.collect()
+    attached, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result.memory_per_connection = (attached - baseline) / clients if clients else 0.0
+
+    # Emit start time per (room, seq); one emit may broadcast to several rooms
+    emitted_at: Dict[tuple, float] = {}
+    interval = 1.0 / rate if rate > 0 else 0.0
+    start = time.perf_counter()
+    for i in range(events):
+        room = rooms[i % len(rooms)]
+        emitter = ROOM_EMITTERS.get(room, emit_alert_created)
+        seq_before = dict(manager.room_seq)
+        sent_at = time.perf_counter()
+        await emitter(_event_payload(room, i))
+        for stamped_room, seq in manager.room_seq.items():
+            for new_seq in range(seq_before.get(stamped_room, 0) + 1, seq + 1):
+                emitted_at[(stamped_room, new_seq)] = sent_at
+
+        next_tick = start + (i + 1) * interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    result.duration = time.perf_counter() - start
+
+    # Decode after the run so parsing doesn't skew the fan-out timings
+    for client in simulated:
+        for received_at, payload in client.frames:
+            message = _decode(payload)
+            sent_at = emitted_at.get((message.get("room"), message.get("seq")))
+            if sent_at is not None:
+                result.latencies_ms.append((received_at - sent_at) * 1000)
+                result.deliveries += 1
+
+    for client in simulated:
+        await client.close()
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket fan-out benchmark")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument(
+        "--rooms",
+        default=f"{Room.ALERTS},{Room.FL_STATUS}",
+        help="Comma-separated rooms; clients and events are spread across them",
+    )
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20.0, help="Target events per second")
+    parser.add_argument("--encoding", default="json", choices=["json", "msgpack"])
+    parser.add_argument("--compression", default="none", choices=["none", "deflate"])
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_benchmark(
+            clients=args.clients,
+            rooms=args.rooms.split(","),
+            events=args.events,
+            rate=args.rate,
+            encoding=args.encoding,
+            compression=args.compression,
+        )
+    )
+
+    if args.json:
+        print(json.dumps(result.as_dict()))
+        return
+
+    print("\n" + "=" * 60)
+    print("📡 WebSocket Fan-out Benchmark")
+    print("=" * 60)
+    print(f"   Clients:              {result.clients} across {', '.join(result.rooms)}")
+    print(f"   Events:               {result.events} ({args.encoding}/{args.compression})")
+    print(f"   Rate:                 {result.achieved_rate:.1f}/s (target {result.target_rate}/s)")
+    print(f"   Deliveries:           {result.deliveries}")
+    print(f"   Latency p50 / p99:    {result.p50_ms:.2f} ms / {result.p99_ms:.2f} ms")
+    print(f"   Send throughput:      {result.sends_per_second:.0f} msgs/s")
+    print(f"   Memory / connection:  {result.memory_per_connection / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
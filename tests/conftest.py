@@ -6,11 +6,17 @@ from typing import AsyncGenerator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from app.database import Base, get_db
+from app.caching import response_cache
+from app.database import Base, WriteTrackingSession, get_db, get_read_db
+from app.fl import round_coordinator
 from app.main import app
+from app.privacy import privacy_accountant
+from app.repositories.fl_repository import round_pointer
+from app.telemetry import round_eta, telemetry_buffer
 
 # Test database URL (PostgreSQL test database)
 TEST_DATABASE_URL = (
@@ -42,16 +48,29 @@ async def setup_database():
     from app.models import (
         Alert,
         AlertSource,
+        Facility,
         FLClient,
+        FLClientMetric,
         FLRound,
         NetworkData,
         PredictedTechnique,
         Prediction,
     )
 
-    # Create tables
+    # Create tables and register the facilities seeded by the migrations
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Facility),
+            [
+                {"id": "facility_a", "name": "Facility A"},
+                {"id": "facility_b", "name": "Facility B"},
+            ],
+        )
+
+    # Ids restart with the tables, so forget rounds from earlier tests
+    round_pointer.clear()
+    round_coordinator.clear()
 
     yield
 
@@ -67,6 +86,7 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
     async_session = async_sessionmaker(
         test_engine,
         class_=AsyncSession,
+        sync_session_class=WriteTrackingSession,
         expire_on_commit=False,
     )
 
@@ -87,6 +107,12 @@ async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield test_db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    # Tables are recreated per test, so drop responses cached by earlier tests
+    response_cache.clear()
+    telemetry_buffer.clear()
+    round_eta.clear()
+    privacy_accountant.clear()
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -3,6 +3,9 @@ TDD Tests for Alerts API
 
 Write tests first, then implement the API endpoints to make them pass.
 """
+import csv
+import io
+import json
 from datetime import datetime
 from uuid import uuid4
 
@@ -88,6 +91,86 @@ class TestAlertsAPI:
         assert len(data["alerts"]) == 1
         assert data["alerts"][0]["title"] == "Port Scan"
 
+    @pytest.mark.asyncio
+    async def test_get_alerts_include_sources(self, client: AsyncClient):
+        """Test GET /api/alerts returns slim rows, with sources only on request"""
+        alert_data = {
+            "facility_id": "facility_a",
+            "severity": "high",
+            "title": "Port Scan",
+            "description": "Port scan detected",
+            "sources": [
+                {
+                    "layer": 1,
+                    "model_name": "Isolation Forest",
+                    "confidence": 0.88,
+                    "detection_time": datetime.utcnow().isoformat(),
+                    "evidence": "Suspicious activity",
+                }
+            ],
+            "context_analysis": {
+                "duration": "5m",
+                "pattern": "sweep",
+                "behavior": "scan",
+                "timeline": [],
+                "evidence": {},
+            },
+        }
+        await client.post("/api/alerts", json=alert_data)
+
+        response = await client.get("/api/alerts")
+        assert response.status_code == 200
+        row = response.json()["alerts"][0]
+        assert row["severity"] == "high"
+        assert row["status"] == "new"
+        assert "sources" not in row
+        assert "context_analysis" not in row
+
+        response = await client.get("/api/alerts?include=sources")
+        assert response.status_code == 200
+        row = response.json()["alerts"][0]
+        assert len(row["sources"]) == 1
+        assert row["sources"][0]["model_name"] == "Isolation Forest"
+
+    @pytest.mark.asyncio
+    async def test_export_alerts(self, client: AsyncClient):
+        """Test GET /api/alerts/export streams filtered alerts as NDJSON and CSV"""
+        for facility, severity in [
+            ("facility_a", "critical"),
+            ("facility_a", "low"),
+            ("facility_b", "critical"),
+        ]:
+            await client.post(
+                "/api/alerts",
+                json={
+                    "facility_id": facility,
+                    "severity": severity,
+                    "title": f"{severity} at {facility}",
+                    "description": "Test",
+                    "sources": [],
+                },
+            )
+
+        response = await client.get("/api/alerts/export?facility=facility_a")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 2
+        assert {row["severity"] for row in rows} == {"critical", "low"}
+        assert all(row["facility_id"] == "facility_a" for row in rows)
+
+        response = await client.get("/api/alerts/export?severity=critical&format=csv")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2
+        assert {row["facility_id"] for row in rows} == {"facility_a", "facility_b"}
+        assert rows[0]["status"] == "new"
+
+        response = await client.get("/api/alerts/export?facility=none&format=csv")
+        assert response.status_code == 200
+        assert response.text.strip().startswith("id,timestamp")
+
     @pytest.mark.asyncio
     async def test_get_alert_by_id(self, client: AsyncClient):
         """Test GET /api/alerts/{id} returns specific alert"""
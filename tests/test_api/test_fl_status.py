@@ -1,8 +1,41 @@
 """
 TDD Tests for FL Status API
 """
+from uuid import UUID, uuid4
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import WriteTrackingSession
+from app.fl import round_coordinator
+from app.models.fl_round import FLClient, FLRound
+from app.repositories.fl_repository import FLRepository
+from app.telemetry import telemetry_buffer
+from app.telemetry.buffer import MAX_FLUSH_ATTEMPTS
+from tests.conftest import test_engine
+
+session_factory = async_sessionmaker(
+    test_engine,
+    class_=AsyncSession,
+    sync_session_class=WriteTrackingSession,
+    expire_on_commit=False,
+)
+
+
+async def stored_client(client_id: str) -> FLClient:
+    """Read a client in a fresh session, bypassing the test session's identity map"""
+    async with session_factory() as session:
+        result = await session.execute(select(FLClient).where(FLClient.id == UUID(client_id)))
+        return result.scalar_one()
+
+
+async def stored_round(round_id: int) -> FLRound:
+    """Read a round in a fresh session, bypassing the test session's identity map"""
+    async with session_factory() as session:
+        result = await session.execute(select(FLRound).where(FLRound.id == round_id))
+        return result.scalar_one()
 
 
 class TestFLStatusAPI:
@@ -218,3 +251,509 @@ class TestFLStatusAPI:
         # Get current should return latest
         current = await client.get("/api/fl/rounds/current")
         assert current.json()["round_number"] == 2
+
+
+class TestClientTelemetry:
+    """Test suite for buffered client telemetry"""
+
+    @pytest.mark.asyncio
+    async def test_reports_are_buffered_and_served(self, client: AsyncClient):
+        """Test that reports are visible to reads before they are written"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        client_id = round_response.json()["clients"][0]["id"]
+
+        for epoch in (1, 2, 3):
+            response = await client.post(
+                f"/api/fl/clients/{client_id}/telemetry",
+                json={"current_epoch": epoch, "loss": 1.0 / epoch},
+            )
+            assert response.status_code == 202
+        assert response.json()["current_epoch"] == 3
+
+        # Reads serve the buffered state
+        data = (await client.get(f"/api/fl/clients/{client_id}")).json()
+        assert data["current_epoch"] == 3
+        current = (await client.get("/api/fl/rounds/current")).json()
+        reported = next(c for c in current["clients"] if c["id"] == client_id)
+        assert reported["current_epoch"] == 3
+
+        # Nothing has been written yet
+        assert (await stored_client(client_id)).current_epoch == 0
+        assert telemetry_buffer.status()["pending_clients"] == 1
+        assert telemetry_buffer.status()["reports"] == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_latest_values_in_one_batch(self, client: AsyncClient):
+        """Test that a flush writes each client's latest values once"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        first, second = (c["id"] for c in round_response.json()["clients"])
+
+        await client.post(f"/api/fl/clients/{first}/telemetry", json={"loss": 0.5})
+        await client.post(f"/api/fl/clients/{first}/telemetry", json={"current_epoch": 4})
+        await client.post(
+            f"/api/fl/clients/{second}/telemetry", json={"status": "delayed", "accuracy": 80.0}
+        )
+
+        assert await telemetry_buffer.flush(session_factory) == 2
+        assert telemetry_buffer.status()["pending_clients"] == 0
+
+        stored = await stored_client(first)
+        assert stored.loss == 0.5  # kept from the earlier report
+        assert stored.current_epoch == 4
+        stored = await stored_client(second)
+        assert stored.status == "delayed"
+        assert stored.accuracy == 80.0
+        assert stored.current_epoch == 0  # not reported, left unchanged
+
+        # Nothing left to write
+        assert await telemetry_buffer.flush(session_factory) == 0
+
+    @pytest.mark.asyncio
+    async def test_reports_keep_fl_validators_until_flush(self, client: AsyncClient):
+        """Test that only the flush's commit changes the FL data version"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        client_id = round_response.json()["clients"][0]["id"]
+        etag = (await client.get("/api/fl/rounds/history")).headers["ETag"]
+
+        for epoch in (1, 2):
+            await client.post(
+                f"/api/fl/clients/{client_id}/telemetry", json={"current_epoch": epoch}
+            )
+        assert (await client.get("/api/fl/rounds/history")).headers["ETag"] == etag
+
+        await telemetry_buffer.flush(session_factory)
+        assert (await client.get("/api/fl/rounds/history")).headers["ETag"] != etag
+
+    @pytest.mark.asyncio
+    async def test_unwritable_client_is_isolated(self, client: AsyncClient):
+        """Test that a client deleted before the flush doesn't block the others"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        kept, deleted = (c["id"] for c in round_response.json()["clients"])
+
+        await client.post(f"/api/fl/clients/{kept}/telemetry", json={"current_epoch": 2})
+        await client.post(f"/api/fl/clients/{deleted}/telemetry", json={"current_epoch": 3})
+        async with session_factory() as session:
+            await session.execute(delete(FLClient).where(FLClient.id == UUID(deleted)))
+            await session.commit()
+
+        # The batch's metrics insert fails the foreign key; only the deleted client is dropped
+        assert await telemetry_buffer.flush(session_factory) == 1
+        assert (await stored_client(kept)).current_epoch == 2
+        status = telemetry_buffer.status()
+        assert status["pending_clients"] == status["pending_epochs"] == 0
+        assert status["dropped_clients"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_flushes_are_capped(self, client: AsyncClient):
+        """Test that reports are retried a bounded number of times"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        client_id = round_response.json()["clients"][0]["id"]
+        await client.post(f"/api/fl/clients/{client_id}/telemetry", json={"current_epoch": 1})
+
+        def unreachable():
+            raise ConnectionRefusedError("database down")
+
+        for _ in range(MAX_FLUSH_ATTEMPTS - 1):
+            with pytest.raises(ConnectionRefusedError):
+                await telemetry_buffer.flush(unreachable)
+        assert telemetry_buffer.status()["pending_clients"] == 1
+        assert telemetry_buffer.status()["retrying_clients"] == 1
+
+        with pytest.raises(ConnectionRefusedError):
+            await telemetry_buffer.flush(unreachable)
+        status = telemetry_buffer.status()
+        assert status["pending_clients"] == status["pending_epochs"] == 0
+        assert status["dropped_clients"] == 1
+
+    @pytest.mark.asyncio
+    async def test_report_unknown_client(self, client: AsyncClient):
+        """Test that reports for unknown clients are rejected"""
+        response = await client.post(f"/api/fl/clients/{uuid4()}/telemetry", json={"loss": 0.1})
+
+        assert response.status_code == 404
+        assert telemetry_buffer.status()["pending_clients"] == 0
+
+    @pytest.mark.asyncio
+    async def test_direct_update_supersedes_buffer(self, client: AsyncClient):
+        """Test that PUT /api/fl/clients/{id} drops older buffered reports"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        client_id = round_response.json()["clients"][0]["id"]
+
+        await client.post(f"/api/fl/clients/{client_id}/telemetry", json={"progress": 10})
+        await client.put(f"/api/fl/clients/{client_id}", json={"progress": 50})
+
+        assert telemetry_buffer.status()["pending_clients"] == 0
+        assert (await client.get(f"/api/fl/clients/{client_id}")).json()["progress"] == 50
+
+
+class TestRoundMetrics:
+    """Test suite for per-epoch training history"""
+
+    @pytest.mark.asyncio
+    async def test_long_runs_are_downsampled(self, client: AsyncClient, test_db: AsyncSession):
+        """Test that thousands of epochs come back as at most `points` buckets"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        round_id = round_response.json()["id"]
+        client_id = round_response.json()["clients"][0]["id"]
+
+        await FLRepository(test_db).append_client_metrics(
+            [
+                {"client_id": UUID(client_id), "epoch": epoch, "loss": float(epoch)}
+                for epoch in range(1, 3001)
+            ]
+        )
+        await test_db.commit()
+
+        response = await client.get(f"/api/fl/rounds/{round_id}/metrics?points=10")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["points"] == 10
+
+        series = next(c for c in data["clients"] if c["client_id"] == client_id)
+        assert series["epochs_recorded"] == 3000
+        assert series["epochs"] == list(range(300, 3001, 300))
+        assert series["loss"][0] == pytest.approx(150.5)  # mean of epochs 1-300
+        assert series["accuracy"] == [None] * 10
+
+        other = next(c for c in data["clients"] if c["client_id"] != client_id)
+        assert other["epochs"] == []
+
+    @pytest.mark.asyncio
+    async def test_short_runs_keep_every_epoch(self, client: AsyncClient, test_db: AsyncSession):
+        """Test that runs shorter than `points` are returned as recorded"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        round_id = round_response.json()["id"]
+        client_id = UUID(round_response.json()["clients"][0]["id"])
+
+        repo = FLRepository(test_db)
+        await repo.append_client_metrics(
+            [{"client_id": client_id, "epoch": e, "accuracy": 50.0 + e} for e in range(1, 6)]
+        )
+        # Re-sent epochs replace the earlier point
+        await repo.append_client_metrics([{"client_id": client_id, "epoch": 5, "accuracy": 99.0}])
+        await test_db.commit()
+
+        data = (await client.get(f"/api/fl/rounds/{round_id}/metrics")).json()
+        series = next(c for c in data["clients"] if c["client_id"] == str(client_id))
+        assert series["epochs"] == [1, 2, 3, 4, 5]
+        assert series["accuracy"] == [51.0, 52.0, 53.0, 54.0, 99.0]
+
+    @pytest.mark.asyncio
+    async def test_telemetry_flush_appends_history(self, client: AsyncClient):
+        """Test that buffered telemetry reports become history points"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        round_id = round_response.json()["id"]
+        client_id = round_response.json()["clients"][0]["id"]
+
+        for epoch in (1, 2, 3):
+            await client.post(
+                f"/api/fl/clients/{client_id}/telemetry",
+                json={"current_epoch": epoch, "loss": 1.0 / epoch},
+            )
+        await telemetry_buffer.flush(session_factory)
+
+        data = (await client.get(f"/api/fl/rounds/{round_id}/metrics")).json()
+        series = next(c for c in data["clients"] if c["client_id"] == client_id)
+        assert series["epochs"] == [1, 2, 3]
+        assert series["loss"] == pytest.approx([1.0, 0.5, 1.0 / 3])
+
+    @pytest.mark.asyncio
+    async def test_client_update_appends_history(self, client: AsyncClient):
+        """Test that PUT /api/fl/clients/{id} reports become history points"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        round_id = round_response.json()["id"]
+        client_id = round_response.json()["clients"][0]["id"]
+
+        for epoch in (1, 2):
+            await client.put(
+                f"/api/fl/clients/{client_id}",
+                json={"current_epoch": epoch, "loss": 1.0 / epoch, "accuracy": 70.0 + epoch},
+            )
+        # Status-only updates add no point
+        await client.put(f"/api/fl/clients/{client_id}", json={"status": "delayed"})
+        # A metric without an epoch updates the current epoch's point
+        await client.put(f"/api/fl/clients/{client_id}", json={"accuracy": 75.0})
+
+        data = (await client.get(f"/api/fl/rounds/{round_id}/metrics")).json()
+        series = next(c for c in data["clients"] if c["client_id"] == client_id)
+        assert series["epochs"] == [1, 2]
+        assert series["loss"] == pytest.approx([1.0, 0.5])
+        assert series["accuracy"] == [71.0, 75.0]
+
+    @pytest.mark.asyncio
+    async def test_metrics_round_not_found(self, client: AsyncClient):
+        """Test GET /api/fl/rounds/{id}/metrics returns 404 for unknown rounds"""
+        response = await client.get("/api/fl/rounds/99999/metrics")
+
+        assert response.status_code == 404
+
+
+class TestRoundHistory:
+    """Test suite for /api/fl/rounds/history"""
+
+    @pytest.mark.asyncio
+    async def test_history_summaries_and_keyset_pages(self, client: AsyncClient):
+        """Test durations, client ratios, accuracy changes and paging"""
+        round_ids = []
+        for accuracy in (80.0, 85.5, None):
+            response = await client.post("/api/fl/rounds/trigger")
+            round_ids.append(response.json()["id"])
+            if accuracy is not None:
+                await client.post(
+                    f"/api/fl/rounds/{round_ids[-1]}/complete", json={"model_accuracy": accuracy}
+                )
+        latest_clients = response.json()["clients"]
+        await client.put(f"/api/fl/clients/{latest_clients[0]['id']}", json={"status": "offline"})
+
+        response = await client.get("/api/fl/rounds/history?limit=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["round_number"] for r in data["rounds"]] == [3, 2]
+        assert data["next_before"] == 2
+
+        current, previous = data["rounds"]
+        assert current["status"] == "in-progress"
+        assert current["clients"] == "1/2"
+        assert current["duration"] is None
+        assert current["accuracy_change"] is None
+        assert previous["clients"] == "2/2"
+        assert previous["duration"] >= 0
+        # Compared with round 1, which is on the next page
+        assert previous["accuracy_change"] == pytest.approx(5.5)
+
+        data = (await client.get("/api/fl/rounds/history?limit=2&before=2")).json()
+        assert [r["round_number"] for r in data["rounds"]] == [1]
+        assert data["rounds"][0]["accuracy_change"] is None
+        assert data["next_before"] is None
+
+    @pytest.mark.asyncio
+    async def test_history_empty(self, client: AsyncClient):
+        """Test GET /api/fl/rounds/history with no rounds"""
+        response = await client.get("/api/fl/rounds/history")
+
+        assert response.status_code == 200
+        assert response.json() == {"rounds": [], "next_before": None}
+
+
+class TestRoundETA:
+    """Test suite for round time_remaining"""
+
+    @pytest.mark.asyncio
+    async def test_time_remaining_after_client_reports(self, client: AsyncClient):
+        """Test that time_remaining is filled in once every active client has a throughput"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        round_id = round_response.json()["id"]
+        client_ids = [c["id"] for c in round_response.json()["clients"]]
+
+        for epoch in (1, 2):
+            await client.post(
+                f"/api/fl/clients/{client_ids[0]}/telemetry", json={"current_epoch": epoch}
+            )
+        current = (await client.get("/api/fl/rounds/current")).json()
+        assert current["time_remaining"] is None  # second client not measured yet
+
+        for epoch in (1, 2):
+            await client.put(f"/api/fl/clients/{client_ids[1]}", json={"current_epoch": epoch})
+
+        current = (await client.get("/api/fl/rounds/current")).json()
+        assert isinstance(current["time_remaining"], int)
+
+        response = await client.put(f"/api/fl/rounds/{round_id}/progress", json={"progress": 30})
+        assert isinstance(response.json()["time_remaining"], int)
+
+        completed = await client.post(
+            f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 90.0}
+        )
+        assert completed.json()["time_remaining"] is None
+
+
+class TestFacilityRegistry:
+    """Test suite for /api/fl/facilities"""
+
+    @pytest.mark.asyncio
+    async def test_rounds_use_eligible_facilities(self, client: AsyncClient):
+        """Test that new rounds get a client per registered, eligible facility"""
+        response = await client.post(
+            "/api/fl/facilities",
+            json=[{"id": f"plant_{i}", "name": f"Plant {i}"} for i in range(5)],
+        )
+        assert response.status_code == 201
+        assert len(response.json()) == 5
+
+        response = await client.patch("/api/fl/facilities/facility_b", json={"fl_eligible": False})
+        assert response.status_code == 200
+        assert response.json()["fl_eligible"] is False
+
+        data = (await client.post("/api/fl/rounds/trigger")).json()
+        assert data["total_clients"] == 6
+        assert sorted(c["facility_id"] for c in data["clients"]) == ["facility_a"] + [
+            f"plant_{i}" for i in range(5)
+        ]
+
+        eligible = (await client.get("/api/fl/facilities?fl_eligible=true")).json()
+        assert len(eligible) == 6
+
+    @pytest.mark.asyncio
+    async def test_register_updates_existing(self, client: AsyncClient):
+        """Test that registering an existing facility updates it"""
+        response = await client.post(
+            "/api/fl/facilities", json=[{"id": "facility_a", "name": "Main Plant"}]
+        )
+        assert response.json()[0]["name"] == "Main Plant"
+
+        facilities = (await client.get("/api/fl/facilities")).json()
+        assert [f["name"] for f in facilities] == ["Main Plant", "Facility B"]
+
+    @pytest.mark.asyncio
+    async def test_register_repeated_id(self, client: AsyncClient):
+        """Test that an id repeated in one batch is registered once, last entry winning"""
+        response = await client.post(
+            "/api/fl/facilities",
+            json=[
+                {"id": "plant_x", "name": "Draft"},
+                {"id": "facility_b", "name": "Facility B"},
+                {"id": "plant_x", "name": "Plant X", "fl_eligible": False},
+            ],
+        )
+        assert response.status_code == 201
+        assert sorted((f["id"], f["name"]) for f in response.json()) == [
+            ("facility_b", "Facility B"),
+            ("plant_x", "Plant X"),
+        ]
+
+        facilities = (await client.get("/api/fl/facilities")).json()
+        assert [f["id"] for f in facilities] == ["facility_a", "facility_b", "plant_x"]
+        assert facilities[2]["fl_eligible"] is False
+
+    @pytest.mark.asyncio
+    async def test_update_unknown_facility(self, client: AsyncClient):
+        """Test PATCH /api/fl/facilities/{id} returns 404 for unknown facilities"""
+        response = await client.patch("/api/fl/facilities/nowhere", json={"fl_eligible": False})
+
+        assert response.status_code == 404
+
+
+class TestCurrentRoundPointer:
+    """Test suite for the latest/current round lookups"""
+
+    @pytest.mark.asyncio
+    async def test_current_round_after_many_rounds(self, client: AsyncClient):
+        """Test GET /api/fl/rounds/current once several rounds exist"""
+        for _ in range(3):
+            round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+            await client.post(f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 90.0})
+
+        # All completed: the latest round is returned
+        data = (await client.get("/api/fl/rounds/current")).json()
+        assert data["round_number"] == 3
+        assert data["status"] == "completed"
+
+        await client.post("/api/fl/rounds/trigger")
+        data = (await client.get("/api/fl/rounds/current")).json()
+        assert data["round_number"] == 4
+        assert data["status"] == "in-progress"
+
+
+class TestRoundCoordinator:
+    """Test suite for the in-memory round state machine"""
+
+    @pytest.mark.asyncio
+    async def test_progress_is_kept_in_memory(self, client: AsyncClient):
+        """Test that progress updates are served before they are written"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+
+        for progress in (10, 20, 30):
+            response = await client.put(
+                f"/api/fl/rounds/{round_id}/progress", json={"progress": progress}
+            )
+            assert response.status_code == 200
+        assert response.json()["progress"] == 30
+
+        # Reads serve the in-memory state
+        assert (await client.get("/api/fl/rounds/current")).json()["progress"] == 30
+        assert (await client.get(f"/api/fl/rounds/{round_id}")).json()["progress"] == 30
+
+        # Nothing has been written until the snapshot
+        assert (await stored_round(round_id)).progress == 0
+        assert await round_coordinator.flush(session_factory) is True
+        assert (await stored_round(round_id)).progress == 30
+        assert await round_coordinator.flush(session_factory) is False
+
+    @pytest.mark.asyncio
+    async def test_flushed_client_progress_is_kept(self, client: AsyncClient):
+        """Test that progress updates serve client reports written by a flush"""
+        round_response = await client.post("/api/fl/rounds/trigger")
+        round_id = round_response.json()["id"]
+        client_id = round_response.json()["clients"][0]["id"]
+        url = f"/api/fl/rounds/{round_id}/progress"
+        await client.put(url, json={"progress": 10})
+
+        await client.post(
+            f"/api/fl/clients/{client_id}/telemetry", json={"current_epoch": 5, "progress": 50}
+        )
+        await telemetry_buffer.flush(session_factory)
+
+        for response in (
+            await client.put(url, json={"progress": 20}),
+            await client.get("/api/fl/rounds/current"),
+        ):
+            reported = next(c for c in response.json()["clients"] if c["id"] == client_id)
+            assert (reported["current_epoch"], reported["progress"]) == (5, 50)
+
+    @pytest.mark.asyncio
+    async def test_phase_change_is_written_immediately(self, client: AsyncClient):
+        """Test that moving to the next phase persists the round"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+
+        await client.put(f"/api/fl/rounds/{round_id}/progress", json={"progress": 40})
+        response = await client.put(
+            f"/api/fl/rounds/{round_id}/progress", json={"progress": 50, "phase": "training"}
+        )
+        assert response.status_code == 200
+
+        stored = await stored_round(round_id)
+        assert stored.phase.value == "training"
+        assert stored.progress == 50
+        assert round_coordinator.status()["unpersisted"] is False
+
+    @pytest.mark.asyncio
+    async def test_invalid_transitions_are_rejected(self, client: AsyncClient):
+        """Test that skipped, backward and completing phases return 409"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+        url = f"/api/fl/rounds/{round_id}/progress"
+
+        skipped = await client.put(url, json={"progress": 10, "phase": "aggregating"})
+        assert skipped.status_code == 409
+
+        await client.put(url, json={"progress": 20, "phase": "training"})
+        backward = await client.put(url, json={"progress": 30, "phase": "distributing"})
+        assert backward.status_code == 409
+
+        completing = await client.put(url, json={"progress": 100, "phase": "complete"})
+        assert completing.status_code == 409
+
+        # A rejected update changes nothing
+        data = (await client.get(f"/api/fl/rounds/{round_id}")).json()
+        assert data["phase"] == "training"
+        assert data["progress"] == 20
+
+    @pytest.mark.asyncio
+    async def test_completed_round_rejects_updates(self, client: AsyncClient):
+        """Test that a completed round can't be updated or completed again"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+        await client.put(f"/api/fl/rounds/{round_id}/progress", json={"progress": 60})
+
+        response = await client.post(
+            f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 91.0}
+        )
+        assert response.status_code == 200
+        assert response.json()["progress"] == 100
+        assert round_coordinator.status()["active_round"] is None
+
+        progress = await client.put(f"/api/fl/rounds/{round_id}/progress", json={"progress": 10})
+        assert progress.status_code == 409
+        again = await client.post(
+            f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 92.0}
+        )
+        assert again.status_code == 409
+        assert (await stored_round(round_id)).model_accuracy == 91.0
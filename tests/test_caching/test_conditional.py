@@ -0,0 +1,173 @@
+"""
+Tests for conditional requests (ETag / Last-Modified / 304)
+"""
+from datetime import timedelta
+from email.utils import format_datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.caching.conditional import etag_matches
+from app.caching.versions import DataFamily, DataVersions, data_versions
+
+
+async def create_prediction(client: AsyncClient) -> str:
+    alert_response = await client.post(
+        "/api/alerts",
+        json={
+            "facility_id": "facility_a",
+            "severity": "high",
+            "title": "Port Scan",
+            "description": "Test",
+            "sources": [],
+        },
+    )
+    response = await client.post(
+        "/api/predictions",
+        json={
+            "current_technique": "T0846",
+            "current_technique_name": "Port Scan",
+            "alert_id": alert_response.json()["id"],
+            "predicted_techniques": [
+                {
+                    "technique_id": "T0800",
+                    "technique_name": "Lateral Movement",
+                    "probability": 0.72,
+                    "rank": 1,
+                }
+            ],
+        },
+    )
+    return response.json()["id"]
+
+
+class TestDataVersions:
+    """Test data version bookkeeping"""
+
+    def test_bump_changes_etag_and_last_modified(self):
+        """Test that each bump yields a new tag and a strictly later Last-Modified"""
+        versions = DataVersions()
+        etag, modified = versions.etag("fl"), versions.last_modified("fl")
+
+        versions.bump("fl")
+        assert versions.etag("fl") != etag
+        assert versions.last_modified("fl") > modified
+
+        # Same-second writes still move Last-Modified forward
+        modified = versions.last_modified("fl")
+        versions.bump("fl")
+        assert versions.last_modified("fl") >= modified + timedelta(seconds=1)
+
+    def test_bump_tables_maps_to_families(self):
+        """Test that written tables bump their family once"""
+        versions = DataVersions()
+        versions.bump_tables({"alerts", "alert_sources", "unknown_table"})
+
+        assert versions.get(DataFamily.ALERTS) == 1
+        assert versions.get(DataFamily.FL) == 0
+
+    def test_etag_matches(self):
+        """Test weak If-None-Match comparison"""
+        assert etag_matches('W/"a-fl-1"', 'W/"a-fl-1"')
+        assert etag_matches('"a-fl-1", W/"x"', 'W/"a-fl-1"')
+        assert etag_matches("*", 'W/"a-fl-1"')
+        assert not etag_matches('W/"a-fl-0"', 'W/"a-fl-1"')
+
+
+class TestConditionalRequests:
+    """Test 304 handling on read-mostly routes"""
+
+    @pytest.mark.asyncio
+    async def test_prediction_etag_until_write(self, client: AsyncClient):
+        """Test that a prediction revalidates with 304 until predictions change"""
+        prediction_id = await create_prediction(client)
+
+        response = await client.get(f"/api/predictions/{prediction_id}")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "private, no-cache"
+        etag = response.headers["etag"]
+
+        response = await client.get(
+            f"/api/predictions/{prediction_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        # A committed write to the family invalidates the tag
+        await client.post(f"/api/predictions/{prediction_id}/validate")
+        response = await client.get(
+            f"/api/predictions/{prediction_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["validated"] is True
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.asyncio
+    async def test_writes_to_other_families_keep_tags(self, client: AsyncClient):
+        """Test that alert writes don't invalidate FL responses"""
+        response = await client.get("/api/fl/privacy-metrics")
+        etag = response.headers["etag"]
+
+        await client.post(
+            "/api/alerts",
+            json={
+                "facility_id": "facility_a",
+                "severity": "low",
+                "title": "Noise",
+                "description": "Test",
+                "sources": [],
+            },
+        )
+
+        response = await client.get("/api/fl/privacy-metrics", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_if_modified_since(self, client: AsyncClient):
+        """Test Last-Modified based revalidation"""
+        response = await client.get("/api/fl/privacy-metrics")
+        last_modified = response.headers["last-modified"]
+
+        response = await client.get(
+            "/api/fl/privacy-metrics", headers={"If-Modified-Since": last_modified}
+        )
+        assert response.status_code == 304
+
+        data_versions.bump(DataFamily.FL)
+        response = await client.get(
+            "/api/fl/privacy-metrics", headers={"If-Modified-Since": last_modified}
+        )
+        assert response.status_code == 200
+
+        stale = format_datetime(data_versions.started - timedelta(days=1), usegmt=True)
+        response = await client.get("/api/fl/privacy-metrics", headers={"If-Modified-Since": stale})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_uncached_routes_have_no_validators(self, client: AsyncClient):
+        """Test that routes without a policy are left alone"""
+        response = await client.get("/api/alerts")
+        assert "etag" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_only_completed_rounds_are_tagged(self, client: AsyncClient):
+        """Test that the active round, whose ETA keeps moving, is never revalidated"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+
+        response = await client.get(f"/api/fl/rounds/{round_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "in-progress"
+        assert "etag" not in response.headers
+        assert "last-modified" not in response.headers
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        await client.post(f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 90.0})
+        response = await client.get(f"/api/fl/rounds/{round_id}")
+        etag = response.headers["etag"]
+        response = await client.get(f"/api/fl/rounds/{round_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        missing = await client.get("/api/fl/rounds/999")
+        assert missing.status_code == 404
+        assert "etag" not in missing.headers
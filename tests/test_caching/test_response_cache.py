@@ -0,0 +1,153 @@
+"""
+Tests for the response cache
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.caching import cache as cache_module
+from app.caching.cache import MemoryCacheBackend, ResponseCache, normalize_params
+from app.caching.versions import DataVersions
+
+
+def make_cache(**kwargs) -> ResponseCache:
+    versions = DataVersions()
+    return ResponseCache(MemoryCacheBackend(versions=versions, **kwargs), versions=versions)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        return {"calls": self.calls}
+
+
+class TestResponseCache:
+    """Test caching, invalidation and eviction"""
+
+    def test_normalize_params(self):
+        """Test that parameter order and unset parameters don't change the key"""
+        assert normalize_params({"b": 2, "a": 1, "c": None}) == normalize_params({"a": 1, "b": 2})
+
+    @pytest.mark.asyncio
+    async def test_hit_until_family_written(self):
+        """Test that a response is reused until its family's tables are written"""
+        cache = make_cache()
+        build = Counter()
+
+        first = await cache.get_or_build("stats", "alerts", {}, build)
+        assert await cache.get_or_build("stats", "alerts", {}, build) == first
+        assert build.calls == 1
+
+        # Writes to another family keep the entry
+        cache.versions.bump_tables({"fl_rounds"})
+        cache.invalidate_tables({"fl_rounds"})
+        assert await cache.get_or_build("stats", "alerts", {}, build) == first
+
+        cache.versions.bump_tables({"alert_sources"})
+        cache.invalidate_tables({"alert_sources"})
+        assert await cache.get_or_build("stats", "alerts", {}, build) == b'{"calls":2}'
+
+        status = cache.status()["routes"]["stats"]
+        assert status["hits"] == 2
+        assert status["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, monkeypatch):
+        """Test that entries expire after the TTL"""
+        cache = make_cache()
+        build = Counter()
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+        await cache.get_or_build("stats", "alerts", {}, build)
+        now[0] += cache.ttl - 1
+        await cache.get_or_build("stats", "alerts", {}, build)
+        assert build.calls == 1
+
+        now[0] += 1
+        await cache.get_or_build("stats", "alerts", {}, build)
+        assert build.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_results_are_not_stored(self):
+        """Test that results failing the cacheable check are rebuilt each time"""
+        cache = make_cache()
+        build = Counter()
+
+        def settled(result: dict) -> bool:
+            return result["calls"] > 1
+
+        assert await cache.get_or_build("current", "fl", {}, build, settled) == b'{"calls":1}'
+        assert await cache.get_or_build("current", "fl", {}, build, settled) == b'{"calls":2}'
+        assert await cache.get_or_build("current", "fl", {}, build, settled) == b'{"calls":2}'
+        assert build.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = make_cache(max_entries=2)
+        build = Counter()
+
+        for page in (1, 2):
+            await cache.get_or_build("list", "alerts", {"page": page}, build)
+        await cache.get_or_build("list", "alerts", {"page": 1}, build)  # refresh page 1
+        await cache.get_or_build("list", "alerts", {"page": 3}, build)  # evicts page 2
+
+        assert cache.backend.size() == 2
+        assert cache.backend.evictions == 1
+        await cache.get_or_build("list", "alerts", {"page": 1}, build)
+        assert build.calls == 3
+
+
+class TestCachedEndpoints:
+    """Test the cached dashboard endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_stats_cached_until_alert_created(self, client: AsyncClient):
+        """Test that dashboard polls hit the cache and writes invalidate it"""
+        assert (await client.get("/api/alerts/stats")).json()["total"] == 0
+        assert (await client.get("/api/alerts/stats")).json()["total"] == 0
+
+        await client.post(
+            "/api/alerts",
+            json={
+                "facility_id": "facility_a",
+                "severity": "critical",
+                "title": "Test",
+                "description": "Test",
+                "sources": [],
+            },
+        )
+
+        assert (await client.get("/api/alerts/stats")).json()["total"] == 1
+        assert (await client.get("/api/alerts?page=1")).json()["total"] == 1
+        assert (await client.get("/api/alerts?page=1")).json()["total"] == 1
+
+        response = await client.get("/cache/status")
+        assert response.status_code == 200
+        routes = response.json()["routes"]
+        assert routes["alerts.stats"] == {
+            "hits": 1,
+            "misses": 2,
+            "coalesced": 0,
+            "bypasses": 0,
+            "hit_ratio": 0.333,
+        }
+        assert routes["alerts.list"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_current_round_cached_once_settled(self, client: AsyncClient):
+        """Test that an in-progress current round is rebuilt on every poll"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+        for _ in range(2):
+            assert (await client.get("/api/fl/rounds/current")).json()["status"] == "in-progress"
+
+        await client.post(f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 90.0})
+        for _ in range(2):
+            assert (await client.get("/api/fl/rounds/current")).json()["status"] == "completed"
+
+        routes = (await client.get("/cache/status")).json()["routes"]
+        assert routes["fl.rounds.current"]["misses"] == 3
+        assert routes["fl.rounds.current"]["hits"] == 1
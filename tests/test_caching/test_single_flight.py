@@ -0,0 +1,144 @@
+"""
+Tests for request coalescing
+"""
+import asyncio
+
+import pytest
+
+from app.caching.cache import MemoryCacheBackend, ResponseCache
+from app.caching.single_flight import SingleFlight
+from app.caching.versions import DataVersions
+
+
+class SlowQuery:
+    """Counts calls and blocks until released"""
+
+    def __init__(self, result=None, error: Exception | None = None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result if self.result is not None else {"calls": self.calls}
+
+
+class TestSingleFlight:
+    """Test sharing of identical in-flight calls"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_query(self):
+        """Test that concurrent callers with the same key run the query once"""
+        flight = SingleFlight()
+        query = SlowQuery()
+
+        tasks = [asyncio.create_task(flight.do("stats", query)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.in_flight() == 1
+        query.release.set()
+
+        results = await asyncio.gather(*tasks)
+        assert query.calls == 1
+        assert all(result is results[0] for result in results)
+        assert flight.status() == {"in_flight": 0, "leaders": 1, "shared": 4}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that only identical keys are coalesced"""
+        flight = SingleFlight()
+        query = SlowQuery()
+
+        tasks = [asyncio.create_task(flight.do(f"page={page}", query)) for page in (1, 2)]
+        await asyncio.sleep(0)
+        query.release.set()
+        await asyncio.gather(*tasks)
+
+        assert query.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_all_callers(self):
+        """Test that a failed query fails every waiting caller"""
+        flight = SingleFlight()
+        query = SlowQuery(error=RuntimeError("db down"))
+
+        tasks = [asyncio.create_task(flight.do("stats", query)) for _ in range(3)]
+        await asyncio.sleep(0)
+        query.release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert query.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_finished_calls_are_not_reused(self):
+        """Test that a call after the previous one finished queries again"""
+        flight = SingleFlight()
+        query = SlowQuery()
+        query.release.set()
+
+        await flight.do("stats", query)
+        await flight.do("stats", query)
+        assert query.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over(self):
+        """Test that waiters retry when the leader's request is cancelled"""
+        flight = SingleFlight()
+        query = SlowQuery()
+
+        leader = asyncio.create_task(flight.do("stats", query))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("stats", query))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        query.release.set()
+
+        assert await follower == {"calls": 2}
+        assert leader.cancelled()
+
+
+class TestCoalescedCache:
+    """Test coalescing of concurrent response cache misses"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_build_once(self):
+        """Test that a thundering herd of misses runs one build"""
+        versions = DataVersions()
+        cache = ResponseCache(MemoryCacheBackend(versions=versions), versions=versions)
+        build = SlowQuery()
+
+        tasks = [
+            asyncio.create_task(cache.get_or_build("stats", "alerts", {}, build)) for _ in range(10)
+        ]
+        await asyncio.sleep(0)
+        build.release.set()
+
+        assert set(await asyncio.gather(*tasks)) == {b'{"calls":1}'}
+        assert build.calls == 1
+        metrics = cache.status()["routes"]["stats"]
+        assert metrics["misses"] == 1
+        assert metrics["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_builds_after_a_write_are_not_shared(self):
+        """Test that callers arriving after a write don't get the older build"""
+        versions = DataVersions()
+        cache = ResponseCache(MemoryCacheBackend(versions=versions), versions=versions)
+        build = SlowQuery()
+
+        before = asyncio.create_task(cache.get_or_build("stats", "alerts", {}, build))
+        await asyncio.sleep(0)
+        versions.bump_tables({"alerts"})
+        after = asyncio.create_task(cache.get_or_build("stats", "alerts", {}, build))
+        await asyncio.sleep(0)
+        build.release.set()
+
+        await asyncio.gather(before, after)
+        assert build.calls == 2
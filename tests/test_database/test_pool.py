@@ -0,0 +1,88 @@
+"""
+Tests for the instrumented connection pool
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from tests.conftest import TEST_DATABASE_URL
+
+
+class TestInstrumentedPool:
+    """Test pool instrumentation counters"""
+
+    @pytest.mark.asyncio
+    async def test_pool_metrics_count_checkouts_and_overflow(self):
+        """Test that checkouts, connects and overflow usage are recorded"""
+        from app.db_pool import PoolMetrics, instrumented_pool_class
+
+        metrics = PoolMetrics(max_overflow=1)
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            poolclass=instrumented_pool_class(metrics),
+            pool_size=1,
+            max_overflow=1,
+        )
+
+        try:
+
+            async def query():
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT pg_sleep(0.05)"))
+
+            await asyncio.gather(query(), query())
+            await query()
+
+            status = metrics.snapshot(engine.pool)
+            assert status["checkouts"] == 3
+            assert status["checkins"] == 3
+            assert status["connects"] == 2
+            assert status["peak_checked_out"] == 2
+            assert status["peak_overflow"] == 1
+            assert status["size"] == 1
+            assert status["max_overflow"] == 1
+            assert status["checked_out"] == 0
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_pool_metrics_count_timeouts(self):
+        """Test that checkout timeouts are recorded"""
+        from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+        from app.db_pool import PoolMetrics, instrumented_pool_class
+
+        metrics = PoolMetrics()
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            poolclass=instrumented_pool_class(metrics),
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+
+        try:
+            async with engine.connect():
+                with pytest.raises(PoolTimeoutError):
+                    async with engine.connect():
+                        pass
+
+            assert metrics.timeouts == 1
+            assert metrics.snapshot()["max_wait_ms"] >= 0
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_pool_status_endpoint(self, client: AsyncClient):
+        """Test GET /db/pool/status reports the primary pool"""
+        response = await client.get("/db/pool/status")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "primary" in data
+        assert "checkouts" in data["primary"]
+        assert "avg_wait_ms" in data["primary"]
+        assert "peak_overflow" in data["primary"]
@@ -0,0 +1,55 @@
+"""
+Tests for read/write session routing
+"""
+import pytest
+from fastapi import Request, Response
+
+
+def make_request(method="GET", headers=None, cookies=None):
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if cookies:
+        cookie = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        raw_headers.append((b"cookie", cookie.encode()))
+    return Request({"type": "http", "method": method, "headers": raw_headers})
+
+
+class TestReadRouting:
+    """Test the read routing policy"""
+
+    def test_reads_use_primary_without_replica(self):
+        """Test that reads stay on the primary when no replica is configured"""
+        from app.database import use_primary_for_read
+
+        assert use_primary_for_read(make_request()) is True
+
+    def test_reads_use_replica_unless_sticky_or_strong(self, monkeypatch):
+        """Test that recent writers and strong reads are routed to the primary"""
+        from app import database
+
+        monkeypatch.setattr(database, "read_engine", object())
+
+        assert database.use_primary_for_read(make_request()) is False
+        assert (
+            database.use_primary_for_read(make_request(cookies={database.READ_PRIMARY_COOKIE: "1"}))
+            is True
+        )
+        assert (
+            database.use_primary_for_read(
+                make_request(headers={database.READ_CONSISTENCY_HEADER: "strong"})
+            )
+            is True
+        )
+
+    @pytest.mark.asyncio
+    async def test_writes_set_sticky_cookie(self):
+        """Test that write requests pin the client's reads to the primary"""
+        from app.database import READ_PRIMARY_COOKIE, get_db
+
+        for method, expect_cookie in [("POST", True), ("GET", False)]:
+            response = Response()
+            dependency = get_db(make_request(method), response)
+            await dependency.__anext__()
+            await dependency.aclose()
+
+            cookie = response.headers.get("set-cookie", "")
+            assert (READ_PRIMARY_COOKIE in cookie) is expect_cookie
@@ -0,0 +1,174 @@
+"""
+Tests for the request unit-of-work: flush-only repositories, UPDATE ... RETURNING
+writes and commit-on-write sessions
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from app.database import has_pending_writes
+from app.repositories.alert_repository import AlertRepository
+from app.repositories.facility_repository import FacilityRepository
+from app.repositories.fl_repository import FLRepository, round_pointer
+from app.schemas.alert import AlertCreate, AlertSourceSchema
+from app.schemas.facility import FacilityCreate
+from tests.conftest import test_engine
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements sent to the test database"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def make_alert() -> AlertCreate:
+    return AlertCreate(
+        facility_id="facility_a",
+        severity="high",
+        title="Unit of work",
+        description="Test alert",
+        sources=[
+            AlertSourceSchema(
+                layer=1,
+                model_name="LSTM",
+                confidence=0.9,
+                detection_time=datetime.utcnow(),
+                evidence="x",
+            ),
+        ],
+    )
+
+
+class TestUnitOfWork:
+    """Test repository round-trips and commit tracking"""
+
+    async def test_reads_have_no_pending_writes(self, test_db):
+        """Test that a read-only transaction does not need a commit"""
+        await AlertRepository(test_db).get_stats()
+        assert has_pending_writes(test_db) is False
+
+    async def test_create_flushes_without_commit(self, test_db):
+        """Test that create flushes and leaves the commit to the caller"""
+        repo = AlertRepository(test_db)
+        with count_statements() as statements:
+            alert = await repo.create(make_alert())
+
+        assert "COMMIT" not in statements
+        assert "SELECT" not in statements
+        assert has_pending_writes(test_db) is True
+        assert len(alert.sources) == 1
+
+        await test_db.commit()
+        assert has_pending_writes(test_db) is False
+
+    async def test_update_status_uses_update_returning(self, test_db):
+        """Test that a status change is one UPDATE plus one child SELECT"""
+        repo = AlertRepository(test_db)
+        alert = await repo.create(make_alert())
+        await test_db.commit()
+
+        with count_statements() as statements:
+            updated = await repo.update_status(alert.id, "acknowledged")
+
+        assert statements == ["UPDATE", "SELECT"]
+        assert updated.status == "acknowledged"
+        assert len(updated.sources) == 1
+        assert updated.model_dump()["sources"][0]["model_name"] == "LSTM"
+        assert has_pending_writes(test_db) is True
+
+    async def test_update_missing_alert_returns_none(self, test_db):
+        """Test that updating an unknown alert returns None"""
+        assert await AlertRepository(test_db).update_status(uuid4(), "resolved") is None
+
+    async def test_create_round_statements_independent_of_facilities(self, test_db):
+        """Test that round creation inserts all clients in one statement"""
+        await FacilityRepository(test_db).register(
+            [FacilityCreate(id=f"site_{i:03}", name=f"Site {i}") for i in range(200)]
+        )
+        await test_db.commit()
+
+        with count_statements() as statements:
+            fl_round = await FLRepository(test_db).create_round(1)
+
+        assert statements == ["INSERT", "INSERT", "UPDATE"]
+        assert fl_round.total_clients == 202
+        assert len(fl_round.clients) == 202
+        assert all(client.round_id == fl_round.id for client in fl_round.clients)
+
+    async def test_latest_round_with_many_rounds(self, test_db):
+        """Test that the latest/current round lookups are bounded with many rounds"""
+        repo = FLRepository(test_db)
+        for number in range(1, 6):
+            fl_round = await repo.create_round(number)
+            await repo.complete_round(fl_round.id, 90.0)
+        await test_db.commit()
+
+        # Without a pointer: one LIMIT 1 query each, which sets the pointer
+        latest = await repo.get_latest_round()
+        assert latest.round_number == 5
+        assert await repo.get_current_round() is None
+
+        with count_statements() as statements:
+            assert (await repo.get_latest_round()).id == latest.id
+            assert await repo.get_current_round() is None
+        # Round by primary key + its clients; the current round is known to be none
+        assert statements == ["SELECT", "SELECT"]
+
+        fl_round = await repo.create_round(6)
+        await test_db.commit()
+        round_pointer.created(fl_round.id)
+        assert (await repo.get_current_round()).round_number == 6
+        assert (await repo.get_latest_round()).round_number == 6
+
+        await repo.complete_round(fl_round.id, 91.0)
+        await test_db.commit()
+        round_pointer.completed(fl_round.id)
+        assert await repo.get_current_round() is None
+
+    async def test_round_progress_uses_update_returning(self, test_db):
+        """Test that round progress is one UPDATE plus one clients SELECT"""
+        repo = FLRepository(test_db)
+        fl_round = await repo.create_round(1)
+        await test_db.commit()
+
+        with count_statements() as statements:
+            updated = await repo.update_round_progress(fl_round.id, 40, "training")
+
+        assert statements == ["UPDATE", "SELECT"]
+        assert updated.progress == 40
+        assert updated.phase.value == "training"
+        assert len(updated.clients) == 2
+
+    async def test_client_update_is_single_statement(self, test_db):
+        """Test that a client status PUT is a single UPDATE ... RETURNING"""
+        repo = FLRepository(test_db)
+        fl_round = await repo.create_round(1)
+        await test_db.commit()
+        client_id = fl_round.clients[0].id
+
+        with count_statements() as statements:
+            client = await repo.update_client_status(client_id, status="delayed", progress=55)
+
+        assert statements == ["UPDATE"]
+        assert client.id == client_id
+        assert client.status == "delayed"
+        assert client.progress == 55
+        assert client.name == "Facility A"
+
+        # Training metrics also append one history point
+        with count_statements() as statements:
+            client = await repo.update_client_status(client_id, loss=0.3)
+
+        assert statements == ["UPDATE", "INSERT"]
+        assert client.loss == 0.3
@@ -0,0 +1 @@
+# FL round and aggregation tests
@@ -0,0 +1,266 @@
+"""
+Tests for FedAvg model update aggregation
+"""
+import io
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.fl import InvalidTransition, aggregation, round_coordinator
+from app.fl.aggregation import (
+    AggregationError,
+    AggregationInProgress,
+    ModelAggregator,
+    model_aggregator,
+)
+
+np = pytest.importorskip("numpy")
+
+
+def npy_bytes(array) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+async def chunked(data: bytes, size: int = 64):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.fixture
+def aggregator(tmp_path) -> ModelAggregator:
+    return ModelAggregator(storage_dir=str(tmp_path))
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Point the global aggregator at a temporary directory"""
+    monkeypatch.setattr(model_aggregator, "storage_dir", tmp_path)
+    model_aggregator.clear()
+    yield tmp_path
+    model_aggregator.clear()
+
+
+class TestModelAggregator:
+    """Test incremental FedAvg"""
+
+    @pytest.mark.asyncio
+    async def test_weighted_average(self, aggregator: ModelAggregator):
+        """Test that updates are averaged by sample count"""
+        first = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
+        second = np.array([[3.0, 6.0], [7.0, 0.0]], dtype=np.float32)
+
+        await aggregator.receive(1, uuid4(), 100, chunked(npy_bytes(first)))
+        summary = await aggregator.receive(1, uuid4(), 300, chunked(npy_bytes(second)))
+        assert summary == {
+            "round_id": 1,
+            "updates_received": 2,
+            "total_samples": 400,
+            "shape": [2, 2],
+        }
+
+        aggregate = await aggregator.finalize(1)
+        await aggregator.publish(1)
+        model = np.load(aggregator.model_path(1))
+        assert aggregate.total_samples == 400
+        assert model.dtype == np.float32
+        np.testing.assert_allclose(model, (100 * first + 300 * second) / 400)
+        # Folded updates are removed, the model stays
+        assert [p.name for p in aggregate.directory.iterdir()] == ["global.npy"]
+
+    @pytest.mark.asyncio
+    async def test_folds_in_chunks(self, aggregator: ModelAggregator, monkeypatch):
+        """Test that chunked folding matches a whole-array average"""
+        monkeypatch.setattr(aggregation, "FOLD_CHUNK_ELEMENTS", 7)
+        updates = [np.arange(50, dtype=np.float64) * k for k in (1, 2, 3)]
+
+        for k, update in enumerate(updates, start=1):
+            await aggregator.receive(1, uuid4(), k, chunked(npy_bytes(update)))
+        await aggregator.finalize(1)
+        await aggregator.publish(1)
+
+        expected = sum(k * u for k, u in enumerate(updates, start=1)) / 6
+        np.testing.assert_allclose(np.load(aggregator.model_path(1)), expected)
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_updates(self, aggregator: ModelAggregator):
+        """Test that malformed, mismatched and non-finite updates are rejected"""
+        await aggregator.receive(1, uuid4(), 10, chunked(npy_bytes(np.ones(4))))
+
+        with pytest.raises(AggregationError, match="not a valid"):
+            await aggregator.receive(1, uuid4(), 10, chunked(b"not numpy"))
+        with pytest.raises(AggregationError, match="shape"):
+            await aggregator.receive(1, uuid4(), 10, chunked(npy_bytes(np.ones(5))))
+        with pytest.raises(AggregationError, match="NaN"):
+            await aggregator.receive(1, uuid4(), 10, chunked(npy_bytes(np.full(4, np.nan))))
+        with pytest.raises(AggregationError, match="numeric"):
+            await aggregator.receive(1, uuid4(), 10, chunked(npy_bytes(np.array(["a"] * 4))))
+
+        # Rejected updates leave the average and the directory untouched
+        aggregate = await aggregator.finalize(1)
+        await aggregator.publish(1)
+        assert aggregate.total_samples == 10
+        np.testing.assert_allclose(np.load(aggregator.model_path(1)), np.ones(4))
+        assert not list(aggregate.directory.glob("*.upload"))
+
+    @pytest.mark.asyncio
+    async def test_rejects_duplicates_and_oversized_uploads(self, tmp_path):
+        """Test that a client can send one update within the size limit"""
+        aggregator = ModelAggregator(storage_dir=str(tmp_path), max_update_bytes=1024)
+        client_id = uuid4()
+
+        await aggregator.receive(1, client_id, 10, chunked(npy_bytes(np.ones(4))))
+        assert aggregator.has_update(1, client_id)
+        with pytest.raises(AggregationError, match="already"):
+            await aggregator.receive(1, client_id, 10, chunked(npy_bytes(np.ones(4))))
+        with pytest.raises(AggregationError, match="exceeds"):
+            await aggregator.receive(1, uuid4(), 10, chunked(npy_bytes(np.ones(1000))))
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_after_restart(self, aggregator: ModelAggregator):
+        """Test that updates on disk are refolded when the state is lost"""
+        await aggregator.receive(1, uuid4(), 1, chunked(npy_bytes(np.zeros(3))))
+        aggregator.clear()
+        await aggregator.receive(1, uuid4(), 3, chunked(npy_bytes(np.full(3, 4.0))))
+
+        aggregate = await aggregator.finalize(1)
+        await aggregator.publish(1)
+        assert len(aggregate.samples) == 2
+        np.testing.assert_allclose(np.load(aggregator.model_path(1)), np.full(3, 3.0))
+
+    @pytest.mark.asyncio
+    async def test_updates_kept_until_published(self, aggregator: ModelAggregator):
+        """Test that a finalized round keeps its updates until published, and can be aborted"""
+        await aggregator.receive(1, uuid4(), 2, chunked(npy_bytes(np.ones(3))))
+        aggregate = await aggregator.finalize(1)
+
+        # Pending: no model served, no more updates, no second finalize
+        assert aggregator.model_path(1) is None
+        assert len(list(aggregate.directory.glob("*.*.npy"))) == 1
+        with pytest.raises(AggregationInProgress):
+            await aggregator.receive(1, uuid4(), 2, chunked(npy_bytes(np.ones(3))))
+        with pytest.raises(AggregationInProgress):
+            await aggregator.finalize(1)
+
+        # Aborting discards the pending model and takes updates again
+        await aggregator.abort(1)
+        assert not (aggregate.directory / aggregation.PENDING_MODEL_FILE).exists()
+        await aggregator.receive(1, uuid4(), 2, chunked(npy_bytes(np.full(3, 3.0))))
+
+        await aggregator.finalize(1)
+        await aggregator.publish(1)
+        np.testing.assert_allclose(np.load(aggregator.model_path(1)), np.full(3, 2.0))
+        assert [p.name for p in aggregate.directory.iterdir()] == ["global.npy"]
+
+    @pytest.mark.asyncio
+    async def test_finalize_without_updates(self, aggregator: ModelAggregator):
+        """Test that a round without updates has no model"""
+        assert await aggregator.finalize(1) is None
+        assert aggregator.model_path(1) is None
+
+
+class TestAggregationAPI:
+    """Test model update upload and round aggregation endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_upload_aggregate_and_download(self, client: AsyncClient, storage):
+        """Test a round completed from uploaded updates"""
+        fl_round = (await client.post("/api/fl/rounds/trigger")).json()
+        first, second = (c["id"] for c in fl_round["clients"])
+        await client.post(f"/api/fl/clients/{first}/telemetry", json={"accuracy": 80.0})
+        await client.post(f"/api/fl/clients/{second}/telemetry", json={"accuracy": 90.0})
+
+        for client_id, samples, value in ((first, 100, 1.0), (second, 300, 5.0)):
+            response = await client.post(
+                f"/api/fl/rounds/{fl_round['id']}/updates/{client_id}",
+                params={"num_samples": samples},
+                content=npy_bytes(np.full((2, 3), value, dtype=np.float32)),
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            assert response.status_code == 201
+        assert response.json()["updates_received"] == 2
+        assert response.json()["shape"] == [2, 3]
+
+        response = await client.post(f"/api/fl/rounds/{fl_round['id']}/aggregate")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["model_accuracy"] == pytest.approx((100 * 80.0 + 300 * 90.0) / 400)
+
+        response = await client.get(f"/api/fl/rounds/{fl_round['id']}/model")
+        assert response.status_code == 200
+        model = np.load(io.BytesIO(response.content))
+        np.testing.assert_allclose(model, np.full((2, 3), 4.0))
+
+    @pytest.mark.asyncio
+    async def test_upload_errors(self, client: AsyncClient, storage):
+        """Test unknown clients, duplicates, bad updates and finished rounds"""
+        fl_round = (await client.post("/api/fl/rounds/trigger")).json()
+        client_id = fl_round["clients"][0]["id"]
+        url = f"/api/fl/rounds/{fl_round['id']}/updates/{client_id}"
+        update = npy_bytes(np.ones(4))
+
+        unknown = await client.post(
+            f"/api/fl/rounds/{fl_round['id']}/updates/{uuid4()}",
+            params={"num_samples": 1},
+            content=update,
+        )
+        assert unknown.status_code == 404
+        missing_samples = await client.post(url, content=update)
+        assert missing_samples.status_code == 422
+        bad = await client.post(url, params={"num_samples": 1}, content=b"weights")
+        assert bad.status_code == 422
+
+        assert (
+            await client.post(url, params={"num_samples": 1}, content=update)
+        ).status_code == 201
+        duplicate = await client.post(url, params={"num_samples": 1}, content=update)
+        assert duplicate.status_code == 409
+        assert model_aggregator.has_update(fl_round["id"], UUID(client_id))
+
+        await client.post(f"/api/fl/rounds/{fl_round['id']}/aggregate")
+        other = fl_round["clients"][1]["id"]
+        finished = await client.post(
+            f"/api/fl/rounds/{fl_round['id']}/updates/{other}",
+            params={"num_samples": 1},
+            content=update,
+        )
+        assert finished.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_aggregate_without_updates(self, client: AsyncClient, storage):
+        """Test that a round can't be aggregated before any update arrives"""
+        fl_round = (await client.post("/api/fl/rounds/trigger")).json()
+
+        response = await client.post(f"/api/fl/rounds/{fl_round['id']}/aggregate")
+        assert response.status_code == 409
+        assert (await client.get(f"/api/fl/rounds/{fl_round['id']}/model")).status_code == 404
+        assert (await client.post("/api/fl/rounds/999/aggregate")).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_failed_completion_keeps_updates(self, client: AsyncClient, storage, monkeypatch):
+        """Test that a round whose completion fails can be aggregated again"""
+        fl_round = (await client.post("/api/fl/rounds/trigger")).json()
+        client_id = fl_round["clients"][0]["id"]
+        await client.post(
+            f"/api/fl/rounds/{fl_round['id']}/updates/{client_id}",
+            params={"num_samples": 5},
+            content=npy_bytes(np.full(2, 7.0)),
+        )
+
+        async def fail_completion(*args):
+            raise InvalidTransition("FL round is completed")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(round_coordinator, "complete", fail_completion)
+            response = await client.post(f"/api/fl/rounds/{fl_round['id']}/aggregate")
+        assert response.status_code == 409
+        assert model_aggregator.model_path(fl_round["id"]) is None
+        assert model_aggregator.has_update(fl_round["id"], UUID(client_id))
+
+        response = await client.post(f"/api/fl/rounds/{fl_round['id']}/aggregate")
+        assert response.status_code == 200
+        model = np.load(model_aggregator.model_path(fl_round["id"]))
+        np.testing.assert_allclose(model, np.full(2, 7.0))
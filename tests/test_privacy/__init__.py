@@ -0,0 +1 @@
+# Privacy accounting tests
@@ -0,0 +1,122 @@
+"""
+Tests for the differential privacy accountant
+"""
+import math
+
+import pytest
+from httpx import AsyncClient
+
+from app.privacy.accountant import (
+    CompositionTotals,
+    PrivacyAccountant,
+    format_delta,
+    privacy_accountant,
+)
+
+
+def compose(epsilons) -> CompositionTotals:
+    totals = CompositionTotals()
+    for epsilon in epsilons:
+        totals.add(epsilon)
+    return totals
+
+
+class TestComposition:
+    """Test the composition bounds"""
+
+    def test_basic_composition_sums(self):
+        """Test that basic composition adds epsilons"""
+        assert compose([0.5, 0.25, 1.0]).basic() == pytest.approx(1.75)
+
+    def test_rdp_matches_closed_form(self):
+        """Test the zCDP bound for k rounds of the same epsilon"""
+        k, epsilon, delta = 100, 0.5, 1e-5
+        rho = k * epsilon**2 / 2
+        expected = rho + 2 * math.sqrt(rho * math.log(1 / delta))
+
+        assert compose([epsilon] * k).rdp(delta) == pytest.approx(expected)
+
+    def test_advanced_matches_closed_form(self):
+        """Test the advanced composition bound for k rounds of the same epsilon"""
+        k, epsilon, delta = 100, 0.1, 1e-5
+        expected = math.sqrt(2 * k * math.log(1 / delta)) * epsilon + k * epsilon * math.expm1(
+            epsilon
+        )
+
+        assert compose([epsilon] * k).advanced(delta) == pytest.approx(expected)
+
+
+class TestPrivacyAccountant:
+    """Test running totals and the reported bound"""
+
+    def test_tightest_bound_is_reported(self):
+        """Test that few rounds use basic composition and many rounds use RDP"""
+        accountant = PrivacyAccountant(budget=100.0, delta=1e-5)
+        for round_id in range(2):
+            accountant.record_round(round_id, 0.5)
+        assert accountant.composition() == "basic"
+        assert accountant.epsilon_spent() == pytest.approx(1.0)
+        assert accountant.budget_remaining() == pytest.approx(99.0)
+
+        for round_id in range(2, 100):
+            accountant.record_round(round_id, 0.5)
+        assert accountant.composition() == "rdp"
+        assert accountant.epsilon_spent() < 50.0
+
+    def test_rounds_are_counted_once(self):
+        """Test that completing a round twice doesn't spend the budget twice"""
+        accountant = PrivacyAccountant(budget=10.0)
+        accountant.record_round(1, 0.5)
+        accountant.record_round(1, 0.5)
+
+        assert accountant.totals.rounds == 1
+
+    def test_budget_remaining_floors_at_zero(self):
+        """Test that an overspent budget reports 0% remaining"""
+        accountant = PrivacyAccountant(budget=1.0)
+        for round_id in range(5):
+            accountant.record_round(round_id, 0.5)
+
+        assert accountant.budget_remaining() == 0.0
+
+    def test_format_delta(self):
+        """Test delta display strings"""
+        assert format_delta(1e-5) == "10⁻⁵"
+        assert format_delta(2.5e-6) == "2.5e-06"
+
+
+class TestPrivacyMetricsEndpoint:
+    """Test /api/fl/privacy-metrics backed by the accountant"""
+
+    @pytest.mark.asyncio
+    async def test_completed_rounds_spend_budget(self, client: AsyncClient):
+        """Test that completing rounds updates the spent epsilon"""
+        data = (await client.get("/api/fl/privacy-metrics")).json()
+        assert data["epsilon_spent"] == 0.0
+        assert data["privacy_budget_remaining"] == 100.0
+
+        for _ in range(2):
+            round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+            await client.post(f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 90.0})
+            # Completing again doesn't count twice
+            await client.post(f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 91.0})
+        # In-progress rounds haven't spent anything yet
+        await client.post("/api/fl/rounds/trigger")
+
+        data = (await client.get("/api/fl/privacy-metrics")).json()
+        assert data["rounds_composed"] == 2
+        assert data["epsilon_spent"] == pytest.approx(1.0)
+        assert data["composition"] == "basic"
+        assert data["privacy_budget_remaining"] == pytest.approx(90.0)
+        assert data["delta"] == "10⁻⁵"
+
+    @pytest.mark.asyncio
+    async def test_totals_loaded_from_completed_rounds(self, client: AsyncClient):
+        """Test that a fresh accountant composes rounds already in the database"""
+        round_id = (await client.post("/api/fl/rounds/trigger")).json()["id"]
+        await client.post(f"/api/fl/rounds/{round_id}/complete", json={"model_accuracy": 90.0})
+        privacy_accountant.clear()  # as after a restart
+
+        data = (await client.get("/api/fl/privacy-metrics")).json()
+        assert data["rounds_composed"] == 1
+        assert data["epsilon_spent"] == pytest.approx(0.5)
@@ -0,0 +1,95 @@
+"""
+Tests for FL round ETA estimation
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.schemas.fl_status import FLClientSchema
+from app.telemetry.eta import RoundETAEstimator
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def make_client(**kwargs) -> FLClientSchema:
+    values = {
+        "id": uuid4(),
+        "facility_id": "facility_a",
+        "name": "Facility A",
+        "status": "active",
+        "progress": 0,
+        "current_epoch": 0,
+        "total_epochs": 10,
+        "last_update": START,
+    }
+    values.update(kwargs)
+    return FLClientSchema(**values)
+
+
+def report(estimator: RoundETAEstimator, client: FLClientSchema, epoch: int, seconds: float):
+    """Report `epoch` reached `seconds` after START"""
+    client = client.model_copy(
+        update={"current_epoch": epoch, "last_update": START + timedelta(seconds=seconds)}
+    )
+    estimator.observe(client)
+    return client
+
+
+class TestRoundETAEstimator:
+    """Test throughput tracking and round projections"""
+
+    def test_unknown_until_throughput_measured(self):
+        """Test that a client needs two epoch reports before it has an ETA"""
+        estimator = RoundETAEstimator()
+        client = report(estimator, make_client(), 0, 0)
+
+        assert estimator.minutes_remaining([client], now=START) is None
+
+        client = report(estimator, client, 1, 60)
+        # 9 epochs left at 60s each
+        assert estimator.minutes_remaining([client], now=START + timedelta(seconds=60)) == 9
+
+    def test_ewma_smooths_throughput(self):
+        """Test that a single slow epoch only partly moves the estimate"""
+        estimator = RoundETAEstimator(alpha=0.5)
+        client = report(estimator, make_client(), 0, 0)
+        client = report(estimator, client, 1, 60)
+        client = report(estimator, client, 2, 60 + 180)
+
+        state = estimator.clients[client.id]
+        assert state.seconds_per_epoch == 120  # 0.5 * 180 + 0.5 * 60
+        assert state.finish_at == START + timedelta(seconds=240 + 8 * 120)
+
+    def test_multi_epoch_jumps_average_per_epoch(self):
+        """Test that skipped epochs are spread over the elapsed time"""
+        estimator = RoundETAEstimator()
+        client = report(estimator, make_client(), 0, 0)
+        client = report(estimator, client, 4, 240)
+
+        assert estimator.clients[client.id].seconds_per_epoch == 60
+
+    def test_round_waits_for_slowest_active_client(self):
+        """Test that the round ETA is the slowest active client's, ignoring offline ones"""
+        estimator = RoundETAEstimator()
+        fast = report(estimator, make_client(), 0, 0)
+        fast = report(estimator, fast, 1, 30)
+        slow = report(estimator, make_client(facility_id="facility_b"), 0, 0)
+        slow = report(estimator, slow, 1, 120)
+        now = START + timedelta(seconds=120)
+
+        # Slow client: 9 epochs * 120s from t=120s
+        assert estimator.minutes_remaining([fast, slow], now=now) == 18
+
+        offline = slow.model_copy(update={"status": "offline"})
+        # Fast client: 9 epochs * 30s from t=30s, i.e. t=300s
+        assert estimator.minutes_remaining([fast, offline], now=now) == 3
+
+    def test_finished_and_overdue_clients(self):
+        """Test that finished rounds report zero and overdue projections don't go negative"""
+        estimator = RoundETAEstimator()
+        client = report(estimator, make_client(total_epochs=2), 0, 0)
+        client = report(estimator, client, 1, 60)
+
+        assert estimator.minutes_remaining([client], now=START + timedelta(hours=1)) == 0
+
+        client = report(estimator, client, 2, 120)
+        assert estimator.minutes_remaining([client], now=START) == 0
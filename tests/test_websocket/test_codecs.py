@@ -0,0 +1,96 @@
+"""
+Tests for WebSocket message codecs
+"""
+import json
+import zlib
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from tests.test_websocket.test_connection_manager import MockWebSocket
+
+
+class BinaryMockWebSocket(MockWebSocket):
+    """Mock WebSocket that records binary frames"""
+
+    async def send_bytes(self, data):
+        self.sent_messages.append(data)
+
+
+class TestCodecs:
+    """Test wire format negotiation and encoding"""
+
+    def test_json_codec_encodes_text(self):
+        """Test that the default codec produces JSON text and handles datetimes/UUIDs"""
+        from app.websocket.codecs import get_codec
+
+        codec = get_codec()
+        alert_id = uuid4()
+        payload = codec.encode({"id": alert_id, "timestamp": datetime(2025, 1, 1)})
+
+        assert codec.binary is False
+        assert json.loads(payload) == {"id": str(alert_id), "timestamp": "2025-01-01T00:00:00"}
+
+    def test_deflate_codec_round_trips(self):
+        """Test that deflate compression produces binary zlib frames"""
+        from app.websocket.codecs import get_codec
+
+        codec = get_codec("json", "deflate")
+        message = {"type": "alert_created", "data": {"description": "x" * 1000}}
+        payload = codec.encode(message)
+
+        assert codec.binary is True
+        assert len(payload) < len(json.dumps(message))
+        assert json.loads(zlib.decompress(payload)) == message
+
+    def test_msgpack_codec_round_trips(self):
+        """Test that msgpack encoding round trips"""
+        msgpack = pytest.importorskip("msgpack")
+        from app.websocket.codecs import get_codec
+
+        codec = get_codec("msgpack", "deflate")
+        payload = codec.encode({"type": "pong", "seq": 3})
+
+        assert msgpack.unpackb(zlib.decompress(payload)) == {"type": "pong", "seq": 3}
+
+    def test_get_codec_rejects_unknown_formats(self):
+        """Test that unsupported formats raise ValueError"""
+        from app.websocket.codecs import get_codec
+
+        with pytest.raises(ValueError):
+            get_codec("xml")
+        with pytest.raises(ValueError):
+            get_codec("json", "brotli")
+
+    def test_get_codec_returns_shared_instances(self):
+        """Test that codecs are shared so broadcasts can encode once per codec"""
+        from app.websocket.codecs import get_codec
+
+        assert get_codec("json", "deflate") is get_codec("json", "deflate")
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_once_per_codec(self):
+        """Test that a broadcast is encoded once per wire format in use"""
+        from unittest.mock import patch
+
+        from app.websocket.codecs import Codec, get_codec
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        deflate = get_codec("json", "deflate")
+        text_clients = [MockWebSocket() for _ in range(3)]
+        binary_clients = [BinaryMockWebSocket() for _ in range(3)]
+        for ws in text_clients:
+            manager.connect(ws, room="alerts")
+        for ws in binary_clients:
+            manager.connect(ws, room="alerts", codec=deflate)
+
+        with patch.object(Codec, "encode", autospec=True, side_effect=Codec.encode) as encode:
+            await manager.broadcast_to_room("alerts", {"type": "alert_created", "data": {}})
+
+        assert encode.call_count == 2
+        assert all(len(ws.sent_messages) == 1 for ws in text_clients)
+        frames = [ws.sent_messages[0] for ws in binary_clients]
+        assert frames[0] is frames[1] is frames[2]
+        assert json.loads(zlib.decompress(frames[0]))["seq"] == 1
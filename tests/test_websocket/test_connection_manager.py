@@ -2,6 +2,8 @@
 Tests for WebSocket Connection Manager
 Following TDD approach - these tests will fail initially
 """
+import json
+
 import pytest
 
 
@@ -76,8 +78,9 @@ class TestConnectionManager:
         test_message = {"type": "alert", "data": "new alert"}
         await manager.broadcast_to_room("alerts", test_message)
 
-        assert mock_ws1.sent_messages == [test_message]
-        assert mock_ws2.sent_messages == [test_message]
+        expected = {**test_message, "room": "alerts", "seq": 1}
+        assert mock_ws1.sent_messages == [expected]
+        assert mock_ws2.sent_messages == [expected]
         assert mock_ws3.sent_messages == []
 
     def test_get_room_connections_returns_correct_connections(self):
@@ -100,6 +103,156 @@ class TestConnectionManager:
         assert mock_ws2 in alerts_connections
         assert mock_ws3 not in alerts_connections
 
+    @pytest.mark.asyncio
+    async def test_broadcast_to_room_stamps_sequence_per_room(self):
+        """Test that each room has its own monotonically increasing sequence"""
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        mock_ws = MockWebSocket()
+        manager.connect(mock_ws, room="alerts")
+
+        await manager.broadcast_to_room("alerts", {"type": "a"})
+        await manager.broadcast_to_room("dashboard", {"type": "a"})
+        await manager.broadcast_to_room("alerts", {"type": "b"})
+
+        assert [m["seq"] for m in mock_ws.sent_messages] == [1, 2]
+        assert manager.get_room_seq("alerts") == 2
+        assert manager.get_room_seq("dashboard") == 1
+        assert manager.get_room_seq("fl-status") == 0
+
+    @pytest.mark.asyncio
+    async def test_get_missed_events_replays_after_since_seq(self):
+        """Test that missed events are replayed from the buffer, even with no listeners"""
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        for i in range(5):
+            await manager.broadcast_to_room("alerts", {"type": "alert", "data": i})
+
+        missed = manager.get_missed_events("alerts", 2)
+
+        assert [m["seq"] for m in missed] == [3, 4, 5]
+        assert [m["data"] for m in missed] == [2, 3, 4]
+        assert manager.get_missed_events("alerts", 5) == []
+
+    @pytest.mark.asyncio
+    async def test_get_missed_events_requires_snapshot_when_gap_too_large(self):
+        """Test that evicted or foreign-epoch sequences cannot be replayed"""
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager(replay_buffer_size=3)
+        for i in range(5):
+            await manager.broadcast_to_room("alerts", {"type": "alert", "data": i})
+
+        # Events 1-2 were evicted from the ring buffer
+        assert manager.get_missed_events("alerts", 0) is None
+        assert [m["seq"] for m in manager.get_missed_events("alerts", 2)] == [3, 4, 5]
+        # Seq from before a restart
+        assert manager.get_missed_events("alerts", 42) is None
+        assert manager.get_missed_events("alerts", 2, epoch="other-epoch") is None
+        assert manager.get_missed_events("alerts", 2, epoch=manager.epoch) is not None
+
+    @pytest.mark.asyncio
+    async def test_broadcast_to_room_applies_subscription_filters(self):
+        """Test that filtered subscriptions only receive matching events"""
+        from app.websocket.filters import compile_filter
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        everything = MockWebSocket()
+        facility_a = MockWebSocket()
+        critical_only = MockWebSocket()
+
+        manager.connect(everything, room="alerts")
+        manager.connect(
+            facility_a,
+            room="alerts",
+            subscription_filter=compile_filter({"facility_id": "facility_a"}),
+        )
+        manager.connect(
+            critical_only,
+            room="alerts",
+            subscription_filter=compile_filter(
+                {"min_severity": "critical", "attack_type": ["T0846", "T0800"]}
+            ),
+        )
+
+        await manager.broadcast_to_room(
+            "alerts",
+            {"type": "alert_created", "data": {"facility_id": "facility_a", "severity": "high"}},
+        )
+        await manager.broadcast_to_room(
+            "alerts",
+            {
+                "type": "alert_created",
+                "data": {
+                    "facility_id": "facility_b",
+                    "severity": "critical",
+                    "attack_type": "T0846",
+                },
+            },
+        )
+        # Events without the filtered fields reach everyone
+        await manager.broadcast_to_room("alerts", {"type": "alert_stats", "data": {}})
+
+        assert [m["seq"] for m in everything.sent_messages] == [1, 2, 3]
+        assert [m["seq"] for m in facility_a.sent_messages] == [1, 3]
+        assert [m["seq"] for m in critical_only.sent_messages] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_get_missed_events_applies_subscription_filter(self):
+        """Test that replayed events honour the subscription filter"""
+        from app.websocket.filters import compile_filter
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        for facility_id in ["facility_a", "facility_b", "facility_a"]:
+            await manager.broadcast_to_room(
+                "alerts", {"type": "alert_created", "data": {"facility_id": facility_id}}
+            )
+
+        missed = manager.get_missed_events(
+            "alerts", 0, subscription_filter=compile_filter({"facility_id": "facility_a"})
+        )
+
+        assert [m["seq"] for m in missed] == [1, 3]
+
+    def test_resubscribe_replaces_filter(self):
+        """Test that subscribing again replaces the previous filter and membership"""
+        from app.websocket.filters import compile_filter
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        mock_ws = MockWebSocket()
+
+        manager.connect(
+            mock_ws,
+            room="alerts",
+            subscription_filter=compile_filter({"facility_id": "facility_a"}),
+        )
+        manager.connect(mock_ws, room="alerts")
+
+        assert manager.get_room_connections("alerts") == [mock_ws]
+        assert manager.get_subscription_filter(mock_ws, "alerts") is None
+        assert manager.facility_index["alerts"] == {}
+
+        manager.disconnect(mock_ws)
+        assert manager.get_room_connections("alerts") == []
+
+    def test_compile_filter_rejects_invalid_filters(self):
+        """Test that malformed filters raise ValueError"""
+        from app.websocket.filters import compile_filter
+
+        assert compile_filter(None) is None
+        assert compile_filter({}) is None
+        with pytest.raises(ValueError):
+            compile_filter({"min_severity": "extreme"})
+        with pytest.raises(ValueError):
+            compile_filter({"facility": "facility_a"})
+        with pytest.raises(ValueError):
+            compile_filter({"facility_id": []})
+
 
 # Mock WebSocket for testing
 class MockWebSocket:
@@ -114,6 +267,11 @@ class MockWebSocket:
         if not self.is_closed:
             self.sent_messages.append(data)
 
+    async def send_text(self, data):
+        """Mock send_text method"""
+        if not self.is_closed:
+            self.sent_messages.append(json.loads(data))
+
     async def accept(self):
         """Mock accept method"""
         pass
@@ -0,0 +1,100 @@
+"""
+Tests for WebSocket delta state updates
+"""
+import pytest
+
+from tests.test_websocket.test_connection_manager import MockWebSocket
+
+
+def make_round(progress=0, client_progress=(0, 0), round_id=1):
+    return {
+        "id": round_id,
+        "round_number": round_id,
+        "progress": progress,
+        "phase": "training",
+        "clients": [
+            {"id": f"client-{i}", "facility_id": f"facility_{i}", "progress": p}
+            for i, p in enumerate(client_progress)
+        ],
+    }
+
+
+class TestDeltaTracker:
+    """Test delta computation between consecutive states"""
+
+    def test_first_state_is_keyframe(self):
+        """Test that the first state sent to a room is a full keyframe"""
+        from app.events.deltas import DeltaTracker
+
+        tracker = DeltaTracker()
+
+        assert tracker.diff("fl-status", make_round()) is None
+        assert tracker.get_state("fl-status") == make_round()
+
+    def test_delta_contains_only_changed_fields_and_clients(self):
+        """Test that deltas carry changed top-level fields and changed clients only"""
+        from app.events.deltas import DeltaTracker
+
+        tracker = DeltaTracker()
+        tracker.diff("fl-status", make_round(progress=10, client_progress=(10, 10)))
+
+        delta = tracker.diff("fl-status", make_round(progress=20, client_progress=(10, 30)))
+
+        assert delta == {
+            "id": 1,
+            "changed": {"progress": 20},
+            "clients": [{"id": "client-1", "progress": 30}],
+        }
+
+    def test_removed_clients_are_reported(self):
+        """Test that clients missing from the new state are listed"""
+        from app.events.deltas import DeltaTracker
+
+        tracker = DeltaTracker()
+        tracker.diff("fl-status", make_round(client_progress=(0, 0)))
+
+        delta = tracker.diff("fl-status", make_round(client_progress=(0,)))
+
+        assert delta["removed_clients"] == ["client-1"]
+        assert delta["clients"] == []
+
+    def test_keyframe_on_round_change_and_interval(self):
+        """Test that a new round or the keyframe interval forces a full state"""
+        from app.events.deltas import DeltaTracker
+
+        tracker = DeltaTracker(keyframe_interval=3)
+        tracker.diff("fl-status", make_round(round_id=1))
+
+        assert tracker.diff("fl-status", make_round(round_id=2)) is None
+        assert tracker.diff("fl-status", make_round(progress=1, round_id=2)) is not None
+        assert tracker.diff("fl-status", make_round(progress=2, round_id=2)) is not None
+        assert tracker.diff("fl-status", make_round(progress=3, round_id=2)) is None
+
+
+class TestDeltaBroadcast:
+    """Test that delta subscribers receive deltas under the same seq"""
+
+    @pytest.mark.asyncio
+    async def test_delta_subscribers_receive_delta(self):
+        """Test that only delta subscribers get the delta version"""
+        from app.websocket.manager import ConnectionManager
+
+        manager = ConnectionManager()
+        legacy = MockWebSocket()
+        delta_client = MockWebSocket()
+        manager.connect(legacy, room="fl-status")
+        manager.connect(delta_client, room="fl-status", deltas=True)
+
+        full = {"type": "fl_progress", "data": make_round(progress=20)}
+        delta = {"type": "fl_progress_delta", "data": {"id": 1, "changed": {"progress": 20}}}
+        await manager.broadcast_to_room("fl-status", full, delta=delta)
+        await manager.broadcast_to_room("fl-status", full)
+
+        assert [m["type"] for m in legacy.sent_messages] == ["fl_progress", "fl_progress"]
+        assert [m["type"] for m in delta_client.sent_messages] == [
+            "fl_progress_delta",
+            "fl_progress",
+        ]
+        assert delta_client.sent_messages[0]["seq"] == legacy.sent_messages[0]["seq"] == 1
+        # Replays always carry full state
+        assert manager.get_missed_events("fl-status", 0)[0]["type"] == "fl_progress"
@@ -53,6 +53,115 @@ class TestWebSocketEndpoint:
             assert response["status"] == "subscribed"
             assert response["room"] == "alerts"
 
+    def test_websocket_subscribe_replays_missed_events(self):
+        """Test that subscribing with since_seq replays buffered events"""
+        import asyncio
+
+        from app.websocket.manager import manager
+
+        asyncio.run(manager.broadcast_to_room("attack-graph", {"type": "attack_detected"}))
+        last_seq = manager.get_room_seq("attack-graph")
+        asyncio.run(manager.broadcast_to_room("attack-graph", {"type": "attack_detected"}))
+
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json(
+                {
+                    "action": "subscribe",
+                    "room": "attack-graph",
+                    "since_seq": last_seq,
+                    "epoch": manager.epoch,
+                }
+            )
+
+            ack = websocket.receive_json()
+            assert ack["status"] == "subscribed"
+            assert ack["seq"] == last_seq + 1
+
+            replayed = websocket.receive_json()
+            assert replayed["type"] == "attack_detected"
+            assert replayed["room"] == "attack-graph"
+            assert replayed["seq"] == last_seq + 1
+
+    def test_websocket_subscribe_sends_snapshot_when_gap_too_large(self):
+        """Test that an unknown since_seq falls back to a snapshot"""
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json(
+                {"action": "subscribe", "room": "attack-graph", "since_seq": 10**9}
+            )
+            websocket.receive_json()
+
+            response = websocket.receive_json()
+            assert response["type"] == "snapshot"
+            assert response["room"] == "attack-graph"
+            assert "seq" in response
+
+    def test_websocket_subscribe_with_invalid_filters(self):
+        """Test that invalid subscription filters are rejected"""
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json(
+                {"action": "subscribe", "room": "alerts", "filters": {"min_severity": "urgent"}}
+            )
+
+            response = websocket.receive_json()
+            assert response["type"] == "error"
+            assert "min_severity" in response["message"]
+
+    def test_websocket_negotiates_compressed_encoding(self):
+        """Test that encoding/compression chosen at connect time apply to all messages"""
+        import json
+        import zlib
+
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?compression=deflate") as websocket:
+            welcome = json.loads(zlib.decompress(websocket.receive_bytes()))
+            assert welcome["type"] == "connection"
+            assert welcome["compression"] == "deflate"
+
+            websocket.send_json({"action": "ping"})
+            assert json.loads(zlib.decompress(websocket.receive_bytes())) == {"type": "pong"}
+
+    def test_websocket_rejects_unsupported_encoding(self):
+        """Test that an unsupported encoding is reported before closing"""
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?encoding=xml") as websocket:
+            response = websocket.receive_json()
+            assert response["type"] == "error"
+            assert "encoding" in response["message"]
+
+    def test_websocket_delta_subscription_receives_keyframe(self):
+        """Test that subscribing with deltas sends the current state first"""
+        import asyncio
+
+        from app.events.emitter import emit_fl_progress
+
+        asyncio.run(emit_fl_progress({"id": 7, "round_number": 7, "progress": 40, "clients": []}))
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json({"action": "subscribe", "room": "fl-status", "deltas": True})
+            websocket.receive_json()
+
+            keyframe = websocket.receive_json()
+            assert keyframe["type"] == "fl_progress"
+            assert keyframe["data"]["id"] == 7
+            assert keyframe["data"]["progress"] == 40
+
     def test_websocket_can_unsubscribe_from_room(self):
         """Test that client can unsubscribe from a room"""
         client = TestClient(app)